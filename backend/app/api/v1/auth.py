@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
 from app.schemas import (
     UserCreate,
     UserLogin,
@@ -81,7 +81,7 @@ router = APIRouter()
 )
 async def send_verification_code(
     request: SendCodeRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     ## 发送邮箱验证码
@@ -204,7 +204,7 @@ async def send_verification_code(
 )
 async def register(
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     ## 用户注册
@@ -354,7 +354,7 @@ async def register(
 async def login(
     request: Request,
     login_data: UserLogin,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     ## 用户登录
@@ -459,7 +459,7 @@ async def login(
         device_info = SecurityService.parse_user_agent(user_agent)
         
         # 创建登录日志
-        security_service.create_login_log(
+        await security_service.create_login_log(
             user_id=str(result.data.user.id),
             ip_address=ip_address,
             user_agent=user_agent,
@@ -473,7 +473,7 @@ async def login(
         
         # 创建或更新设备
         device_id = SecurityService.generate_device_id(user_agent, ip_address)
-        security_service.create_or_update_device(
+        await security_service.create_or_update_device(
             user_id=str(result.data.user.id),
             device_id=device_id,
             device_name=device_info["device_name"],
@@ -487,7 +487,7 @@ async def login(
         # 将 Token 存储到 Redis
         from app.utils.security import store_token
         from app.core.config import settings
-        store_token(
+        await store_token(
             user_id=str(result.data.user.id),
             device_id=device_id,
             token=result.data.access_token,
@@ -589,7 +589,8 @@ async def logout():
 )
 async def get_current_user_info(
     request: Request,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     ## 获取当前用户信息
@@ -627,9 +628,13 @@ async def get_current_user_info(
     - 刷新用户信息
     """
     from app.schemas import UserResponse, ApiResponse
+    # 认证依赖只返回用户快照，完整资料从数据库读取
+    user = await db.get(User, current_user.id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="用户不存在")
     return ApiResponse(
         code=200,
-        data=UserResponse.from_orm(current_user),
+        data=UserResponse.from_orm(user),
         msg="success",
         errMsg=None
     )
@@ -691,7 +696,7 @@ async def get_current_user_info(
 )
 async def reset_password(
     reset_data: ResetPasswordRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     ## 重置密码
@@ -768,7 +773,7 @@ async def update_profile(
     request: Request,
     update_data: UpdateProfileRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     ## 更新个人信息
@@ -834,7 +839,7 @@ async def change_password(
     request: Request,
     password_data: ChangePasswordRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     ## 修改密码
@@ -959,7 +964,7 @@ async def verify_token(
 async def get_security_settings(
     request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     ## 获取安全设置信息
@@ -988,7 +993,7 @@ async def get_security_settings(
     ```
     """
     security_service = SecurityService(db)
-    result = security_service.get_security_settings(str(current_user.id))
+    result = await security_service.get_security_settings(str(current_user.id))
     return result
 
 
@@ -1004,7 +1009,7 @@ async def get_login_logs(
     page: int = 1,
     pageSize: int = 20,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     ## 获取登录日志
@@ -1044,7 +1049,7 @@ async def get_login_logs(
     ```
     """
     security_service = SecurityService(db)
-    result = security_service.get_login_logs(str(current_user.id), page, pageSize)
+    result = await security_service.get_login_logs(str(current_user.id), page, pageSize)
     return result
 
 
@@ -1058,7 +1063,7 @@ async def get_login_logs(
 async def get_login_devices(
     request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     ## 获取登录设备列表
@@ -1101,7 +1106,7 @@ async def get_login_devices(
     ip_address = request.client.host if request.client else ""
     current_device_id = SecurityService.generate_device_id(user_agent, ip_address)
     
-    result = security_service.get_login_devices(str(current_user.id), current_device_id)
+    result = await security_service.get_login_devices(str(current_user.id), current_device_id)
     return result
 
 
@@ -1116,7 +1121,7 @@ async def remove_login_device(
     request: Request,
     device_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     ## 移除登录设备
@@ -1146,7 +1151,7 @@ async def remove_login_device(
     - 移除后该设备需要重新登录
     """
     security_service = SecurityService(db)
-    result = security_service.remove_device(str(current_user.id), device_id)
+    result = await security_service.remove_device(str(current_user.id), device_id)
     return result
 
 
@@ -1161,7 +1166,7 @@ async def force_logout_device(
     request: Request,
     device_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     ## 强制设备下线
@@ -1192,7 +1197,7 @@ async def force_logout_device(
     - Token 将立即失效
     """
     security_service = SecurityService(db)
-    result = security_service.force_logout_device(str(current_user.id), device_id)
+    result = await security_service.force_logout_device(str(current_user.id), device_id)
     return result
 
 
@@ -1207,7 +1212,7 @@ async def change_email(
     request: Request,
     email_data: ChangeEmailRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     ## 换绑邮箱
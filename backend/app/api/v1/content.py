@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Path, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.read_replica import get_read_db
 from app.utils.dependencies import get_current_user, get_optional_current_user
 from app.models.user import User
 from app.models.content import ContentType
@@ -16,9 +17,17 @@ from app.schemas.content import (
     LikeResponse,
     SaveResponse,
     CommentLikeResponse,
+    InteractionFlags,
+    InteractionFlagsRequest,
+    InteractionFlagsResponse,
+    AlbumPhotoListResponse,
 )
 from app.schemas import ApiResponse, MessageResponse
 from app.services.content_service import ContentService
+from app.services.feed_cache_service import FeedCacheService
+from app.services.interaction_index import InteractionIndex
+from app.services.trending_service import TrendingService
+from app.services.view_tracker import ViewTracker
 
 router = APIRouter()
 
@@ -36,20 +45,27 @@ async def search_contents(
     keyword: Optional[str] = Query(None, description="标题关键词"),
     author: Optional[str] = Query(None, description="作者名称"),
     type: Optional[ContentType] = Query(None, description="内容类型"),
+    match: str = Query("fulltext", pattern="^(fulltext|substring)$", description="匹配方式：fulltext（全文相关度）/substring（子串匹配）"),
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    with_total: bool = Query(True, description="是否返回总数（false 时跳过计数）"),
+    cursor: Optional[str] = Query(None, description="分页游标（传入后忽略 page，取上一页返回的 next_cursor）"),
     current_user: Optional[User] = Depends(get_optional_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """搜索内容（允许未登录访问）"""
-    service = ContentService(db)
-    return service.search_contents(
+    response = await db.run_sync(lambda session: ContentService(session).search_contents(
         keyword=keyword,
         author=author,
         content_type=type,
         page=page,
         page_size=page_size,
-    )
+        cursor=cursor,
+        with_total=with_total,
+        match=match,
+    ))
+    await InteractionIndex.apply_flags_async(db, str(current_user.id) if current_user else None, response.data.items)
+    return response
 
 
 @router.post(
@@ -61,11 +77,10 @@ async def search_contents(
 async def create_content(
     content_data: ContentCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """创建内容"""
-    service = ContentService(db)
-    return service.create_content(str(current_user.id), content_data)
+    return await db.run_sync(lambda session: ContentService(session).create_content(str(current_user.id), content_data))
 
 
 @router.get(
@@ -76,13 +91,19 @@ async def create_content(
 )
 async def get_content(
     content_id: str,
+    request: Request,
     current_user: Optional[User] = Depends(get_optional_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取内容详情（公开内容允许未登录访问）"""
-    service = ContentService(db)
     user_id = str(current_user.id) if current_user else None
-    return service.get_content(content_id, user_id)
+    viewer_key = request.client.host if request.client else None
+    response = await db.run_sync(lambda session: ContentService(session).get_content(content_id, user_id))
+    # 浏览只写 Redis 缓冲，响应中的浏览数包含尚未落库的部分
+    content = response.data
+    content.view_count += await ViewTracker.record(str(content.id), user_id, viewer_key)
+    await InteractionIndex.apply_flags_async(db, user_id, [content])
+    return response
 
 
 @router.put(
@@ -95,11 +116,10 @@ async def update_content(
     content_id: str,
     content_data: ContentUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """更新内容"""
-    service = ContentService(db)
-    return service.update_content(content_id, str(current_user.id), content_data)
+    return await db.run_sync(lambda session: ContentService(session).update_content(content_id, str(current_user.id), content_data))
 
 
 @router.delete(
@@ -111,11 +131,10 @@ async def update_content(
 async def delete_content(
     content_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """删除内容"""
-    service = ContentService(db)
-    return service.delete_content(content_id, str(current_user.id))
+    return await db.run_sync(lambda session: ContentService(session).delete_content(content_id, str(current_user.id)))
 
 
 @router.get(
@@ -127,27 +146,38 @@ async def delete_content(
 async def list_contents(
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    with_total: bool = Query(True, description="是否返回总数（false 时跳过计数）"),
+    cursor: Optional[str] = Query(None, description="分页游标（传入后忽略 page，取上一页返回的 next_cursor）"),
     type: Optional[ContentType] = Query(None, description="内容类型"),
     user_id: Optional[str] = Query(None, description="用户ID"),
     is_public: Optional[bool] = Query(None, description="是否公开"),
     keyword: Optional[str] = Query(None, description="搜索关键词"),
     tag: Optional[str] = Query(None, description="标签筛选"),
+    tags: Optional[str] = Query(None, description="多标签筛选，逗号分隔"),
+    tag_mode: str = Query("any", pattern="^(any|all)$", description="多标签匹配方式：any 任一/all 全部"),
+    with_facets: bool = Query(False, description="是否返回标签分面计数"),
     is_featured: Optional[bool] = Query(None, description="是否精选"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """获取内容列表"""
-    service = ContentService(db)
-    return service.list_contents(
+    response = await db.run_sync(lambda session: ContentService(session).list_contents(
         page=page,
         page_size=page_size,
+        cursor=cursor,
+        with_total=with_total,
         content_type=type,
         user_id=user_id,
         is_public=is_public,
         keyword=keyword,
         tag=tag,
+        tags=tags,
+        tag_mode=tag_mode,
+        with_facets=with_facets,
         is_featured=is_featured,
-    )
+    ))
+    await InteractionIndex.apply_flags_async(db, str(current_user.id), response.data.items)
+    return response
 
 
 @router.get(
@@ -159,18 +189,23 @@ async def list_contents(
 async def get_my_contents(
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    with_total: bool = Query(True, description="是否返回总数（false 时跳过计数）"),
+    cursor: Optional[str] = Query(None, description="分页游标（传入后忽略 page，取上一页返回的 next_cursor）"),
     type: Optional[ContentType] = Query(None, description="内容类型"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取我的内容"""
-    service = ContentService(db)
-    return service.list_contents(
+    response = await db.run_sync(lambda session: ContentService(session).list_contents(
         page=page,
         page_size=page_size,
+        cursor=cursor,
+        with_total=with_total,
         content_type=type,
         user_id=str(current_user.id),
-    )
+    ))
+    await InteractionIndex.apply_flags_async(db, str(current_user.id), response.data.items)
+    return response
 
 
 # ==================== 日常记录相关接口 ====================
@@ -184,19 +219,24 @@ async def get_my_contents(
 async def list_daily_contents(
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    with_total: bool = Query(True, description="是否返回总数（false 时跳过计数）"),
+    cursor: Optional[str] = Query(None, description="分页游标（传入后忽略 page，取上一页返回的 next_cursor）"),
     keyword: Optional[str] = Query(None, description="搜索关键词"),
     current_user: Optional[User] = Depends(get_optional_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """获取日常记录列表（允许未登录访问）"""
-    service = ContentService(db)
-    return service.list_contents(
+    response = await db.run_sync(lambda session: ContentService(session).list_contents(
         page=page,
         page_size=page_size,
+        cursor=cursor,
+        with_total=with_total,
         content_type=ContentType.DAILY,
         is_public=True,
         keyword=keyword,
-    )
+    ))
+    await InteractionIndex.apply_flags_async(db, str(current_user.id) if current_user else None, response.data.items)
+    return response
 
 
 # ==================== 相册相关接口 ====================
@@ -210,19 +250,43 @@ async def list_daily_contents(
 async def list_albums(
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    with_total: bool = Query(True, description="是否返回总数（false 时跳过计数）"),
+    cursor: Optional[str] = Query(None, description="分页游标（传入后忽略 page，取上一页返回的 next_cursor）"),
     keyword: Optional[str] = Query(None, description="搜索关键词"),
     current_user: Optional[User] = Depends(get_optional_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """获取相册列表（允许未登录访问）"""
-    service = ContentService(db)
-    return service.list_contents(
+    response = await db.run_sync(lambda session: ContentService(session).list_contents(
         page=page,
         page_size=page_size,
+        cursor=cursor,
+        with_total=with_total,
         content_type=ContentType.ALBUM,
         is_public=True,
         keyword=keyword,
-    )
+    ))
+    await InteractionIndex.apply_flags_async(db, str(current_user.id) if current_user else None, response.data.items)
+    return response
+
+
+@router.get(
+    "/albums/{album_id}/photos",
+    response_model=ApiResponse[AlbumPhotoListResponse],
+    summary="获取相册照片",
+    description="按相册中的顺序分页获取照片及其元数据（公开相册允许未登录访问）"
+)
+async def get_album_photos(
+    album_id: str,
+    page: int = Query(1, ge=1, description="页码"),
+    page_size: int = Query(50, ge=1, le=200, description="每页数量"),
+    cursor: Optional[str] = Query(None, description="分页游标（传入后忽略 page，取上一页返回的 next_cursor）"),
+    current_user: Optional[User] = Depends(get_optional_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """获取相册照片"""
+    user_id = str(current_user.id) if current_user else None
+    return await db.run_sync(lambda session: ContentService(session).get_album_photos(album_id, user_id, page, page_size, cursor))
 
 
 # ==================== 旅游路线相关接口 ====================
@@ -236,19 +300,24 @@ async def list_albums(
 async def list_travel_routes(
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    with_total: bool = Query(True, description="是否返回总数（false 时跳过计数）"),
+    cursor: Optional[str] = Query(None, description="分页游标（传入后忽略 page，取上一页返回的 next_cursor）"),
     keyword: Optional[str] = Query(None, description="搜索关键词"),
     current_user: Optional[User] = Depends(get_optional_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """获取旅游路线列表（允许未登录访问）"""
-    service = ContentService(db)
-    return service.list_contents(
+    response = await db.run_sync(lambda session: ContentService(session).list_contents(
         page=page,
         page_size=page_size,
+        cursor=cursor,
+        with_total=with_total,
         content_type=ContentType.TRAVEL,
         is_public=True,
         keyword=keyword,
-    )
+    ))
+    await InteractionIndex.apply_flags_async(db, str(current_user.id) if current_user else None, response.data.items)
+    return response
 
 
 # ==================== 探索页面相关接口 ====================
@@ -262,36 +331,50 @@ async def list_travel_routes(
 async def explore_contents(
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    with_total: bool = Query(True, description="是否返回总数（false 时跳过计数）"),
+    cursor: Optional[str] = Query(None, description="分页游标（传入后忽略 page，取上一页返回的 next_cursor）"),
     category: Optional[str] = Query(None, description="分类：all/daily/album/travel/popular"),
     keyword: Optional[str] = Query(None, description="搜索关键词"),
     tag: Optional[str] = Query(None, description="标签筛选"),
+    tags: Optional[str] = Query(None, description="多标签筛选，逗号分隔"),
+    tag_mode: str = Query("any", pattern="^(any|all)$", description="多标签匹配方式：any 任一/all 全部"),
+    with_facets: bool = Query(False, description="是否返回标签分面计数"),
     current_user: Optional[User] = Depends(get_optional_current_user),
-    db: Session = Depends(get_db)
-):
-    """探索内容（允许未登录访问）"""
-    service = ContentService(db)
-    
-    # 处理分类
-    content_type = None
-    is_featured = None
-    if category == "daily":
-        content_type = ContentType.DAILY
-    elif category == "album":
-        content_type = ContentType.ALBUM
-    elif category == "travel":
-        content_type = ContentType.TRAVEL
-    elif category == "popular":
-        is_featured = True
-    
-    return service.list_contents(
-        page=page,
-        page_size=page_size,
-        content_type=content_type,
-        is_public=True,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """探索内容（允许未登录访问，未登录访客的前几页走信息流缓存）"""
+    async def build() -> ContentListResponse:
+        response = await db.run_sync(lambda session: ContentService(session).explore_contents(
+            page=page,
+            page_size=page_size,
+            category=category,
+            keyword=keyword,
+            tag=tag,
+            tags=tags,
+            tag_mode=tag_mode,
+            with_facets=with_facets,
+            cursor=cursor,
+            with_total=with_total,
+        ))
+        return response.data
+
+    slot = ContentService.explore_cache_slot(
+        page,
+        category=category,
         keyword=keyword,
         tag=tag,
-        is_featured=is_featured,
+        cursor=cursor,
+        with_total=with_total,
+        anonymous=current_user is None,
+        tags=tags,
+        with_facets=with_facets,
     )
+    if slot:
+        data = await FeedCacheService.get_or_build(*slot, page, page_size, build)
+    else:
+        data = await build()
+    await InteractionIndex.apply_flags_async(db, str(current_user.id) if current_user else None, data.items)
+    return ApiResponse(code=200, data=data, msg="获取成功", errMsg=None)
 
 
 # ==================== 点赞相关接口 ====================
@@ -305,11 +388,12 @@ async def explore_contents(
 async def toggle_like(
     content_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """切换点赞"""
-    service = ContentService(db)
-    return service.toggle_like(content_id, str(current_user.id))
+    response = await db.run_sync(lambda session: ContentService(session).toggle_like(content_id, str(current_user.id)))
+    await TrendingService.mark_active_async(content_id)
+    return response
 
 
 # ==================== 收藏相关接口 ====================
@@ -323,11 +407,37 @@ async def toggle_like(
 async def toggle_save(
     content_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """切换收藏"""
-    service = ContentService(db)
-    return service.toggle_save(content_id, str(current_user.id))
+    response = await db.run_sync(lambda session: ContentService(session).toggle_save(content_id, str(current_user.id)))
+    await TrendingService.mark_active_async(content_id)
+    return response
+
+
+# ==================== 互动状态相关接口 ====================
+
+@router.post(
+    "/interactions/flags",
+    response_model=ApiResponse[InteractionFlagsResponse],
+    summary="批量获取互动状态",
+    description="一次获取最多 100 个内容的点赞/收藏/浏览状态"
+)
+async def get_interaction_flags(
+    request_data: InteractionFlagsRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """批量获取互动状态"""
+    flags = await InteractionIndex.flags_async(db, str(current_user.id), request_data.content_ids)
+    return ApiResponse(
+        code=200,
+        data=InteractionFlagsResponse(
+            flags={content_id: InteractionFlags(**state) for content_id, state in flags.items()}
+        ),
+        msg="获取成功",
+        errMsg=None
+    )
 
 
 # ==================== 我的创作相关接口 ====================
@@ -342,18 +452,23 @@ async def toggle_save(
 async def get_my_works(
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    with_total: bool = Query(True, description="是否返回总数（false 时跳过计数）"),
+    cursor: Optional[str] = Query(None, description="分页游标（传入后忽略 page，取上一页返回的 next_cursor）"),
     type: Optional[ContentType] = Query(None, description="内容类型"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取我的作品"""
-    service = ContentService(db)
-    return service.list_contents(
+    response = await db.run_sync(lambda session: ContentService(session).list_contents(
         page=page,
         page_size=page_size,
+        cursor=cursor,
+        with_total=with_total,
         content_type=type,
         user_id=str(current_user.id),
-    )
+    ))
+    await InteractionIndex.apply_flags_async(db, str(current_user.id), response.data.items)
+    return response
 
 
 @router.get(
@@ -365,12 +480,14 @@ async def get_my_works(
 async def get_my_views(
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    with_total: bool = Query(True, description="是否返回总数（false 时跳过计数）"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取浏览记录"""
-    service = ContentService(db)
-    return service.get_user_views(str(current_user.id), page, page_size)
+    response = await db.run_sync(lambda session: ContentService(session).get_user_views(str(current_user.id), page, page_size, with_total))
+    await InteractionIndex.apply_flags_async(db, str(current_user.id), response.data.items)
+    return response
 
 
 @router.get(
@@ -382,12 +499,14 @@ async def get_my_views(
 async def get_my_likes(
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    with_total: bool = Query(True, description="是否返回总数（false 时跳过计数）"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取点赞记录"""
-    service = ContentService(db)
-    return service.get_user_likes(str(current_user.id), page, page_size)
+    response = await db.run_sync(lambda session: ContentService(session).get_user_likes(str(current_user.id), page, page_size, with_total))
+    await InteractionIndex.apply_flags_async(db, str(current_user.id), response.data.items)
+    return response
 
 
 @router.get(
@@ -399,12 +518,12 @@ async def get_my_likes(
 async def get_my_comments(
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    with_total: bool = Query(True, description="是否返回总数（false 时跳过计数）"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取评论记录"""
-    service = ContentService(db)
-    return service.get_user_comments(str(current_user.id), page, page_size)
+    return await db.run_sync(lambda session: ContentService(session).get_user_comments(str(current_user.id), page, page_size, with_total))
 
 
 @router.delete(
@@ -416,11 +535,10 @@ async def get_my_comments(
 async def delete_view_record(
     content_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """删除浏览记录"""
-    service = ContentService(db)
-    return service.delete_view_record(content_id, str(current_user.id))
+    return await db.run_sync(lambda session: ContentService(session).delete_view_record(content_id, str(current_user.id)))
 
 
 # ==================== 评论相关接口 ====================
@@ -435,11 +553,12 @@ async def create_comment(
     content_id: str,
     comment_data: CommentCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """创建评论"""
-    service = ContentService(db)
-    return service.create_comment(content_id, str(current_user.id), comment_data)
+    response = await db.run_sync(lambda session: ContentService(session).create_comment(content_id, str(current_user.id), comment_data))
+    await TrendingService.mark_active_async(content_id)
+    return response
 
 
 @router.get(
@@ -452,13 +571,13 @@ async def get_comments(
     content_id: str,
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    with_total: bool = Query(True, description="是否返回总数（false 时跳过计数）"),
     current_user: Optional[User] = Depends(get_optional_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取评论列表（允许未登录访问）"""
-    service = ContentService(db)
     user_id = str(current_user.id) if current_user else None
-    return service.get_comments(content_id, page, page_size, user_id)
+    return await db.run_sync(lambda session: ContentService(session).get_comments(content_id, page, page_size, user_id, with_total))
 
 
 # ==================== 标签相关接口 ====================
@@ -467,15 +586,16 @@ async def get_comments(
     "/tags/hot",
     response_model=ApiResponse[dict],
     summary="获取热门标签",
-    description="获取使用频率最高的标签（允许未登录访问）"
+    description="获取使用频率最高的标签，可按时间窗口和内容类型筛选（允许未登录访问）"
 )
 async def get_hot_tags(
     limit: int = Query(10, ge=1, le=50, description="返回数量"),
-    db: Session = Depends(get_db)
+    window: str = Query("all", pattern="^(all|24h|7d|30d)$", description="统计时间窗口：all/24h/7d/30d"),
+    type: Optional[ContentType] = Query(None, description="内容类型"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取热门标签"""
-    service = ContentService(db)
-    return service.get_hot_tags(limit)
+    return await ContentService.get_hot_tags(db, limit, window, type)
 
 
 # ==================== 评论点赞相关接口 ====================
@@ -489,11 +609,10 @@ async def get_hot_tags(
 async def toggle_comment_like(
     comment_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """切换评论点赞"""
-    service = ContentService(db)
-    return service.toggle_comment_like(comment_id, str(current_user.id))
+    return await db.run_sync(lambda session: ContentService(session).toggle_comment_like(comment_id, str(current_user.id)))
 
 
 @router.get(
@@ -506,13 +625,33 @@ async def get_comment_replies(
     comment_id: str,
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(10, ge=1, le=50, description="每页数量"),
+    with_total: bool = Query(True, description="是否返回总数（false 时跳过计数）"),
+    cursor: Optional[str] = Query(None, description="分页游标（传入后忽略 page，取上一页返回的 next_cursor）"),
     current_user: Optional[User] = Depends(get_optional_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取评论回复"""
-    service = ContentService(db)
     user_id = str(current_user.id) if current_user else None
-    return service.get_comment_replies(comment_id, page, page_size, user_id)
+    return await db.run_sync(lambda session: ContentService(session).get_comment_replies(comment_id, page, page_size, user_id, cursor, with_total))
+
+
+@router.get(
+    "/comments/{comment_id}/thread",
+    response_model=ApiResponse[dict],
+    summary="获取评论线程",
+    description="按线程顺序获取评论的完整子树，支持层级限制与游标分页（允许未登录访问）"
+)
+async def get_comment_thread(
+    comment_id: str,
+    max_depth: Optional[int] = Query(None, ge=1, le=50, description="相对该评论的最大层级，不传表示不限"),
+    limit: int = Query(50, ge=1, le=200, description="每页数量"),
+    cursor: Optional[str] = Query(None, description="分页游标（取上一页返回的 next_cursor）"),
+    current_user: Optional[User] = Depends(get_optional_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """获取评论线程"""
+    user_id = str(current_user.id) if current_user else None
+    return await db.run_sync(lambda session: ContentService(session).get_comment_thread(comment_id, user_id, max_depth, limit, cursor))
 
 
 # ==================== 内容可见性相关接口 ====================
@@ -526,11 +665,10 @@ async def get_comment_replies(
 async def hide_content(
     content_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """隐藏作品"""
-    service = ContentService(db)
-    return service.toggle_content_visibility(content_id, str(current_user.id), is_public=False)
+    return await db.run_sync(lambda session: ContentService(session).toggle_content_visibility(content_id, str(current_user.id), is_public=False))
 
 
 @router.post(
@@ -542,74 +680,100 @@ async def hide_content(
 async def show_content(
     content_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """公开作品"""
-    service = ContentService(db)
-    return service.toggle_content_visibility(content_id, str(current_user.id), is_public=True)
+    return await db.run_sync(lambda session: ContentService(session).toggle_content_visibility(content_id, str(current_user.id), is_public=True))
 
 
 # ==================== 相册统计相关接口 ====================
 
+def _stats_scope(user_id: Optional[str], current_user: Optional[User]) -> Optional[str]:
+    """统计范围：只有本人可以查看含私密相册的个人统计，其余情况统计全部公开相册"""
+    if user_id and current_user and str(current_user.id) == user_id:
+        return user_id
+    return None
+
+
 @router.get(
     "/albums/stats/location",
     response_model=ApiResponse[dict],
     summary="按地点统计相册",
-    description="统计相册按地点的分布情况"
+    description="统计相册按地点的分布情况（分页，桶内相册通过下钻接口获取）"
 )
 async def get_album_stats_by_location(
     user_id: Optional[str] = Query(None, description="用户ID（不传则统计所有公开相册）"),
+    page: int = Query(1, ge=1, description="页码"),
+    page_size: int = Query(50, ge=1, le=200, description="每页数量"),
     current_user: Optional[User] = Depends(get_optional_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """按地点统计相册"""
-    service = ContentService(db)
-    # 如果传了 user_id，检查权限
-    if user_id and current_user and str(current_user.id) != user_id:
-        # 只能查看自己的私密统计
-        user_id = None
-    return service.get_album_stats_by_location(user_id)
+    return await db.run_sync(lambda session: ContentService(session).get_album_stats_by_location(_stats_scope(user_id, current_user), page, page_size))
 
 
 @router.get(
     "/albums/stats/tag",
     response_model=ApiResponse[dict],
     summary="按标签统计相册",
-    description="统计相册按标签的分布情况"
+    description="统计相册按标签的分布情况（分页，桶内相册通过下钻接口获取）"
 )
 async def get_album_stats_by_tag(
     user_id: Optional[str] = Query(None, description="用户ID（不传则统计所有公开相册）"),
+    page: int = Query(1, ge=1, description="页码"),
+    page_size: int = Query(50, ge=1, le=200, description="每页数量"),
     current_user: Optional[User] = Depends(get_optional_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """按标签统计相册"""
-    service = ContentService(db)
-    # 如果传了 user_id，检查权限
-    if user_id and current_user and str(current_user.id) != user_id:
-        # 只能查看自己的私密统计
-        user_id = None
-    return service.get_album_stats_by_tag(user_id)
+    return await db.run_sync(lambda session: ContentService(session).get_album_stats_by_tag(_stats_scope(user_id, current_user), page, page_size))
 
 
 @router.get(
     "/albums/stats/timeline",
     response_model=ApiResponse[dict],
     summary="按时间轴统计相册",
-    description="统计相册按时间的分布情况"
+    description="统计相册按时间的分布情况（分页，桶内相册通过下钻接口获取）"
 )
 async def get_album_stats_by_timeline(
     user_id: Optional[str] = Query(None, description="用户ID（不传则统计所有公开相册）"),
     group_by: str = Query("month", description="分组方式：year/month/day"),
+    page: int = Query(1, ge=1, description="页码"),
+    page_size: int = Query(50, ge=1, le=200, description="每页数量"),
     current_user: Optional[User] = Depends(get_optional_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """按时间轴统计相册"""
-    service = ContentService(db)
-    # 如果传了 user_id，检查权限
-    if user_id and current_user and str(current_user.id) != user_id:
-        # 只能查看自己的私密统计
-        user_id = None
-    return service.get_album_stats_by_timeline(user_id, group_by)
+    return await db.run_sync(lambda session: ContentService(session).get_album_stats_by_timeline(_stats_scope(user_id, current_user), group_by, page, page_size))
+
+
+@router.get(
+    "/albums/stats/{dimension}/albums",
+    response_model=ApiResponse[ContentListResponse],
+    summary="相册统计下钻",
+    description="分页获取某个地点/标签/时间段内的相册（维度：location/tag/year/month/day）"
+)
+async def get_album_stats_bucket_albums(
+    dimension: str = Path(..., pattern="^(location|tag|year|month|day)$", description="统计维度"),
+    bucket: str = Query(..., min_length=1, description="分桶：地点、标签或时间键（2024 / 2024-05 / 2024-05-01）"),
+    user_id: Optional[str] = Query(None, description="用户ID（不传则查询所有公开相册）"),
+    page: int = Query(1, ge=1, description="页码"),
+    page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    cursor: Optional[str] = Query(None, description="分页游标（传入后忽略 page，取上一页返回的 next_cursor）"),
+    current_user: Optional[User] = Depends(get_optional_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """相册统计下钻"""
+    response = await db.run_sync(lambda session: ContentService(session).get_album_stats_bucket_albums(
+        dimension,
+        bucket,
+        user_id=_stats_scope(user_id, current_user),
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+    ))
+    await InteractionIndex.apply_flags_async(db, str(current_user.id) if current_user else None, response.data.items)
+    return response
 
 
 
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from datetime import datetime
 
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.read_replica import get_read_db
 from app.utils.dependencies import get_current_user
 from app.models.user import User
 from app.models.tools import TodoStatus, ExpenseType
@@ -31,11 +32,10 @@ router = APIRouter()
 async def create_countdown(
     data: CountdownCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """创建倒计时"""
-    service = ToolsService(db)
-    return service.create_countdown(str(current_user.id), data)
+    return await db.run_sync(lambda session: ToolsService(session).create_countdown(str(current_user.id), data))
 
 
 @router.get(
@@ -47,12 +47,12 @@ async def create_countdown(
 async def get_countdown_list(
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    with_total: bool = Query(True, description="是否返回总数（false 时跳过计数）"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """获取倒计时列表"""
-    service = ToolsService(db)
-    return service.get_countdown_list(str(current_user.id), page, page_size)
+    return await db.run_sync(lambda session: ToolsService(session).get_countdown_list(str(current_user.id), page, page_size, with_total))
 
 
 @router.put(
@@ -65,11 +65,10 @@ async def update_countdown(
     countdown_id: str,
     data: CountdownUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """更新倒计时"""
-    service = ToolsService(db)
-    return service.update_countdown(countdown_id, str(current_user.id), data)
+    return await db.run_sync(lambda session: ToolsService(session).update_countdown(countdown_id, str(current_user.id), data))
 
 
 @router.delete(
@@ -81,11 +80,10 @@ async def update_countdown(
 async def delete_countdown(
     countdown_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """删除倒计时"""
-    service = ToolsService(db)
-    return service.delete_countdown(countdown_id, str(current_user.id))
+    return await db.run_sync(lambda session: ToolsService(session).delete_countdown(countdown_id, str(current_user.id)))
 
 
 # ==================== 待办清单相关接口 ====================
@@ -99,11 +97,10 @@ async def delete_countdown(
 async def create_todo(
     data: TodoCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """创建待办"""
-    service = ToolsService(db)
-    return service.create_todo(str(current_user.id), data)
+    return await db.run_sync(lambda session: ToolsService(session).create_todo(str(current_user.id), data))
 
 
 @router.get(
@@ -116,12 +113,17 @@ async def get_todo_list(
     status: Optional[TodoStatus] = Query(None, description="状态筛选"),
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(50, ge=1, le=100, description="每页数量"),
+    with_total: bool = Query(True, description="是否返回总数（false 时跳过计数）"),
+    tags: Optional[str] = Query(None, description="标签筛选，逗号分隔"),
+    tag_mode: str = Query("any", pattern="^(any|all)$", description="多标签匹配方式：any 任一/all 全部"),
+    with_facets: bool = Query(False, description="是否返回标签分面计数"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """获取待办列表"""
-    service = ToolsService(db)
-    return service.get_todo_list(str(current_user.id), status, page, page_size)
+    return await db.run_sync(lambda session: ToolsService(session).get_todo_list(
+        str(current_user.id), status, page, page_size, with_total, tags, tag_mode, with_facets
+    ))
 
 
 @router.get(
@@ -132,11 +134,10 @@ async def get_todo_list(
 )
 async def get_todo_stats(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取待办统计"""
-    service = ToolsService(db)
-    return service.get_todo_stats(str(current_user.id))
+    return await db.run_sync(lambda session: ToolsService(session).get_todo_stats(str(current_user.id)))
 
 
 @router.put(
@@ -149,11 +150,10 @@ async def update_todo(
     todo_id: str,
     data: TodoUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """更新待办"""
-    service = ToolsService(db)
-    return service.update_todo(todo_id, str(current_user.id), data)
+    return await db.run_sync(lambda session: ToolsService(session).update_todo(todo_id, str(current_user.id), data))
 
 
 @router.delete(
@@ -165,11 +165,10 @@ async def update_todo(
 async def delete_todo(
     todo_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """删除待办"""
-    service = ToolsService(db)
-    return service.delete_todo(todo_id, str(current_user.id))
+    return await db.run_sync(lambda session: ToolsService(session).delete_todo(todo_id, str(current_user.id)))
 
 
 # ==================== 记账相关接口 ====================
@@ -183,11 +182,10 @@ async def delete_todo(
 async def create_expense(
     data: ExpenseCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """创建记账"""
-    service = ToolsService(db)
-    return service.create_expense(str(current_user.id), data)
+    return await db.run_sync(lambda session: ToolsService(session).create_expense(str(current_user.id), data))
 
 
 @router.get(
@@ -202,12 +200,17 @@ async def get_expense_list(
     end_date: Optional[datetime] = Query(None, description="结束日期"),
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(50, ge=1, le=100, description="每页数量"),
+    with_total: bool = Query(True, description="是否返回总数（false 时跳过计数）"),
+    tags: Optional[str] = Query(None, description="标签筛选，逗号分隔"),
+    tag_mode: str = Query("any", pattern="^(any|all)$", description="多标签匹配方式：any 任一/all 全部"),
+    with_facets: bool = Query(False, description="是否返回标签分面计数"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """获取记账列表"""
-    service = ToolsService(db)
-    return service.get_expense_list(str(current_user.id), type, start_date, end_date, page, page_size)
+    return await db.run_sync(lambda session: ToolsService(session).get_expense_list(
+        str(current_user.id), type, start_date, end_date, page, page_size, with_total, tags, tag_mode, with_facets
+    ))
 
 
 @router.get(
@@ -220,11 +223,10 @@ async def get_expense_stats(
     start_date: Optional[datetime] = Query(None, description="开始日期"),
     end_date: Optional[datetime] = Query(None, description="结束日期"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取记账统计"""
-    service = ToolsService(db)
-    return service.get_expense_stats(str(current_user.id), start_date, end_date)
+    return await db.run_sync(lambda session: ToolsService(session).get_expense_stats(str(current_user.id), start_date, end_date))
 
 
 @router.put(
@@ -237,11 +239,10 @@ async def update_expense(
     expense_id: str,
     data: ExpenseUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """更新记账"""
-    service = ToolsService(db)
-    return service.update_expense(expense_id, str(current_user.id), data)
+    return await db.run_sync(lambda session: ToolsService(session).update_expense(expense_id, str(current_user.id), data))
 
 
 @router.delete(
@@ -253,11 +254,10 @@ async def update_expense(
 async def delete_expense(
     expense_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """删除记账"""
-    service = ToolsService(db)
-    return service.delete_expense(expense_id, str(current_user.id))
+    return await db.run_sync(lambda session: ToolsService(session).delete_expense(expense_id, str(current_user.id)))
 
 
 # ==================== 习惯打卡相关接口 ====================
@@ -271,11 +271,10 @@ async def delete_expense(
 async def create_habit(
     data: HabitCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """创建习惯"""
-    service = ToolsService(db)
-    return service.create_habit(str(current_user.id), data)
+    return await db.run_sync(lambda session: ToolsService(session).create_habit(str(current_user.id), data))
 
 
 @router.get(
@@ -286,11 +285,10 @@ async def create_habit(
 )
 async def get_habit_list(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """获取习惯列表"""
-    service = ToolsService(db)
-    return service.get_habit_list(str(current_user.id))
+    return await db.run_sync(lambda session: ToolsService(session).get_habit_list(str(current_user.id)))
 
 
 @router.post(
@@ -303,11 +301,10 @@ async def check_in_habit(
     habit_id: str,
     data: HabitRecordCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """习惯打卡"""
-    service = ToolsService(db)
-    return service.check_in_habit(habit_id, str(current_user.id), data)
+    return await db.run_sync(lambda session: ToolsService(session).check_in_habit(habit_id, str(current_user.id), data))
 
 
 @router.delete(
@@ -319,11 +316,10 @@ async def check_in_habit(
 async def delete_habit(
     habit_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """删除习惯"""
-    service = ToolsService(db)
-    return service.delete_habit(habit_id, str(current_user.id))
+    return await db.run_sync(lambda session: ToolsService(session).delete_habit(habit_id, str(current_user.id)))
 
 
 # ==================== 笔记相关接口 ====================
@@ -337,11 +333,10 @@ async def delete_habit(
 async def create_note(
     data: NoteCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """创建笔记"""
-    service = ToolsService(db)
-    return service.create_note(str(current_user.id), data)
+    return await db.run_sync(lambda session: ToolsService(session).create_note(str(current_user.id), data))
 
 
 @router.get(
@@ -356,12 +351,17 @@ async def get_note_list(
     is_archived: bool = Query(False, description="是否归档"),
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(50, ge=1, le=100, description="每页数量"),
+    with_total: bool = Query(True, description="是否返回总数（false 时跳过计数）"),
+    tags: Optional[str] = Query(None, description="标签筛选，逗号分隔"),
+    tag_mode: str = Query("any", pattern="^(any|all)$", description="多标签匹配方式：any 任一/all 全部"),
+    with_facets: bool = Query(False, description="是否返回标签分面计数"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """获取笔记列表"""
-    service = ToolsService(db)
-    return service.get_note_list(str(current_user.id), keyword, category, is_archived, page, page_size)
+    return await db.run_sync(lambda session: ToolsService(session).get_note_list(
+        str(current_user.id), keyword, category, is_archived, page, page_size, with_total, tags, tag_mode, with_facets
+    ))
 
 
 @router.put(
@@ -374,11 +374,10 @@ async def update_note(
     note_id: str,
     data: NoteUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """更新笔记"""
-    service = ToolsService(db)
-    return service.update_note(note_id, str(current_user.id), data)
+    return await db.run_sync(lambda session: ToolsService(session).update_note(note_id, str(current_user.id), data))
 
 
 @router.delete(
@@ -390,10 +389,9 @@ async def update_note(
 async def delete_note(
     note_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """删除笔记"""
-    service = ToolsService(db)
-    return service.delete_note(note_id, str(current_user.id))
+    return await db.run_sync(lambda session: ToolsService(session).delete_note(note_id, str(current_user.id)))
 
 
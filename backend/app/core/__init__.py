@@ -1,6 +1,6 @@
 from app.core.config import settings
 from app.core.database import get_db, Base, engine
-from app.core.redis import get_redis
+from app.core.redis import get_redis, get_async_redis
 from app.core.exceptions import (
     http_exception_handler,
     validation_exception_handler,
@@ -13,6 +13,7 @@ __all__ = [
     "Base",
     "engine",
     "get_redis",
+    "get_async_redis",
     "http_exception_handler",
     "validation_exception_handler",
     "general_exception_handler"
@@ -6,8 +6,27 @@ class Settings(BaseSettings):
     # 数据库配置
     DATABASE_URL: str
     
+    # 数据库连接池配置（每个工作进程的同步/异步引擎各自一个连接池）
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: int = 10  # 等待空闲连接的最长时间，超时抛出错误而不是无限排队
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # 连接最长使用时间，避免被服务端或中间件断开
+    DB_POOL_PRE_PING: bool = True  # 取出连接前检测可用性
+    DB_STATEMENT_TIMEOUT_MS: int = 15000  # 接口请求单条语句的超时时间（0 表示不限制）
+    DB_TASK_STATEMENT_TIMEOUT_MS: int = 300000  # 后台任务与迁移脚本单条语句的超时时间
+    DB_IDLE_IN_TRANSACTION_TIMEOUT_MS: int = 60000  # 事务内空闲超时，防止未提交事务长期占用连接与锁
+    DB_PGBOUNCER_MODE: bool = False  # 经 PgBouncer 事务池连接：禁用预编译语句缓存，超时改为事务内 SET LOCAL
+    
+    # 只读副本配置
+    DATABASE_REPLICA_URLS: str = ""  # 只读副本连接串，多个用逗号分隔；为空时读请求也走主库
+    DB_REPLICA_HEALTH_CHECK_SECONDS: int = 10  # 副本健康检查间隔
+    DB_READ_YOUR_WRITES_SECONDS: int = 5  # 用户写入后读请求固定走主库的时长（覆盖副本复制延迟）
+    
     # Redis 配置
     REDIS_URL: str
+    REDIS_MAX_CONNECTIONS: int = 50  # 每个工作进程同步/异步客户端各自的连接池上限
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 5  # 连接与读写超时
+    REDIS_HEALTH_CHECK_SECONDS: int = 30  # 连接空闲超过该时长后使用前先 PING
     
     # JWT 配置
     SECRET_KEY: str
@@ -36,6 +55,70 @@ class Settings(BaseSettings):
     RATE_LIMIT_PER_MINUTE: int = 60
     LOGIN_RATE_LIMIT_PER_MINUTE: int = 10
     CODE_RATE_LIMIT_PER_HOUR: int = 10
+    RATE_LIMIT_ENABLED: bool = True
+    UPLOAD_RATE_LIMIT_PER_MINUTE: int = 30  # 上传/合并文件次数（按用户）
+    UPLOAD_CHUNK_RATE_LIMIT_PER_MINUTE: int = 600  # 切片上传次数（按用户，不计入全局限流）
+    RATE_LIMIT_LOCAL_CACHE_SIZE: int = 10000  # 本地预过滤最多记录的超限客户端数
+    
+    # 列表总数缓存配置
+    COUNT_CACHE_TTL_SECONDS: int = 300  # 精确总数缓存时间
+    COUNT_ESTIMATE_THRESHOLD: int = 10000  # 估算行数低于该值时改用精确计数
+    
+    # 探索页信息流缓存配置
+    FEED_CACHE_PAGES: int = 3  # 缓存前 N 页
+    FEED_CACHE_TTL_SECONDS: int = 60  # 新鲜期
+    FEED_CACHE_STALE_SECONDS: int = 600  # 过期后仍可返回旧数据的时长
+    FEED_CACHE_LOCK_SECONDS: int = 10  # 重建锁超时
+    
+    # 全文搜索配置
+    SEARCH_BM25_K1: float = 1.2
+    SEARCH_BM25_B: float = 0.75
+    SEARCH_MAX_QUERY_TERMS: int = 16  # 单次查询最多使用的词项数
+    SEARCH_POSTINGS_PER_TERM: int = 2000  # 每个词项最多读取的倒排记录数
+    SEARCH_MIN_MATCH_RATIO: float = 0.6  # 至少命中的查询词项比例
+    SEARCH_MAX_CANDIDATES: int = 1000  # 相关度排序的最大候选数
+    SEARCH_STATS_SHARDS: int = 16  # 语料统计分片行数（分散并发写入的行锁）
+    SEARCH_TRIGRAM_ENABLED: bool = True  # 存在 pg_trgm 索引时启用子串检索与相似度排序
+    
+    # 标签筛选配置
+    TAG_FILTER_MAX_TAGS: int = 10  # 单次筛选最多使用的标签数
+    TAG_FACET_LIMIT: int = 20  # 分面统计返回的标签数
+    
+    # 列表投影配置
+    LIST_MEDIA_PREVIEW: int = 4  # 列表项返回的图片/视频预览数量（完整列表见详情接口）
+    ALBUM_DETAIL_PREVIEW: int = 12  # 相册详情返回的照片数量（完整列表见照片分页接口）
+    
+    # 浏览记录缓冲配置
+    VIEW_DEDUP_WINDOW_SECONDS: int = 1800  # 同一访客重复浏览的去重窗口
+    VIEW_FLUSH_SECONDS: int = 10  # 缓冲区落库间隔
+    
+    # 互动状态索引配置
+    INTERACTION_INDEX_TTL_SECONDS: int = 86400  # 用户点赞/收藏/浏览集合的过期时间
+    
+    # 登录用户缓存配置（每个工作进程）
+    USER_CACHE_SIZE: int = 10000  # 最多缓存的用户数
+    USER_CACHE_TTL_SECONDS: int = 60  # 缓存有效期（失效广播之外的兜底）
+    
+    # 认证快速路径配置（每个工作进程）
+    AUTH_CLAIMS_CACHE_SIZE: int = 20000  # 已验签 Token 声明的缓存条数（有效期不超过 Token 过期时间）
+    AUTH_VALIDITY_CACHE_SECONDS: int = 5  # Token 有效性校验结果的本地缓存时间（撤销时立即广播失效）
+    
+    # 密码哈希配置
+    BCRYPT_ROUNDS: int = 12  # bcrypt 成本，修改后旧哈希在用户下次登录时自动升级
+    PASSWORD_HASH_WORKERS: int = 4  # 每个工作进程的哈希线程数
+    PASSWORD_HASH_QUEUE_SIZE: int = 64  # 排队上限，超出时直接返回繁忙
+    
+    # 相册统计配置
+    ALBUM_STATS_RECONCILE_SECONDS: int = 3600  # 汇总表整体重建间隔（修正增量维护的偏差）
+    
+    # 热门内容配置（hot_score = 加权互动数 / (发布小时数 + 2) ^ GRAVITY）
+    TRENDING_GRAVITY: float = 1.8
+    TRENDING_WEIGHT_VIEW: float = 1.0
+    TRENDING_WEIGHT_LIKE: float = 4.0
+    TRENDING_WEIGHT_COMMENT: float = 6.0
+    TRENDING_WEIGHT_SAVE: float = 8.0
+    TRENDING_REFRESH_SECONDS: int = 60  # 后台刷新间隔
+    TRENDING_TOP_K: int = 500  # 每轮额外重算衰减的头部内容数
     
     # 安全配置
     PASSWORD_MIN_LENGTH: int = 6
@@ -52,6 +135,10 @@ class Settings(BaseSettings):
     MINIO_SECURE: bool = False
     MINIO_PUBLIC_URL: str = "http://localhost:9000"
     
+    @property
+    def replica_urls_list(self) -> List[str]:
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+    
     @property
     def cors_origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
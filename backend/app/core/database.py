@@ -1,11 +1,112 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from typing import Dict
+import uuid
+
 from app.core.config import settings
+from app.core.db_metrics import InstrumentedAsyncPool, InstrumentedQueuePool, instrument
+
+
+def async_database_url(url: str) -> str:
+    """将 postgresql:// / postgresql+psycopg2:// 连接串转换为 asyncpg 驱动"""
+    scheme, sep, rest = url.partition("://")
+    if scheme.split("+")[0] in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    return url
+
+
+def _timeouts(statement_timeout_ms: int) -> Dict[str, str]:
+    """会话级超时参数（0 表示不设置）"""
+    timeouts = {
+        "statement_timeout": statement_timeout_ms,
+        "idle_in_transaction_session_timeout": settings.DB_IDLE_IN_TRANSACTION_TIMEOUT_MS,
+    }
+    return {name: str(value) for name, value in timeouts.items() if value > 0}
+
+
+def _pool_options() -> Dict:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def _set_local_timeouts(engine, timeouts: Dict[str, str]) -> None:
+    """
+    PgBouncer 事务池下连接参数不会随连接保留，改为在每个事务开始时 SET LOCAL
+    （仅对当前事务生效，不会泄漏到复用同一服务端连接的其他客户端）
+    """
+    if not timeouts:
+        return
+    statements = [f"SET LOCAL {name} = {value}" for name, value in timeouts.items()]
 
-engine = create_engine(settings.DATABASE_URL)
+    @event.listens_for(engine, "begin")
+    def _apply(conn):
+        for statement in statements:
+            conn.exec_driver_sql(statement)
+
+
+def _create_sync_engine():
+    timeouts = _timeouts(settings.DB_TASK_STATEMENT_TIMEOUT_MS)
+    connect_args = {}
+    if timeouts and not settings.DB_PGBOUNCER_MODE:
+        connect_args["options"] = " ".join(f"-c {name}={value}" for name, value in timeouts.items())
+    sync_engine = create_engine(
+        settings.DATABASE_URL,
+        poolclass=InstrumentedQueuePool,
+        connect_args=connect_args,
+        **_pool_options(),
+    )
+    if settings.DB_PGBOUNCER_MODE:
+        _set_local_timeouts(sync_engine, timeouts)
+    instrument(sync_engine, "sync")
+    return sync_engine
+
+
+def create_async_db_engine(url: str, name: str):
+    """创建带连接池配置、超时与指标的异步引擎（主库与只读副本共用）"""
+    timeouts = _timeouts(settings.DB_STATEMENT_TIMEOUT_MS)
+    connect_args = {}
+    if settings.DB_PGBOUNCER_MODE:
+        # 事务池会把同一客户端的语句分配到不同服务端连接，预编译语句必须关闭缓存并使用唯一名称
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=lambda: f"__asyncpg_{uuid.uuid4()}__",
+        )
+    elif timeouts:
+        connect_args["server_settings"] = timeouts
+    async_db_engine = create_async_engine(
+        async_database_url(url),
+        poolclass=InstrumentedAsyncPool,
+        connect_args=connect_args,
+        **_pool_options(),
+    )
+    if settings.DB_PGBOUNCER_MODE:
+        _set_local_timeouts(async_db_engine.sync_engine, timeouts)
+    instrument(async_db_engine.sync_engine, name)
+    return async_db_engine
+
+
+# 同步引擎：后台任务与迁移脚本使用
+engine = _create_sync_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 异步引擎：async def 路由使用，查询等待期间不阻塞事件循环
+async_engine = create_async_db_engine(settings.DATABASE_URL, "async")
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    # 提交后不过期属性，避免在 await 之外触发隐式加载
+    expire_on_commit=False,
+)
+
 Base = declarative_base()
 
 
@@ -16,3 +117,13 @@ def get_db():
     finally:
         db.close()
 
+
+async def get_async_db():
+    from app.core.read_replica import apply_pending_pin
+
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        finally:
+            # 已登录用户的写入提交后，在响应发出前记录读己之写标记
+            await apply_pending_pin(db)
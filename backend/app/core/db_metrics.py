@@ -0,0 +1,109 @@
+"""
+数据库连接池指标
+
+连接池取连接时按引擎记录：
+- checked_out：已借出的连接数
+- waiting：正在等待空闲连接的请求数
+- 等待耗时直方图（累计分桶，单位秒）及超时次数
+
+指标保存在进程内存中，通过 /health/db 接口查看。
+"""
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from typing import Dict, List, Optional
+import threading
+import time
+
+from app.core.metrics import Histogram
+
+# 等待耗时直方图的分桶上界（秒）
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PoolMetrics:
+    """单个连接池的取连接指标"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.timeouts = 0
+        self.wait_seconds = Histogram(WAIT_BUCKETS)
+
+    def begin_wait(self) -> None:
+        with self._lock:
+            self.waiting += 1
+
+    def end_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.waiting -= 1
+            if timed_out:
+                self.timeouts += 1
+        if not timed_out:
+            self.wait_seconds.observe(seconds)
+
+    def snapshot(self, pool: QueuePool) -> Dict:
+        """当前指标快照"""
+        return {
+            "name": self.name,
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "waiting": self.waiting,
+            "timeouts": self.timeouts,
+            "wait_seconds": self.wait_seconds.snapshot(),
+        }
+
+
+class _InstrumentedPoolMixin:
+    """在取连接时记录等待数与等待耗时"""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        metrics = self.metrics
+        if metrics is None:
+            return super()._do_get()
+        metrics.begin_wait()
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            metrics.end_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        except BaseException:
+            metrics.end_wait(time.perf_counter() - started)
+            raise
+        metrics.end_wait(time.perf_counter() - started)
+        return conn
+
+    def recreate(self):
+        # engine.dispose() 会重建连接池，指标沿用到新池
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    """带指标的同步连接池"""
+
+
+class InstrumentedAsyncPool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """带指标的异步连接池"""
+
+
+def instrument(engine, name: str) -> PoolMetrics:
+    """为引擎的连接池挂载指标"""
+    metrics = PoolMetrics(name)
+    engine.pool.metrics = metrics
+    return metrics
+
+
+def pool_status(*engines) -> List[Dict]:
+    """各引擎连接池的指标快照"""
+    return [
+        engine.pool.metrics.snapshot(engine.pool)
+        for engine in engines
+        if getattr(engine.pool, "metrics", None) is not None
+    ]
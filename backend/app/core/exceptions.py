@@ -41,6 +41,7 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
         "无效的 token 类型": 401,
         "用户不存在": 401,
         "当前密码错误": 401,
+        "服务繁忙，请稍后再试": 503,
     }
     
     detail = str(exc.detail)
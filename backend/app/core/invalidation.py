@@ -0,0 +1,82 @@
+"""
+跨进程缓存失效广播
+
+各工作进程的进程内缓存（登录用户、Token 校验结果等）通过 Redis pub/sub 同步失效：
+写入方 publish(频道, 键)，每个进程的订阅线程收到后调用该频道注册的处理函数。
+订阅断开期间的消息会丢失，因此（重新）订阅成功时会调用各频道的 on_reset 清空缓存。
+"""
+from typing import Callable, Dict, Optional
+import logging
+import threading
+
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+_handlers: Dict[str, Callable[[str], None]] = {}
+_reset_handlers: Dict[str, Callable[[], None]] = {}
+
+_listener: Optional[threading.Thread] = None
+_stop_event = threading.Event()
+
+
+def subscribe(channel: str, handler: Callable[[str], None], on_reset: Optional[Callable[[], None]] = None) -> None:
+    """注册频道处理函数（需在 start_listener 之前调用，通常在模块导入时）"""
+    _handlers[channel] = handler
+    if on_reset is not None:
+        _reset_handlers[channel] = on_reset
+
+
+def publish(channel: str, message: str) -> None:
+    """广播失效消息，本进程同样会通过订阅线程收到"""
+    try:
+        get_redis().publish(channel, message)
+    except Exception as e:
+        logger.warning(f"⚠️  广播缓存失效失败 - 频道: {channel}, 错误: {str(e)}")
+
+
+def _reset_all() -> None:
+    for reset in _reset_handlers.values():
+        reset()
+
+
+def _listen() -> None:
+    while not _stop_event.is_set():
+        pubsub = None
+        try:
+            pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(*_handlers)
+            # 订阅（重新）建立前的失效消息可能已丢失
+            _reset_all()
+            while not _stop_event.is_set():
+                message = pubsub.get_message(timeout=1.0)
+                if message and message["type"] == "message":
+                    handler = _handlers.get(message["channel"])
+                    if handler is not None:
+                        handler(message["data"])
+        except Exception as e:
+            logger.warning(f"⚠️  缓存失效订阅中断，稍后重连 - 错误: {str(e)}")
+            _reset_all()
+            _stop_event.wait(5)
+        finally:
+            if pubsub is not None:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+
+
+def start_listener() -> None:
+    """启动订阅线程（应用启动时调用）"""
+    global _listener
+    if _listener is not None or not _handlers:
+        return
+    _stop_event.clear()
+    _listener = threading.Thread(target=_listen, name="cache-invalidation", daemon=True)
+    _listener.start()
+
+
+def stop_listener() -> None:
+    global _listener
+    _stop_event.set()
+    _listener = None
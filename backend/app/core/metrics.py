@@ -0,0 +1,65 @@
+"""
+进程内指标
+
+耗时直方图与计数器，保存在进程内存中，通过 /health/* 接口查看。
+"""
+from typing import Dict, Sequence
+import threading
+
+# 默认耗时分桶上界（秒）
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """累计分桶直方图"""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.sum += value
+            for index, upper in enumerate(self.buckets):
+                if value <= upper:
+                    self._counts[index] += 1
+                    break
+            else:
+                self._counts[-1] += 1
+
+    def snapshot(self) -> Dict:
+        """快照（buckets 为累计计数，+Inf 即总次数）"""
+        with self._lock:
+            cumulative = []
+            running = 0
+            for count in self._counts:
+                running += count
+                cumulative.append(running)
+            return {
+                "count": self.count,
+                "sum": round(self.sum, 6),
+                "buckets": {
+                    **{str(upper): cumulative[i] for i, upper in enumerate(self.buckets)},
+                    "+Inf": cumulative[-1],
+                },
+            }
+
+
+class Counters:
+    """按名称累加的计数器"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[str, int] = {}
+
+    def inc(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._values[name] = self._values.get(name, 0) + amount
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._values)
@@ -0,0 +1,263 @@
+"""
+请求限流
+
+RateLimitMiddleware 在路由与依赖之前执行，被限流的请求不会进入密码校验或数据库查询：
+- 全局策略：每个用户（未登录按 IP）RATE_LIMIT_PER_MINUTE 次/分钟，令牌桶，允许短时突发
+- 路由策略：登录、发送验证码按 IP 滑动窗口，上传与切片上传按用户令牌桶
+- 一个请求命中的全部策略由一段 Lua 脚本一次往返原子判定：任一策略超限则整体拒绝且不消耗配额
+- 本地预过滤：Redis 判定超限后，在重试时间内同一客户端的请求直接在进程内拒绝，不再访问 Redis
+
+Redis 不可用时放行请求（限流失效优于全站不可用）。
+"""
+from dataclasses import dataclass
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
+from typing import List, Optional, Tuple
+import logging
+import math
+import time
+import uuid
+
+from app.core.config import settings
+from app.core.redis import get_async_redis
+from app.services.token_cache import cached_claims, token_digest
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+ALGORITHM_SLIDING_WINDOW = "sw"
+ALGORITHM_TOKEN_BUCKET = "tb"
+
+KEY_BY_IP = "ip"
+KEY_BY_USER = "user"  # 未登录时退化为 IP
+
+# 不参与限流的路径（健康检查、文档）
+_EXEMPT_PREFIXES = ("/health", "/docs", "/redoc", "/openapi.json")
+
+# KEYS：各策略的计数键；ARGV：每个策略 (算法, 上限, 窗口毫秒)，最后一个为本次请求的唯一标识
+# 返回 {是否放行, 需等待毫秒数, 剩余次数（各策略最小值）}
+_CHECK_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local nonce = ARGV[#ARGV]
+local allowed = 1
+local retry = 0
+local remaining = -1
+local tokens = {}
+
+for i, key in ipairs(KEYS) do
+    local algo = ARGV[(i - 1) * 3 + 1]
+    local limit = tonumber(ARGV[(i - 1) * 3 + 2])
+    local window = tonumber(ARGV[(i - 1) * 3 + 3])
+    local left
+    if algo == 'sw' then
+        redis.call('ZREMRANGEBYSCORE', key, 0, now - window)
+        local count = redis.call('ZCARD', key)
+        left = limit - count
+        if left <= 0 then
+            allowed = 0
+            local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+            local wait = window
+            if oldest[2] then
+                wait = window - (now - tonumber(oldest[2]))
+            end
+            retry = math.max(retry, wait)
+        end
+    else
+        local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+        local current = tonumber(bucket[1]) or limit
+        local ts = tonumber(bucket[2]) or now
+        current = math.min(limit, current + math.max(0, now - ts) * limit / window)
+        tokens[i] = current
+        left = math.floor(current)
+        if current < 1 then
+            allowed = 0
+            retry = math.max(retry, math.ceil((1 - current) * window / limit))
+        end
+    end
+    if remaining < 0 or left < remaining then
+        remaining = left
+    end
+end
+
+for i, key in ipairs(KEYS) do
+    local algo = ARGV[(i - 1) * 3 + 1]
+    local window = tonumber(ARGV[(i - 1) * 3 + 3])
+    if algo == 'sw' then
+        if allowed == 1 then
+            redis.call('ZADD', key, now, now .. ':' .. nonce)
+        end
+    else
+        local current = tokens[i]
+        if allowed == 1 then
+            current = current - 1
+        end
+        redis.call('HSET', key, 'tokens', current, 'ts', now)
+    end
+    redis.call('PEXPIRE', key, window)
+end
+
+if allowed == 1 then
+    remaining = remaining - 1
+end
+return {allowed, retry, math.max(remaining, 0)}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """限流策略"""
+    name: str
+    limit: int
+    window_seconds: int
+    key_by: str = KEY_BY_USER
+    algorithm: str = ALGORITHM_TOKEN_BUCKET
+    methods: Tuple[str, ...] = ()  # 为空表示所有方法
+    path_prefixes: Tuple[str, ...] = ()  # 为空表示所有路径
+    exclude_prefixes: Tuple[str, ...] = ()
+
+    def matches(self, method: str, path: str) -> bool:
+        if self.methods and method not in self.methods:
+            return False
+        if self.exclude_prefixes and path.startswith(self.exclude_prefixes):
+            return False
+        return not self.path_prefixes or path.startswith(self.path_prefixes)
+
+
+def default_policies() -> List[RateLimitPolicy]:
+    return [
+        # 大文件切片数量多，单独限流，不占用全局配额
+        RateLimitPolicy(
+            "global", settings.RATE_LIMIT_PER_MINUTE, 60,
+            exclude_prefixes=("/api/v1/upload/chunk",),
+        ),
+        RateLimitPolicy(
+            "login", settings.LOGIN_RATE_LIMIT_PER_MINUTE, 60,
+            key_by=KEY_BY_IP, algorithm=ALGORITHM_SLIDING_WINDOW,
+            methods=("POST",), path_prefixes=("/api/auth/login",),
+        ),
+        RateLimitPolicy(
+            "send_code", settings.CODE_RATE_LIMIT_PER_HOUR, 3600,
+            key_by=KEY_BY_IP, algorithm=ALGORITHM_SLIDING_WINDOW,
+            methods=("POST",), path_prefixes=("/api/auth/send-code",),
+        ),
+        RateLimitPolicy(
+            "upload", settings.UPLOAD_RATE_LIMIT_PER_MINUTE, 60,
+            methods=("POST",), path_prefixes=("/api/upload", "/api/v1/upload/merge"),
+        ),
+        RateLimitPolicy(
+            "upload_chunk", settings.UPLOAD_CHUNK_RATE_LIMIT_PER_MINUTE, 60,
+            methods=("POST",), path_prefixes=("/api/v1/upload/chunk",),
+        ),
+    ]
+
+
+@dataclass
+class Decision:
+    allowed: bool
+    limit: int
+    remaining: int = 0
+    retry_after: int = 0  # 秒
+
+
+class RateLimiter:
+    """按策略判定请求是否放行"""
+
+    def __init__(self, policies: List[RateLimitPolicy]):
+        self.policies = [policy for policy in policies if policy.limit > 0]
+        # 本地预过滤：计数键 -> 解封时间（time.monotonic）
+        self._blocked = TTLCache(settings.RATE_LIMIT_LOCAL_CACHE_SIZE, 3600)
+        self._script = get_async_redis().register_script(_CHECK_SCRIPT)
+
+    @staticmethod
+    def _identity(request: Request, key_by: str) -> str:
+        if key_by == KEY_BY_USER:
+            auth_header = request.headers.get("authorization")
+            if auth_header and auth_header.startswith("Bearer "):
+                token = auth_header[len("Bearer "):]
+                claims = cached_claims(token, token_digest(token))
+                if claims and claims.get("sub"):
+                    return f"u:{claims['sub']}"
+        return f"ip:{request.client.host if request.client else 'unknown'}"
+
+    async def check(self, request: Request) -> Optional[Decision]:
+        """返回限流判定；没有匹配的策略时返回 None"""
+        matched = [p for p in self.policies if p.matches(request.method, request.url.path)]
+        if not matched:
+            return None
+        keys = [f"rl:{p.name}:{self._identity(request, p.key_by)}" for p in matched]
+        limit = min(p.limit for p in matched)
+
+        now = time.monotonic()
+        blocked_until = max((self._blocked.get(key) or 0 for key in keys), default=0)
+        if blocked_until > now:
+            return Decision(allowed=False, limit=limit, retry_after=math.ceil(blocked_until - now))
+
+        args: List = []
+        for policy in matched:
+            args.extend([policy.algorithm, policy.limit, policy.window_seconds * 1000])
+        args.append(uuid.uuid4().hex)
+        try:
+            allowed, retry_ms, remaining = await self._script(keys=keys, args=args)
+        except Exception as e:
+            logger.warning(f"⚠️  限流检查失败，放行请求 - 错误: {str(e)}")
+            return None
+
+        if allowed:
+            return Decision(allowed=True, limit=limit, remaining=int(remaining))
+        retry_after = max(1, math.ceil(int(retry_ms) / 1000))
+        for key in keys:
+            self._blocked.put(key, now + retry_after, retry_after)
+        return Decision(allowed=False, limit=limit, retry_after=retry_after)
+
+
+class RateLimitMiddleware:
+    """限流中间件（纯 ASGI 实现，不缓冲请求体）"""
+
+    def __init__(self, app: ASGIApp, policies: Optional[List[RateLimitPolicy]] = None):
+        self.app = app
+        self.limiter = RateLimiter(policies if policies is not None else default_policies())
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            not settings.RATE_LIMIT_ENABLED
+            or scope["type"] != "http"
+            or scope["method"] == "OPTIONS"
+            or scope["path"].startswith(_EXEMPT_PREFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        decision = await self.limiter.check(Request(scope))
+        if decision is None:
+            await self.app(scope, receive, send)
+            return
+        if not decision.allowed:
+            response = JSONResponse(
+                status_code=status.HTTP_200_OK,  # HTTP 状态码始终返回 200，业务码见 code
+                content={
+                    "code": 429,
+                    "data": None,
+                    "msg": "error",
+                    "errMsg": "请求过于频繁，请稍后再试",
+                },
+                headers={
+                    "Retry-After": str(decision.retry_after),
+                    "X-RateLimit-Limit": str(decision.limit),
+                    "X-RateLimit-Remaining": "0",
+                },
+            )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-ratelimit-limit", str(decision.limit).encode()))
+                headers.append((b"x-ratelimit-remaining", str(decision.remaining).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -0,0 +1,153 @@
+"""
+读写分离
+
+读多写少的查询（列表、搜索、统计）通过 get_read_db 绑定到只读副本：
+- 多个副本轮询选择，跳过健康检查失败的副本；没有可用副本时回退到主库
+- 后台协程按 DB_REPLICA_HEALTH_CHECK_SECONDS 间隔对每个副本执行 SELECT 1
+- 读己之写：已登录用户的会话提交后，在 DB_READ_YOUR_WRITES_SECONDS 内
+  该用户的读请求固定走主库，避免因复制延迟看不到自己刚写入的数据。
+  提交回调只在会话中记录待固定的用户，由 get_async_db 在请求结束、响应发出前
+  使用异步客户端写入标记，不在事件循环线程上执行同步 Redis 调用
+
+本地测试可在同一台机器上再启动一个 PostgreSQL 实例作为流复制副本，
+将其连接串配置到 DATABASE_REPLICA_URLS。
+"""
+from fastapi import Request
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+from typing import List, Optional
+import asyncio
+import itertools
+import logging
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, create_async_db_engine
+from app.core.redis import get_async_redis
+from app.services.token_cache import cached_claims, token_digest
+
+logger = logging.getLogger(__name__)
+
+# 会话 info 中记录当前登录用户的键（由认证依赖写入）
+SESSION_USER_KEY = "user_id"
+# 会话 info 中记录提交后待固定到主库的用户
+PENDING_PIN_KEY = "pending_pin_user_id"
+
+_HEALTH_CHECK_TIMEOUT_SECONDS = 3
+
+
+def _pin_key(user_id: str) -> str:
+    return f"db:pin:{user_id}"
+
+
+async def pin_to_primary(user_id: str) -> None:
+    """用户写入后的一段时间内读请求固定走主库"""
+    try:
+        await get_async_redis().set(_pin_key(user_id), "1", ex=settings.DB_READ_YOUR_WRITES_SECONDS)
+    except Exception as e:
+        logger.warning(f"⚠️  记录主库读写标记失败 - 用户ID: {user_id}, 错误: {str(e)}")
+
+
+async def is_pinned(user_id: str) -> bool:
+    try:
+        return bool(await get_async_redis().exists(_pin_key(user_id)))
+    except Exception:
+        # 无法确认时走主库，保证读到最新数据
+        return True
+
+
+@event.listens_for(Session, "after_commit")
+def _pin_after_commit(session: Session) -> None:
+    user_id = session.info.get(SESSION_USER_KEY)
+    if user_id and settings.DB_READ_YOUR_WRITES_SECONDS > 0 and replicas.engines:
+        session.info[PENDING_PIN_KEY] = user_id
+
+
+async def apply_pending_pin(db: AsyncSession) -> None:
+    """写入会话提交后记录的主库固定标记（由 get_async_db 在请求结束时调用）"""
+    user_id = db.info.pop(PENDING_PIN_KEY, None)
+    if user_id:
+        await pin_to_primary(user_id)
+
+
+class ReplicaSet:
+    """只读副本集合（轮询 + 健康检查）"""
+
+    def __init__(self, urls: List[str]):
+        self.engines = [
+            create_async_db_engine(url, f"replica-{index}") for index, url in enumerate(urls)
+        ]
+        self.sessionmakers = [
+            async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+            for engine in self.engines
+        ]
+        self.healthy = [True] * len(self.engines)
+        self._counter = itertools.count()
+
+    def pick(self) -> Optional[async_sessionmaker]:
+        """轮询选择一个健康的副本，全部不可用时返回 None"""
+        total = len(self.engines)
+        for _ in range(total):
+            index = next(self._counter) % total
+            if self.healthy[index]:
+                return self.sessionmakers[index]
+        return None
+
+    async def check(self) -> None:
+        """对每个副本执行一次健康检查"""
+        for index, engine in enumerate(self.engines):
+            try:
+                async with engine.connect() as conn:
+                    await asyncio.wait_for(conn.execute(text("SELECT 1")), _HEALTH_CHECK_TIMEOUT_SECONDS)
+                healthy = True
+            except Exception as e:
+                healthy = False
+                if self.healthy[index]:
+                    logger.warning(f"⚠️  只读副本不可用，读请求暂时回退 - 副本: replica-{index}, 错误: {str(e)}")
+            if healthy and not self.healthy[index]:
+                logger.info(f"✅ 只读副本已恢复 - 副本: replica-{index}")
+            self.healthy[index] = healthy
+
+    async def run_health_checks(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(settings.DB_REPLICA_HEALTH_CHECK_SECONDS)
+
+
+replicas = ReplicaSet(settings.replica_urls_list)
+_health_task: Optional[asyncio.Task] = None
+
+
+def start_health_checks() -> None:
+    """应用启动时开始副本健康检查（需在事件循环中调用）"""
+    global _health_task
+    if replicas.engines and _health_task is None:
+        _health_task = asyncio.get_running_loop().create_task(replicas.run_health_checks())
+
+
+def stop_health_checks() -> None:
+    global _health_task
+    if _health_task is not None:
+        _health_task.cancel()
+        _health_task = None
+
+
+def _request_user_id(request: Request) -> Optional[str]:
+    """从 Bearer Token 中取用户 ID（仅用于读库路由，不做有效性校验）"""
+    auth_header = request.headers.get("authorization")
+    if not auth_header or not auth_header.startswith("Bearer "):
+        return None
+    token = auth_header.replace("Bearer ", "")
+    payload = cached_claims(token, token_digest(token))
+    return payload.get("sub") if payload else None
+
+
+async def get_read_db(request: Request):
+    """只读会话：优先使用副本，读己之写窗口内或无可用副本时使用主库"""
+    sessionmaker_ = None
+    if replicas.engines:
+        user_id = _request_user_id(request)
+        if not (user_id and await is_pinned(user_id)):
+            sessionmaker_ = replicas.pick()
+    async with (sessionmaker_ or AsyncSessionLocal)() as db:
+        yield db
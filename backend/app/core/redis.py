@@ -1,9 +1,49 @@
+"""
+Redis 客户端
+
+- 异步客户端（redis.asyncio）：async def 路由与依赖中使用，等待期间不阻塞事件循环
+- 同步客户端：后台线程任务、会话事件回调以及在 run_sync 中执行的服务层缓存使用
+
+两者各自维护一个连接池，容量、超时与健康检查间隔由配置决定：
+- 异步连接池连接数达到上限时等待空闲连接（最长 REDIS_SOCKET_TIMEOUT_SECONDS），等待期间让出事件循环
+- 同步连接池不等待，连接数达到上限时立即报错：run_sync 中的调用运行在事件循环线程上，
+  等待连接会阻塞整个循环；调用方捕获异常后按缓存未命中处理
+"""
 import redis
+import redis.asyncio as aioredis
 from app.core.config import settings
 
-redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+def _pool_options() -> dict:
+    return {
+        "decode_responses": True,
+        "max_connections": settings.REDIS_MAX_CONNECTIONS,
+        "socket_timeout": settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+        "socket_connect_timeout": settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+        # 空闲超过该时长的连接在使用前先 PING，避免拿到已被服务端断开的连接
+        "health_check_interval": settings.REDIS_HEALTH_CHECK_SECONDS,
+    }
+
+
+redis_pool = redis.ConnectionPool.from_url(settings.REDIS_URL, **_pool_options())
+redis_client = redis.Redis(connection_pool=redis_pool)
+
+async_redis_pool = aioredis.BlockingConnectionPool.from_url(
+    settings.REDIS_URL,
+    timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+    **_pool_options(),
+)
+async_redis_client = aioredis.Redis(connection_pool=async_redis_pool)
 
 
 def get_redis():
     return redis_client
 
+
+def get_async_redis():
+    return async_redis_client
+
+
+async def close_async_redis():
+    """关闭异步连接池（应用退出时调用）"""
+    await async_redis_pool.disconnect()
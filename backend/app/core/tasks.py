@@ -0,0 +1,108 @@
+"""
+后台周期任务
+
+应用启动时为每个已注册的任务启动一个守护线程，按固定间隔执行；
+每次执行使用独立的数据库会话。多实例部署时通过 Redis 锁保证
+同一时间只有一个实例在执行同一任务：锁带持有者标识，执行期间不会过期，
+执行结束后由持有者保留到本轮间隔结束（各实例合计每个间隔只执行一次）。
+无法获取锁（Redis 不可用）时本轮跳过。
+"""
+from dataclasses import dataclass
+from typing import Callable, List
+import logging
+import threading
+import time
+import uuid
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PeriodicTask:
+    """周期任务定义"""
+    name: str
+    interval_seconds: float
+    func: Callable[[Session], object]
+
+
+_tasks: List[PeriodicTask] = []
+_threads: List[threading.Thread] = []
+_stop_event = threading.Event()
+
+# 持有者执行结束后：已超过保留时间则删除锁，否则把过期时间缩短为剩余的保留时间
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+local hold = tonumber(ARGV[2])
+if hold > 0 then
+    redis.call('PEXPIRE', KEYS[1], hold)
+else
+    redis.call('DEL', KEYS[1])
+end
+return 1
+"""
+
+
+def register_task(name: str, interval_seconds: float, func: Callable[[Session], object]) -> None:
+    """注册周期任务（需在 start_tasks 之前调用）"""
+    _tasks.append(PeriodicTask(name=name, interval_seconds=interval_seconds, func=func))
+
+
+def run_task_once(task: PeriodicTask) -> None:
+    """执行一次任务：抢占分布式锁后在独立会话中运行"""
+    lock_key = f"task:lock:{task.name}"
+    token = uuid.uuid4().hex
+    started = time.monotonic()
+    # 锁的过期时间覆盖单次执行的最长时间（语句超时），实例崩溃后由过期释放
+    lock_seconds = max(task.interval_seconds, settings.DB_TASK_STATEMENT_TIMEOUT_MS / 1000)
+    try:
+        if not get_redis().set(lock_key, token, nx=True, px=int(lock_seconds * 1000)):
+            return
+    except Exception as e:
+        logger.warning(f"⚠️  获取任务锁失败，跳过本轮 - 任务: {task.name}, 错误: {str(e)}")
+        return
+
+    db = SessionLocal()
+    try:
+        task.func(db)
+    except Exception as e:
+        logger.error(f"❌ 后台任务执行失败 - 任务: {task.name}, 错误: {str(e)}", exc_info=True)
+        db.rollback()
+    finally:
+        db.close()
+        # 保留到本轮间隔的 90%，避免其他实例紧接着重复执行
+        hold_ms = int((task.interval_seconds * 0.9 - (time.monotonic() - started)) * 1000)
+        try:
+            get_redis().eval(_RELEASE_SCRIPT, 1, lock_key, token, max(hold_ms, 0))
+        except Exception as e:
+            logger.warning(f"⚠️  释放任务锁失败 - 任务: {task.name}, 错误: {str(e)}")
+
+
+def _loop(task: PeriodicTask) -> None:
+    while not _stop_event.wait(task.interval_seconds):
+        run_task_once(task)
+
+
+def start_tasks() -> None:
+    """启动所有已注册的任务"""
+    _stop_event.clear()
+    for task in _tasks:
+        thread = threading.Thread(target=_loop, args=(task,), name=f"task-{task.name}", daemon=True)
+        thread.start()
+        _threads.append(thread)
+        logger.info(f"⏱️  后台任务已启动 - 任务: {task.name}, 间隔: {task.interval_seconds}s")
+
+
+def stop_tasks() -> None:
+    """通知所有任务线程退出"""
+    _stop_event.set()
+    for thread in _threads:
+        thread.join(timeout=5)
+    _threads.clear()
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, Integer, DateTime, Index
+from datetime import datetime
+
+from app.core.database import Base
+
+
+class AlbumStat(Base):
+    """
+    相册统计汇总（按地点/标签/年/月/日分桶）
+
+    scope 为 "public"（全部公开相册）或用户 ID（该用户的全部相册，含私密）
+    """
+    __tablename__ = "album_stats"
+
+    scope = Column(String(36), primary_key=True)
+    dimension = Column(String(16), primary_key=True)  # location/tag/year/month/day
+    bucket = Column(String(200), primary_key=True)  # 地点、标签或时间键（2024 / 2024-05 / 2024-05-01）
+    album_count = Column(Integer, nullable=False, default=0)
+    photo_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # 统计列表按相册数倒序分页
+        Index("idx_album_stats_scope_dimension_count", "scope", "dimension", "album_count"),
+    )
+
+    def __repr__(self):
+        return f"<AlbumStat {self.scope}/{self.dimension}/{self.bucket} albums={self.album_count}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey, Integer, Enum as SQLEnum, JSON
+from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey, Integer, BigInteger, Float, Index, UniqueConstraint, Enum as SQLEnum, JSON, text
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -45,6 +45,7 @@ class Content(Base):
     like_count = Column(Integer, default=0)  # 点赞数
     comment_count = Column(Integer, default=0)  # 评论数
     save_count = Column(Integer, default=0)  # 收藏数
+    hot_score = Column(Float, nullable=False, default=0, server_default="0")  # 热度分（后台任务按时间衰减刷新）
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -54,6 +55,20 @@ class Content(Base):
     likes = relationship("ContentLike", back_populates="content", cascade="all, delete-orphan")
     saves = relationship("ContentSave", back_populates="content", cascade="all, delete-orphan")
     comments = relationship("Comment", back_populates="content", cascade="all, delete-orphan")
+    photos = relationship("AlbumPhoto", back_populates="content", cascade="all, delete-orphan",
+                          passive_deletes=True, lazy="noload")
+
+    # 游标分页索引：与 ORDER BY created_at DESC, id DESC 及常用筛选条件匹配
+    __table_args__ = (
+        Index("idx_contents_created_at_id", "created_at", "id"),
+        Index("idx_contents_public_type_created_at_id", "is_public", "type", "created_at", "id"),
+        Index("idx_contents_public_created_at_id", "is_public", "created_at", "id"),
+        Index("idx_contents_user_created_at_id", "user_id", "created_at", "id"),
+        # 标签筛选（&& / @>）
+        Index("idx_contents_tags_gin", "tags", postgresql_using="gin"),
+        # 热门信息流：ORDER BY hot_score DESC, id DESC
+        Index("idx_contents_public_hot_score_id", "is_public", "hot_score", "id"),
+    )
 
     def __repr__(self):
         return f"<Content {self.title}>"
@@ -72,6 +87,13 @@ class ContentLike(Base):
     content = relationship("Content", back_populates="likes")
     user = relationship("User")
 
+    __table_args__ = (
+        # 切换时依赖 INSERT ... ON CONFLICT (content_id, user_id)
+        UniqueConstraint("content_id", "user_id", name="uq_content_likes_content_user"),
+        # 我的点赞：WHERE user_id = ? ORDER BY created_at DESC
+        Index("idx_content_likes_user_created_at", "user_id", "created_at"),
+    )
+
     def __repr__(self):
         return f"<ContentLike content_id={self.content_id} user_id={self.user_id}>"
 
@@ -89,10 +111,43 @@ class ContentSave(Base):
     content = relationship("Content", back_populates="saves")
     user = relationship("User")
 
+    __table_args__ = (
+        # 切换时依赖 INSERT ... ON CONFLICT (content_id, user_id)
+        UniqueConstraint("content_id", "user_id", name="uq_content_saves_content_user"),
+        # 用户收藏集合加载：WHERE user_id = ?
+        Index("idx_content_saves_user_created_at", "user_id", "created_at"),
+    )
+
     def __repr__(self):
         return f"<ContentSave content_id={self.content_id} user_id={self.user_id}>"
 
 
+class AlbumPhoto(Base):
+    """相册照片（与 Content.images 顺序一致，附带单张照片的元数据）"""
+    __tablename__ = "album_photos"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    content_id = Column(UUID(as_uuid=True), ForeignKey("contents.id", ondelete="CASCADE"), nullable=False)
+    position = Column(Integer, nullable=False)  # 在相册中的位置（从 0 开始）
+    object_key = Column(String(500), nullable=False)  # 图片 URL / 对象存储键
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    size = Column(BigInteger, nullable=True)  # 文件大小（字节）
+    taken_at = Column(DateTime, nullable=True)  # 拍摄时间
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # 关系
+    content = relationship("Content", back_populates="photos")
+
+    __table_args__ = (
+        # 照片分页：WHERE content_id = ? AND position > ? ORDER BY position
+        UniqueConstraint("content_id", "position", name="uq_album_photos_content_position"),
+    )
+
+    def __repr__(self):
+        return f"<AlbumPhoto content_id={self.content_id} position={self.position}>"
+
+
 class Comment(Base):
     """评论"""
     __tablename__ = "comments"
@@ -102,6 +157,10 @@ class Comment(Base):
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     comment_text = Column(Text, nullable=False)
     parent_id = Column(UUID(as_uuid=True), ForeignKey("comments.id", ondelete="CASCADE"), nullable=True)  # 父评论ID（用于回复）
+    root_id = Column(UUID(as_uuid=True), nullable=True)  # 所属线程的根评论ID（根评论为自身）
+    path = Column(Text(collation="C"), nullable=True)  # 物化路径（见 app/services/comment_thread.py）
+    depth = Column(Integer, default=0, server_default="0")  # 层级，根评论为 0
+    descendant_count = Column(Integer, default=0, server_default="0")  # 子树评论数（不含自身）
     like_count = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -112,6 +171,18 @@ class Comment(Base):
     parent = relationship("Comment", remote_side=[id], backref="replies")
     likes = relationship("CommentLike", back_populates="comment", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # 顶级评论列表：WHERE content_id = ? AND parent_id IS NULL ORDER BY created_at DESC, id DESC
+        Index("idx_comments_content_top_created_at_id", "content_id", "created_at", "id",
+              postgresql_where=text("parent_id IS NULL")),
+        # 回复预览（按 parent_id 分区的窗口函数）、回复数与回复游标分页
+        Index("idx_comments_parent_created_at_id", "parent_id", "created_at", "id"),
+        # 子树范围扫描：WHERE root_id = ? AND path > ? AND path < ? ORDER BY path
+        Index("idx_comments_root_path", "root_id", "path"),
+        # 我的评论：WHERE user_id = ? ORDER BY created_at DESC
+        Index("idx_comments_user_created_at", "user_id", "created_at"),
+    )
+
     def __repr__(self):
         return f"<Comment id={self.id} content_id={self.content_id}>"
 
@@ -129,6 +200,11 @@ class CommentLike(Base):
     comment = relationship("Comment", back_populates="likes")
     user = relationship("User")
 
+    __table_args__ = (
+        # 切换时依赖 INSERT ... ON CONFLICT (comment_id, user_id)
+        UniqueConstraint("comment_id", "user_id", name="uq_comment_likes_comment_user"),
+    )
+
     def __repr__(self):
         return f"<CommentLike comment_id={self.comment_id} user_id={self.user_id}>"
 
@@ -147,6 +223,24 @@ class ContentView(Base):
     content = relationship("Content")
     user = relationship("User")
 
+    __table_args__ = (
+        # 浏览缓冲落库时 INSERT ... ON CONFLICT (content_id, user_id)
+        UniqueConstraint("content_id", "user_id", name="uq_content_views_content_user"),
+        # 浏览历史按最后浏览时间倒序
+        Index("idx_content_views_user_updated_at", "user_id", "updated_at"),
+    )
+
     def __repr__(self):
         return f"<ContentView content_id={self.content_id} user_id={self.user_id}>"
 
+
+
+class ViewFlushBatch(Base):
+    """已写入数据库的浏览缓冲批次（与累加浏览量在同一事务中记录，重复执行同一批次时跳过）"""
+    __tablename__ = "view_flush_batches"
+
+    batch_id = Column(String(32), primary_key=True)
+    flushed_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f"<ViewFlushBatch {self.batch_id}>"
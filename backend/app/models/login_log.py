@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 import uuid
@@ -22,6 +22,11 @@ class LoginLog(Base):
     status = Column(String(20), nullable=False, default="success")  # success, failed
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
+    __table_args__ = (
+        # 登录日志：WHERE user_id = ? ORDER BY created_at DESC
+        Index("idx_login_logs_user_created_at", "user_id", "created_at"),
+    )
+    
     def __repr__(self):
         return f"<LoginLog {self.user_id} - {self.ip_address}>"
 
@@ -42,6 +47,11 @@ class LoginDevice(Base):
     last_active = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
+    __table_args__ = (
+        # 设备列表：WHERE user_id = ? ORDER BY last_active DESC
+        Index("idx_login_devices_user_last_active", "user_id", "last_active"),
+    )
+    
     def __repr__(self):
         return f"<LoginDevice {self.device_name}>"
 
@@ -0,0 +1,59 @@
+from sqlalchemy import Column, String, Integer, Float, BigInteger, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+
+from app.core.database import Base
+
+
+class SearchDocument(Base):
+    """搜索文档（每条公开内容一条）"""
+    __tablename__ = "search_documents"
+
+    content_id = Column(UUID(as_uuid=True), ForeignKey("contents.id", ondelete="CASCADE"), primary_key=True)
+    length = Column(Float, nullable=False, default=0)  # 加权词数（标题/描述/正文权重不同）
+    indexed_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SearchDocument content_id={self.content_id}>"
+
+
+class SearchTerm(Base):
+    """搜索词项（文档频率，用于计算 IDF）"""
+    __tablename__ = "search_terms"
+
+    term = Column(String(32), primary_key=True)
+    doc_freq = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<SearchTerm {self.term} df={self.doc_freq}>"
+
+
+class SearchPosting(Base):
+    """倒排记录：词项 -> 内容，impact 为索引时预先计算的 BM25 词项权重"""
+    __tablename__ = "search_postings"
+
+    term = Column(String(32), primary_key=True)
+    content_id = Column(UUID(as_uuid=True), ForeignKey("contents.id", ondelete="CASCADE"), primary_key=True)
+    tf = Column(Float, nullable=False)  # 加权词频
+    impact = Column(Float, nullable=False)  # tf * (k1 + 1) / (tf + k1 * (1 - b + b * len / avg_len))
+
+    __table_args__ = (
+        # 按 impact 倒序读取每个词项的前 N 条记录，保证查询耗时不随数据量增长
+        Index("idx_search_postings_term_impact", "term", "impact"),
+        Index("idx_search_postings_content_id", "content_id"),
+    )
+
+    def __repr__(self):
+        return f"<SearchPosting {self.term} -> {self.content_id}>"
+
+
+class SearchStats(Base):
+    """语料统计（按 id 分片，读取时各行求和），用于计算平均文档长度和 IDF"""
+    __tablename__ = "search_stats"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    doc_count = Column(BigInteger, nullable=False, default=0)
+    total_length = Column(Float, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<SearchStats docs={self.doc_count}>"
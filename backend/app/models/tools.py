@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Text, JSON, Enum as SQLEnum
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Text, JSON, Index, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 import uuid
 import enum
@@ -78,6 +78,10 @@ class Countdown(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        Index("idx_countdowns_user_target_date", "user_id", "target_date"),
+    )
 
 
 class Todo(Base):
@@ -95,7 +99,7 @@ class Todo(Base):
     due_date = Column(DateTime(timezone=True), nullable=True)  # 截止日期
     completed_at = Column(DateTime(timezone=True), nullable=True)  # 完成时间
     
-    tags = Column(JSON, default=list)  # 标签
+    tags = Column(JSONB, default=list)  # 标签（GIN 索引，支持 ?| / ?& 筛选）
     category = Column(String(100), nullable=True)  # 分类
     
     # 子任务
@@ -104,6 +108,11 @@ class Todo(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        Index("idx_todos_tags_gin", "tags", postgresql_using="gin"),
+        Index("idx_todos_user_created_at", "user_id", "created_at"),
+    )
 
 
 class Expense(Base):
@@ -121,11 +130,16 @@ class Expense(Base):
     description = Column(Text, nullable=True)  # 描述
     date = Column(DateTime(timezone=True), nullable=False, index=True)  # 日期
     
-    tags = Column(JSON, default=list)  # 标签
+    tags = Column(JSONB, default=list)  # 标签（GIN 索引，支持 ?| / ?& 筛选）
     images = Column(JSON, default=list)  # 图片（凭证）
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        Index("idx_expenses_tags_gin", "tags", postgresql_using="gin"),
+        Index("idx_expenses_user_date", "user_id", "date"),
+    )
 
 
 class Habit(Base):
@@ -152,6 +166,10 @@ class Habit(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        Index("idx_habits_user_active_created_at", "user_id", "is_active", "created_at"),
+    )
 
 
 class HabitRecord(Base):
@@ -166,6 +184,11 @@ class HabitRecord(Base):
     note = Column(Text, nullable=True)  # 备注
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        # 打卡记录：WHERE habit_id = ? AND date(date) = ?
+        Index("idx_habit_records_habit_date", "habit_id", "date"),
+    )
 
 
 class Note(Base):
@@ -178,7 +201,7 @@ class Note(Base):
     title = Column(String(500), nullable=False)  # 标题
     content = Column(Text, nullable=False)  # 内容（Markdown）
     
-    tags = Column(JSON, default=list)  # 标签
+    tags = Column(JSONB, default=list)  # 标签（GIN 索引，支持 ?| / ?& 筛选）
     category = Column(String(100), nullable=True)  # 分类
     
     is_pinned = Column(Boolean, default=False)  # 是否置顶
@@ -186,5 +209,10 @@ class Note(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        Index("idx_notes_tags_gin", "tags", postgresql_using="gin"),
+        Index("idx_notes_user_pinned_updated_at", "user_id", "is_pinned", "updated_at"),
+    )
 
 
@@ -12,6 +12,15 @@ class ContentType(str, Enum):
     TRAVEL = "travel"
 
 
+class AlbumPhotoMeta(BaseModel):
+    """相册照片元数据（按 object_key 与 images 中的 URL 对应）"""
+    object_key: str = Field(..., min_length=1, max_length=500)
+    width: Optional[int] = Field(None, ge=0)
+    height: Optional[int] = Field(None, ge=0)
+    size: Optional[int] = Field(None, ge=0)
+    taken_at: Optional[datetime] = None
+
+
 class ContentCreate(BaseModel):
     """创建内容请求"""
     type: ContentType
@@ -25,6 +34,7 @@ class ContentCreate(BaseModel):
     location: Optional[str] = Field(None, max_length=200)
     extra_data: Optional[Dict[str, Any]] = None
     is_public: bool = True
+    photos: Optional[List[AlbumPhotoMeta]] = None  # 相册照片元数据（可选）
 
 
 class ContentUpdate(BaseModel):
@@ -39,6 +49,7 @@ class ContentUpdate(BaseModel):
     location: Optional[str] = Field(None, max_length=200)
     extra_data: Optional[Dict[str, Any]] = None
     is_public: Optional[bool] = None
+    photos: Optional[List[AlbumPhotoMeta]] = None  # 相册照片元数据（可选）
 
 
 class UserBrief(BaseModel):
@@ -68,7 +79,7 @@ class ContentResponse(BaseModel):
     description: Optional[str]
     content: str
     tags: List[str]
-    images: List[str]
+    images: List[str]  # 相册详情只返回前 ALBUM_DETAIL_PREVIEW 张，完整照片见照片分页接口
     videos: List[str]
     video_thumbnails: List[str]
     location: Optional[str]
@@ -86,6 +97,7 @@ class ContentResponse(BaseModel):
     user: Optional[UserBrief] = None
     is_liked: Optional[bool] = None  # 当前用户是否点赞
     is_saved: Optional[bool] = None  # 当前用户是否收藏
+    photo_count: Optional[int] = None  # 相册照片总数（相册详情返回）
 
     @field_validator('id', 'user_id', mode='before')
     @classmethod
@@ -107,9 +119,13 @@ class ContentListItem(BaseModel):
     title: str
     description: Optional[str]
     tags: List[str]
-    images: List[str]
-    videos: List[str]
-    video_thumbnails: List[str]
+    images: List[str]  # 预览（前 LIST_MEDIA_PREVIEW 张）
+    videos: List[str]  # 预览
+    video_thumbnails: List[str]  # 预览
+    cover_image: Optional[str] = None  # 封面（优先视频封面）
+    image_count: int = 0  # 图片总数
+    video_count: int = 0  # 视频总数
+    photo_count: Optional[int] = None  # 相册照片总数（相册返回）
     location: Optional[str]
     is_public: bool
     is_featured: bool
@@ -121,6 +137,9 @@ class ContentListItem(BaseModel):
     
     # 关联数据
     user: Optional[UserBrief] = None
+    highlight: Optional[Dict[str, Optional[str]]] = None  # 搜索高亮片段 {title, snippet}
+    is_liked: Optional[bool] = None  # 当前用户是否点赞（登录时返回）
+    is_saved: Optional[bool] = None  # 当前用户是否收藏（登录时返回）
 
     @field_validator('id', 'user_id', mode='before')
     @classmethod
@@ -134,13 +153,43 @@ class ContentListItem(BaseModel):
         from_attributes = True
 
 
+class AlbumPhotoResponse(BaseModel):
+    """相册照片"""
+    id: str
+    position: int
+    url: str
+    width: Optional[int] = None
+    height: Optional[int] = None
+    size: Optional[int] = None
+    taken_at: Optional[datetime] = None
+
+
+class AlbumPhotoListResponse(BaseModel):
+    """相册照片分页响应"""
+    items: List[AlbumPhotoResponse]
+    total: int
+    page: int
+    page_size: int
+    total_pages: int
+    next_cursor: Optional[str] = None  # 下一页游标（为空表示没有更多数据）
+
+
+class TagFacet(BaseModel):
+    """标签分面计数"""
+    name: str
+    count: int
+
+
 class ContentListResponse(BaseModel):
     """内容列表响应"""
     items: List[ContentListItem]
-    total: int
+    total: Optional[int]  # with_total=false 时为空
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int]
+    total_mode: str = "exact"  # 总数模式：exact/estimated/none
+    next_cursor: Optional[str] = None  # 下一页游标（为空表示没有更多数据）
+    facets: Optional[List[TagFacet]] = None  # 标签分面计数（with_facets=true 时返回）
 
 
 class CommentCreate(BaseModel):
@@ -165,6 +214,8 @@ class CommentResponse(BaseModel):
     replies: Optional[List["CommentResponse"]] = None
     is_liked: Optional[bool] = None  # 当前用户是否点赞
     reply_count: Optional[int] = 0  # 回复数量
+    depth: Optional[int] = None  # 线程中的层级（线程接口返回）
+    descendant_count: Optional[int] = None  # 子树评论数（线程接口返回）
     content: Optional[Dict[str, Any]] = None  # 评论所属的内容信息（用于我的评论列表）
 
     @field_validator('id', 'content_id', 'user_id', 'parent_id', mode='before')
@@ -196,3 +247,20 @@ class SaveResponse(BaseModel):
     is_saved: bool
     save_count: int
 
+
+class InteractionFlagsRequest(BaseModel):
+    """批量查询互动状态请求"""
+    content_ids: List[str] = Field(..., min_length=1, max_length=100)
+
+
+class InteractionFlags(BaseModel):
+    """单个内容的互动状态"""
+    is_liked: bool = False
+    is_saved: bool = False
+    is_viewed: bool = False
+
+
+class InteractionFlagsResponse(BaseModel):
+    """批量互动状态响应"""
+    flags: Dict[str, InteractionFlags]  # 内容ID -> 互动状态
+
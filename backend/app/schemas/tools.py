@@ -6,6 +6,7 @@ from app.models.tools import (
     CountdownType, TodoStatus, TodoPriority, 
     ExpenseType, ExpenseCategory
 )
+from app.schemas.content import TagFacet
 
 
 # ==================== 倒计时 Schemas ====================
@@ -56,10 +57,10 @@ class CountdownResponse(CountdownBase):
 
 class CountdownListResponse(BaseModel):
     items: List[CountdownResponse]
-    total: int
+    total: Optional[int]
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int]
 
 
 # ==================== 待办清单 Schemas ====================
@@ -112,10 +113,11 @@ class TodoResponse(TodoBase):
 
 class TodoListResponse(BaseModel):
     items: List[TodoResponse]
-    total: int
+    total: Optional[int]
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int]
+    facets: Optional[List[TagFacet]] = None
 
 
 class TodoStatsResponse(BaseModel):
@@ -174,10 +176,11 @@ class ExpenseResponse(ExpenseBase):
 
 class ExpenseListResponse(BaseModel):
     items: List[ExpenseResponse]
-    total: int
+    total: Optional[int]
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int]
+    facets: Optional[List[TagFacet]] = None
 
 
 class ExpenseStatsResponse(BaseModel):
@@ -309,9 +312,10 @@ class NoteResponse(NoteBase):
 
 class NoteListResponse(BaseModel):
     items: List[NoteResponse]
-    total: int
+    total: Optional[int]
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int]
+    facets: Optional[List[TagFacet]] = None
 
 
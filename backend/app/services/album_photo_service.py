@@ -0,0 +1,70 @@
+"""
+相册照片
+
+album_photos 表按位置保存相册的每张照片及其元数据（宽高、大小、拍摄时间），
+与 Content.images 的顺序保持一致：
+- 创建/更新相册的 images 时在同一事务内重建照片行，已有照片的元数据按 object_key 保留
+- extra_data.photo_count 随之自动维护
+- 照片通过 (content_id, position) 游标分页读取，详情与列表接口不再返回完整数组
+"""
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Tuple
+
+from app.models.content import AlbumPhoto, ContentType
+from app.utils.pagination import apply_keyset, fetch_page, next_cursor_of
+
+_META_FIELDS = ("width", "height", "size", "taken_at")
+
+
+def is_album(content) -> bool:
+    return getattr(content.type, "value", content.type) == ContentType.ALBUM.value
+
+
+class AlbumPhotoService:
+    """相册照片服务"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def sync(self, content, photos: Optional[List[Dict]] = None) -> None:
+        """
+        按 content.images 重建照片行并更新 extra_data.photo_count（调用方负责提交事务）
+
+        Args:
+            photos: 请求中附带的照片元数据（按 object_key 对应），未提供的沿用已有记录
+        """
+        if not is_album(content):
+            return
+        images = list(content.images or [])
+
+        known: Dict[str, Dict] = {}
+        if content.id is not None:
+            for row in self.db.query(AlbumPhoto).filter(AlbumPhoto.content_id == content.id).all():
+                known.setdefault(row.object_key, {field: getattr(row, field) for field in _META_FIELDS})
+            self.db.query(AlbumPhoto).filter(
+                AlbumPhoto.content_id == content.id
+            ).delete(synchronize_session=False)
+        for meta in photos or []:
+            known[meta["object_key"]] = {field: meta.get(field) for field in _META_FIELDS}
+
+        self.db.add_all([
+            AlbumPhoto(
+                content_id=content.id,
+                position=position,
+                object_key=url,
+                **known.get(url, {}),
+            )
+            for position, url in enumerate(images)
+        ])
+
+        # JSON 列需整体赋值才会被识别为变更
+        content.extra_data = {**(content.extra_data or {}), "photo_count": len(images)}
+
+    def list_photos(
+        self, content_id: str, page: int = 1, page_size: int = 50, cursor: Optional[str] = None
+    ) -> Tuple[List[AlbumPhoto], Optional[str]]:
+        """按位置分页读取照片（传入 cursor 时使用游标分页，忽略 page）"""
+        query = self.db.query(AlbumPhoto).filter(AlbumPhoto.content_id == content_id)
+        query = apply_keyset(query, AlbumPhoto.position, AlbumPhoto.id, cursor, ascending=True)
+        rows, has_more = fetch_page(query, page, page_size, cursor)
+        return rows, next_cursor_of(rows, has_more, key=lambda row: (row.position, row.id), sort_key="position")
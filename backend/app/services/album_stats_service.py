@@ -0,0 +1,270 @@
+"""
+相册统计汇总
+
+album_stats 表按 (scope, dimension, bucket) 保存相册数与照片数：
+- scope：public 为全部公开相册，用户 ID 为该用户的全部相册（含私密）
+- dimension：location / tag / year / month / day
+
+相册创建、更新、删除、切换可见性时，在同一事务内按变更前后快照的差量 UPSERT；
+后台任务 album_stats_reconcile 定期按 SQL 聚合整体对账，修正可能的偏差：聚合结果先写入临时表，
+再只更新计数不同的桶、删除已不存在的桶，不会锁住整张表，也不会与并发的差量写入产生主键冲突。
+统计接口只读汇总表分页返回，桶内相册通过下钻接口按需分页加载。
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import text, func, exists, select
+from datetime import datetime
+from fastapi import HTTPException, status
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from app.models.album_stats import AlbumStat
+from app.models.content import Content, ContentType
+
+logger = logging.getLogger(__name__)
+
+SCOPE_PUBLIC = "public"
+
+DIMENSION_LOCATION = "location"
+DIMENSION_TAG = "tag"
+TIME_DIMENSIONS = {
+    "year": "%Y",
+    "month": "%Y-%m",
+    "day": "%Y-%m-%d",
+}
+DIMENSIONS = (DIMENSION_LOCATION, DIMENSION_TAG, *TIME_DIMENSIONS)
+
+_BUCKET_MAX_LENGTH = 200
+
+_UPSERT_SQL = text("""
+    INSERT INTO album_stats (scope, dimension, bucket, album_count, photo_count, updated_at)
+    SELECT d.scope, d.dimension, d.bucket, d.albums, d.photos, now() AT TIME ZONE 'utc'
+    FROM unnest(
+        CAST(:scopes AS text[]), CAST(:dimensions AS text[]), CAST(:buckets AS text[]),
+        CAST(:albums AS integer[]), CAST(:photos AS integer[])
+    ) AS d(scope, dimension, bucket, albums, photos)
+    ON CONFLICT (scope, dimension, bucket) DO UPDATE
+    SET album_count = album_stats.album_count + EXCLUDED.album_count,
+        photo_count = album_stats.photo_count + EXCLUDED.photo_count,
+        updated_at = EXCLUDED.updated_at
+""")
+
+_PRUNE_SQL = text("""
+    DELETE FROM album_stats s
+    USING unnest(
+        CAST(:scopes AS text[]), CAST(:dimensions AS text[]), CAST(:buckets AS text[])
+    ) AS d(scope, dimension, bucket)
+    WHERE s.scope = d.scope AND s.dimension = d.dimension AND s.bucket = d.bucket
+      AND s.album_count <= 0
+""")
+
+_REBUILD_TABLE = "album_stats_rebuild"
+
+# 每个相册按 scope（作者 + 公开时的 public）展开，再按维度展开为桶，聚合结果写入事务级临时表
+_REBUILD_SQL = text(f"""
+    CREATE TEMP TABLE {_REBUILD_TABLE} ON COMMIT DROP AS
+    SELECT s.scope, b.dimension, b.bucket,
+           count(*)::integer AS album_count, COALESCE(sum(a.photos), 0)::integer AS photo_count
+    FROM (
+        SELECT id, user_id, is_public, btrim(location) AS location, tags, created_at,
+               COALESCE(cardinality(images), 0) AS photos
+        FROM contents
+        WHERE lower(type::text) = 'album'
+    ) a
+    CROSS JOIN LATERAL (
+        VALUES (a.user_id::text), (CASE WHEN a.is_public THEN '{SCOPE_PUBLIC}' END)
+    ) AS s(scope)
+    CROSS JOIN LATERAL (
+        SELECT '{DIMENSION_LOCATION}', left(a.location, {_BUCKET_MAX_LENGTH}) WHERE a.location <> ''
+        UNION
+        SELECT '{DIMENSION_TAG}', left(btrim(t), {_BUCKET_MAX_LENGTH}) FROM unnest(a.tags) AS t WHERE btrim(t) <> ''
+        UNION ALL
+        SELECT 'year', to_char(a.created_at, 'YYYY') WHERE a.created_at IS NOT NULL
+        UNION ALL
+        SELECT 'month', to_char(a.created_at, 'YYYY-MM') WHERE a.created_at IS NOT NULL
+        UNION ALL
+        SELECT 'day', to_char(a.created_at, 'YYYY-MM-DD') WHERE a.created_at IS NOT NULL
+    ) AS b(dimension, bucket)
+    WHERE s.scope IS NOT NULL
+    GROUP BY s.scope, b.dimension, b.bucket
+""")
+
+# 只写入计数有变化的桶（未变化的行不加锁、不产生新版本）
+_RECONCILE_UPSERT_SQL = text(f"""
+    INSERT INTO album_stats (scope, dimension, bucket, album_count, photo_count, updated_at)
+    SELECT scope, dimension, bucket, album_count, photo_count, now() AT TIME ZONE 'utc'
+    FROM {_REBUILD_TABLE}
+    ON CONFLICT (scope, dimension, bucket) DO UPDATE
+    SET album_count = EXCLUDED.album_count,
+        photo_count = EXCLUDED.photo_count,
+        updated_at = EXCLUDED.updated_at
+    WHERE album_stats.album_count IS DISTINCT FROM EXCLUDED.album_count
+       OR album_stats.photo_count IS DISTINCT FROM EXCLUDED.photo_count
+""")
+
+_RECONCILE_DELETE_SQL = text(f"""
+    DELETE FROM album_stats s
+    WHERE NOT EXISTS (
+        SELECT 1 FROM {_REBUILD_TABLE} r
+        WHERE r.scope = s.scope AND r.dimension = s.dimension AND r.bucket = s.bucket
+    )
+""")
+
+
+def bucket_key(value: Optional[str]) -> str:
+    """地点/标签的桶键，与 SQL 中的 left(btrim(x), 200) 一致（btrim 只去除空格）"""
+    return (value or "").strip(" ")[:_BUCKET_MAX_LENGTH]
+
+
+def _bucket_expr(column):
+    return func.left(func.btrim(column), _BUCKET_MAX_LENGTH)
+
+
+def album_snapshot(content) -> Optional[Dict]:
+    """记录相册对统计有影响的字段；非相册返回 None"""
+    if content is None or getattr(content.type, "value", content.type) != ContentType.ALBUM.value:
+        return None
+    return {
+        "user_id": str(content.user_id),
+        "is_public": bool(content.is_public),
+        "location": bucket_key(content.location),
+        "tags": {bucket_key(tag) for tag in (content.tags or []) if bucket_key(tag)},
+        "created_at": content.created_at or datetime.utcnow(),
+        "photo_count": len(content.images or []),
+    }
+
+
+def _buckets_of(snapshot: Dict) -> List[Tuple[str, str, str]]:
+    """快照计入的全部 (scope, dimension, bucket)"""
+    scopes = [snapshot["user_id"]] + ([SCOPE_PUBLIC] if snapshot["is_public"] else [])
+    buckets = [(DIMENSION_TAG, tag) for tag in snapshot["tags"]]
+    if snapshot["location"]:
+        buckets.append((DIMENSION_LOCATION, snapshot["location"]))
+    for dimension, fmt in TIME_DIMENSIONS.items():
+        buckets.append((dimension, snapshot["created_at"].strftime(fmt)))
+    return [(scope, dimension, bucket) for scope in scopes for dimension, bucket in buckets]
+
+
+def time_label(dimension: str, bucket: str) -> str:
+    """时间桶的展示文本（2024年 / 2024年5月 / 2024年5月1日）"""
+    moment = datetime.strptime(bucket, TIME_DIMENSIONS[dimension])
+    if dimension == "year":
+        return f"{moment.year}年"
+    if dimension == "month":
+        return f"{moment.year}年{moment.month}月"
+    return f"{moment.year}年{moment.month}月{moment.day}日"
+
+
+def time_range(dimension: str, bucket: str) -> Tuple[datetime, datetime]:
+    """时间桶对应的 [开始, 结束) 区间"""
+    try:
+        start = datetime.strptime(bucket, TIME_DIMENSIONS[dimension])
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="无效的时间分组")
+    if dimension == "year":
+        return start, start.replace(year=start.year + 1)
+    if dimension == "month":
+        if start.month == 12:
+            return start, start.replace(year=start.year + 1, month=1)
+        return start, start.replace(month=start.month + 1)
+    return start, datetime.fromordinal(start.toordinal() + 1)
+
+
+class AlbumStatsService:
+    """相册统计汇总服务"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def apply_change(self, old: Optional[Dict], new: Optional[Dict]) -> None:
+        """
+        按变更前后的快照差量更新汇总（在写操作的事务内调用，随内容一起提交）
+
+        Args:
+            old: 变更前的 album_snapshot（新建时为 None）
+            new: 变更后的 album_snapshot（删除时为 None）
+        """
+        deltas: Dict[Tuple[str, str, str], List[int]] = {}
+        for snapshot, sign in ((old, -1), (new, 1)):
+            if snapshot is None:
+                continue
+            for key in _buckets_of(snapshot):
+                delta = deltas.setdefault(key, [0, 0])
+                delta[0] += sign
+                delta[1] += sign * snapshot["photo_count"]
+
+        changed = [(key, delta) for key, delta in deltas.items() if delta != [0, 0]]
+        if not changed:
+            return
+
+        params = {
+            "scopes": [scope for (scope, _, _), _ in changed],
+            "dimensions": [dimension for (_, dimension, _), _ in changed],
+            "buckets": [bucket for (_, _, bucket), _ in changed],
+        }
+        self.db.execute(_UPSERT_SQL, {
+            **params,
+            "albums": [albums for _, (albums, _) in changed],
+            "photos": [photos for _, (_, photos) in changed],
+        })
+        self.db.execute(_PRUNE_SQL, params)
+
+    def rebuild(self) -> int:
+        """
+        按 SQL 聚合对账汇总表（后台任务与迁移脚本调用）
+
+        Returns:
+            新增、修正与删除的桶数
+        """
+        try:
+            self.db.execute(_REBUILD_SQL)
+            upserted = self.db.execute(_RECONCILE_UPSERT_SQL).rowcount
+            deleted = self.db.execute(_RECONCILE_DELETE_SQL).rowcount
+            self.db.commit()
+            logger.info(f"📊 相册统计对账完成 - 新增或修正: {upserted}, 删除: {deleted}")
+            return upserted + deleted
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def list_buckets(
+        self, scope: str, dimension: str, page: int = 1, page_size: int = 50
+    ) -> Tuple[List[AlbumStat], int]:
+        """
+        分页读取某一维度的统计桶
+
+        地点/标签按相册数倒序，时间维度按时间倒序
+        """
+        query = self.db.query(AlbumStat).filter(
+            AlbumStat.scope == scope,
+            AlbumStat.dimension == dimension,
+        )
+        total = query.count()
+        if dimension in TIME_DIMENSIONS:
+            query = query.order_by(AlbumStat.bucket.desc())
+        else:
+            query = query.order_by(AlbumStat.album_count.desc(), AlbumStat.bucket)
+        rows = query.offset((page - 1) * page_size).limit(page_size).all()
+        return rows, total
+
+    def get_bucket(self, scope: str, dimension: str, bucket: str) -> Optional[AlbumStat]:
+        """读取单个统计桶"""
+        return self.db.query(AlbumStat).filter(
+            AlbumStat.scope == scope,
+            AlbumStat.dimension == dimension,
+            AlbumStat.bucket == bucket,
+        ).first()
+
+    @staticmethod
+    def bucket_filter(dimension: str, bucket: str):
+        """
+        统计桶对应的相册筛选条件（下钻查询使用）
+
+        地点与标签按计数时相同的规范化表达式比较，首尾带空格或超长的值也能下钻到
+        """
+        if dimension == DIMENSION_LOCATION:
+            return _bucket_expr(Content.location) == bucket
+        if dimension == DIMENSION_TAG:
+            tag = func.unnest(Content.tags).column_valued("tag")
+            return exists(select(1).where(_bucket_expr(tag) == bucket))
+        start, end = time_range(dimension, bucket)
+        return (Content.created_at >= start) & (Content.created_at < end)
@@ -1,4 +1,5 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from fastapi import HTTPException, status
 from app.models.user import User
 from app.schemas import (
@@ -16,9 +17,10 @@ from app.schemas import (
     ChangePasswordRequest,
     ChangeEmailRequest
 )
-from app.utils.security import verify_password, get_password_hash, create_access_token, create_refresh_token
+from app.utils.security import create_access_token, create_refresh_token
 from app.utils.verification import generate_code, save_code, verify_code, check_code_rate_limit
 from app.services.email_service import send_verification_email
+from app.services.password_hasher import check_password, hash_password, verify_and_rehash
 from datetime import datetime, timedelta
 from app.core.config import settings
 import re
@@ -28,13 +30,13 @@ logger = logging.getLogger(__name__)
 
 
 class AuthService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
     async def send_verification_code(self, email: str, code_type: str) -> SendCodeResponse:
         """发送验证码"""
         # 检查频率限制
-        if not check_code_rate_limit(email):
+        if not await check_code_rate_limit(email):
             raise HTTPException(
                 status_code=status.HTTP_200_OK,
                 detail="发送过于频繁，请60秒后再试"
@@ -42,7 +44,7 @@ class AuthService:
         
         # 如果是注册，检查邮箱是否已存在
         if code_type == "register":
-            existing_user = self.db.query(User).filter(User.email == email).first()
+            existing_user = (await self.db.execute(select(User).where(User.email == email))).scalars().first()
             if existing_user:
                 raise HTTPException(
                     status_code=status.HTTP_200_OK,
@@ -51,7 +53,7 @@ class AuthService:
         
         # 如果是重置密码，检查邮箱是否存在
         if code_type == "reset":
-            user = self.db.query(User).filter(User.email == email).first()
+            user = (await self.db.execute(select(User).where(User.email == email))).scalars().first()
             if not user:
                 raise HTTPException(
                     status_code=status.HTTP_200_OK,
@@ -60,7 +62,7 @@ class AuthService:
         
         # 生成验证码
         code = generate_code()
-        save_code(email, code, code_type)
+        await save_code(email, code, code_type)
         
         # 发送邮件
         try:
@@ -94,14 +96,14 @@ class AuthService:
                 )
             
             # 验证验证码
-            if not verify_code(user_data.email, user_data.code, "register"):
+            if not await verify_code(user_data.email, user_data.code, "register"):
                 raise HTTPException(
                     status_code=status.HTTP_200_OK,
                     detail="验证码错误或已过期"
                 )
             
             # 检查邮箱是否已存在
-            existing_user = self.db.query(User).filter(User.email == user_data.email).first()
+            existing_user = (await self.db.execute(select(User).where(User.email == user_data.email))).scalars().first()
             if existing_user:
                 raise HTTPException(
                     status_code=status.HTTP_200_OK,
@@ -109,7 +111,7 @@ class AuthService:
                 )
             
             # 检查用户名是否已存在
-            existing_username = self.db.query(User).filter(User.username == user_data.username).first()
+            existing_username = (await self.db.execute(select(User).where(User.username == user_data.username))).scalars().first()
             if existing_username:
                 raise HTTPException(
                     status_code=status.HTTP_200_OK,
@@ -117,7 +119,7 @@ class AuthService:
                 )
             
             # 创建用户
-            hashed_password = get_password_hash(user_data.password)
+            hashed_password = await hash_password(user_data.password)
             new_user = User(
                 email=user_data.email,
                 username=user_data.username,
@@ -126,8 +128,8 @@ class AuthService:
             )
             
             self.db.add(new_user)
-            self.db.commit()
-            self.db.refresh(new_user)
+            await self.db.commit()
+            await self.db.refresh(new_user)
             
             # 生成 Token
             access_token = create_access_token(data={"sub": str(new_user.id)})
@@ -167,10 +169,10 @@ class AuthService:
             
             # 根据登录类型查找用户
             if login_type == 'email':
-                user = self.db.query(User).filter(User.email == login_data.identifier).first()
+                user = (await self.db.execute(select(User).where(User.email == login_data.identifier))).scalars().first()
                 error_msg = "邮箱或密码错误"
             else:
-                user = self.db.query(User).filter(User.username == login_data.identifier).first()
+                user = (await self.db.execute(select(User).where(User.username == login_data.identifier))).scalars().first()
                 error_msg = "用户名或密码错误"
             
             if not user:
@@ -179,30 +181,18 @@ class AuthService:
                     detail=error_msg
                 )
             
-            # 验证密码
-            password_valid = verify_password(login_data.password, user.password_hash)
-            
-            # 如果密码验证失败，尝试使用旧的哈希方法验证（兼容性处理）
-            if not password_valid:
+            # 验证密码（兼容旧的哈希方法；哈希成本变化时顺带升级）
+            password_valid, new_hash = await verify_and_rehash(login_data.password, user.password_hash)
+            if new_hash:
                 try:
-                    import hashlib
-                    import base64
-                    import bcrypt
-                    
-                    # 旧的截断方法：总是使用 SHA256
-                    old_password = base64.b64encode(
-                        hashlib.sha256(login_data.password.encode('utf-8')).digest()
-                    )
-                    
-                    if bcrypt.checkpw(old_password, user.password_hash.encode('utf-8')):
-                        password_valid = True
-                        # 自动迁移到新的哈希方式
-                        logger.info(f"🔄 自动迁移密码 - 用户ID: {user.id}")
-                        user.password_hash = get_password_hash(login_data.password)
-                        self.db.commit()
-                        logger.info(f"✅ 密码迁移成功 - 用户ID: {user.id}")
+                    user.password_hash = new_hash
+                    await self.db.commit()
+                    logger.info(f"🔄 密码哈希已升级 - 用户ID: {user.id}")
                 except Exception as e:
-                    logger.warning(f"⚠️  密码兼容性验证失败: {str(e)}")
+                    # 升级失败不影响本次登录，下次登录时重试
+                    await self.db.rollback()
+                    await self.db.refresh(user)
+                    logger.warning(f"⚠️  密码哈希升级失败 - 用户ID: {user.id}, 错误: {str(e)}")
             
             if not password_valid:
                 raise HTTPException(
@@ -267,7 +257,7 @@ class AuthService:
             
             # 验证验证码
             logger.info(f"🔍 验证验证码 - 邮箱: {reset_data.email}, 验证码: {reset_data.code}")
-            if not verify_code(reset_data.email, reset_data.code, "reset"):
+            if not await verify_code(reset_data.email, reset_data.code, "reset"):
                 logger.warning(f"❌ 验证码错误或已过期 - 邮箱: {reset_data.email}, 验证码: {reset_data.code}")
                 raise HTTPException(
                     status_code=status.HTTP_200_OK,
@@ -277,7 +267,7 @@ class AuthService:
             
             # 查找用户
             logger.info(f"🔍 查找用户 - 邮箱: {reset_data.email}")
-            user = self.db.query(User).filter(User.email == reset_data.email).first()
+            user = (await self.db.execute(select(User).where(User.email == reset_data.email))).scalars().first()
             if not user:
                 logger.warning(f"❌ 用户不存在 - 邮箱: {reset_data.email}")
                 raise HTTPException(
@@ -289,10 +279,10 @@ class AuthService:
             # 更新密码
             logger.info(f"🔐 更新密码 - 用户ID: {user.id}")
             old_password_hash = user.password_hash
-            user.password_hash = get_password_hash(reset_data.new_password)
+            user.password_hash = await hash_password(reset_data.new_password)
             user.updated_at = datetime.utcnow()
             
-            self.db.commit()
+            await self.db.commit()
             logger.info(f"✅ 密码更新成功 - 用户ID: {user.id}, 邮箱: {reset_data.email}")
             logger.info(f"📊 密码哈希已更改: {old_password_hash[:20]}... -> {user.password_hash[:20]}...")
             
@@ -320,7 +310,7 @@ class AuthService:
             logger.info(f"🔄 开始更新个人信息 - 用户ID: {user_id}")
             
             # 查找用户
-            user = self.db.query(User).filter(User.id == user_id).first()
+            user = (await self.db.execute(select(User).where(User.id == user_id))).scalars().first()
             if not user:
                 logger.warning(f"❌ 用户不存在 - 用户ID: {user_id}")
                 raise HTTPException(
@@ -330,10 +320,10 @@ class AuthService:
             
             # 如果更新用户名，检查是否重复
             if update_data.username and update_data.username != user.username:
-                existing_user = self.db.query(User).filter(
+                existing_user = (await self.db.execute(select(User).where(
                     User.username == update_data.username,
                     User.id != user_id
-                ).first()
+                ))).scalars().first()
                 if existing_user:
                     logger.warning(f"❌ 用户名已存在 - 用户名: {update_data.username}")
                     raise HTTPException(
@@ -356,8 +346,8 @@ class AuthService:
             # 更新时间
             user.updated_at = datetime.utcnow()
             
-            self.db.commit()
-            self.db.refresh(user)
+            await self.db.commit()
+            await self.db.refresh(user)
             
             logger.info(f"✅ 个人信息更新成功 - 用户ID: {user_id}")
             
@@ -398,7 +388,7 @@ class AuthService:
                 )
             
             # 查找用户
-            user = self.db.query(User).filter(User.id == user_id).first()
+            user = (await self.db.execute(select(User).where(User.id == user_id))).scalars().first()
             if not user:
                 logger.warning(f"❌ 用户不存在 - 用户ID: {user_id}")
                 raise HTTPException(
@@ -407,7 +397,7 @@ class AuthService:
                 )
             
             # 验证当前密码
-            if not verify_password(password_data.current_password, user.password_hash):
+            if not await check_password(password_data.current_password, user.password_hash):
                 logger.warning(f"❌ 当前密码错误 - 用户ID: {user_id}")
                 raise HTTPException(
                     status_code=status.HTTP_200_OK,
@@ -416,10 +406,10 @@ class AuthService:
             
             # 更新密码
             logger.info(f"🔐 更新密码 - 用户ID: {user_id}")
-            user.password_hash = get_password_hash(password_data.new_password)
+            user.password_hash = await hash_password(password_data.new_password)
             user.updated_at = datetime.utcnow()
             
-            self.db.commit()
+            await self.db.commit()
             logger.info(f"✅ 密码修改成功 - 用户ID: {user_id}")
             
             return MessageResponse(
@@ -444,7 +434,7 @@ class AuthService:
             
             # 验证验证码
             logger.info(f"🔍 验证验证码 - 新邮箱: {email_data.new_email}, 验证码: {email_data.code}")
-            if not verify_code(email_data.new_email, email_data.code, "register"):
+            if not await verify_code(email_data.new_email, email_data.code, "register"):
                 logger.warning(f"❌ 验证码错误或已过期 - 新邮箱: {email_data.new_email}")
                 raise HTTPException(
                     status_code=status.HTTP_200_OK,
@@ -453,7 +443,7 @@ class AuthService:
             logger.info(f"✅ 验证码验证通过 - 新邮箱: {email_data.new_email}")
             
             # 查找用户
-            user = self.db.query(User).filter(User.id == user_id).first()
+            user = (await self.db.execute(select(User).where(User.id == user_id))).scalars().first()
             if not user:
                 logger.warning(f"❌ 用户不存在 - 用户ID: {user_id}")
                 raise HTTPException(
@@ -462,7 +452,7 @@ class AuthService:
                 )
             
             # 验证当前密码
-            if not verify_password(email_data.password, user.password_hash):
+            if not await check_password(email_data.password, user.password_hash):
                 logger.warning(f"❌ 当前密码错误 - 用户ID: {user_id}")
                 raise HTTPException(
                     status_code=status.HTTP_200_OK,
@@ -470,10 +460,10 @@ class AuthService:
                 )
             
             # 检查新邮箱是否已被使用
-            existing_user = self.db.query(User).filter(
+            existing_user = (await self.db.execute(select(User).where(
                 User.email == email_data.new_email,
                 User.id != user_id
-            ).first()
+            ))).scalars().first()
             if existing_user:
                 logger.warning(f"❌ 新邮箱已被使用 - 新邮箱: {email_data.new_email}")
                 raise HTTPException(
@@ -488,8 +478,8 @@ class AuthService:
             user.is_verified = True  # 验证码验证通过，设为已验证
             user.updated_at = datetime.utcnow()
             
-            self.db.commit()
-            self.db.refresh(user)
+            await self.db.commit()
+            await self.db.refresh(user)
             logger.info(f"✅ 邮箱换绑成功 - 用户ID: {user_id}, {old_email} -> {email_data.new_email}")
             
             return ApiResponse(
@@ -0,0 +1,122 @@
+"""
+评论树批量加载
+
+一页评论的回复预览、回复数、点赞状态都按整页批量查询，查询数与评论数无关：
+- 回复预览：ROW_NUMBER() OVER (PARTITION BY parent_id ...) 一次取出所有父评论的前 N 条回复
+- 回复数：一次 GROUP BY parent_id
+- 点赞状态：对本页所有评论 ID 一次 IN 查询
+"""
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func
+from typing import Dict, List, Optional, Set
+
+from app.models.content import Comment, CommentLike
+from app.schemas.content import CommentResponse, UserBrief
+
+# 每条顶级评论附带的回复预览数
+REPLY_PREVIEW = 3
+
+
+def build_comment(
+    comment: Comment,
+    is_liked: bool = False,
+    reply_count: int = 0,
+    replies: Optional[List[CommentResponse]] = None,
+) -> CommentResponse:
+    """手动构建 CommentResponse（不经过 from_orm，避免 content 字段验证问题）"""
+    return CommentResponse(
+        id=str(comment.id),
+        content_id=str(comment.content_id),
+        user_id=str(comment.user_id),
+        comment_text=comment.comment_text,
+        parent_id=str(comment.parent_id) if comment.parent_id else None,
+        like_count=comment.like_count or 0,
+        created_at=comment.created_at,
+        updated_at=comment.updated_at,
+        user=UserBrief.from_orm(comment.user) if comment.user else None,
+        replies=replies,
+        is_liked=is_liked,
+        reply_count=reply_count,
+        content=None,
+    )
+
+
+class CommentLoader:
+    """评论树批量加载器"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def load_threads(
+        self, comments: List[Comment], user_id: Optional[str], preview: int = REPLY_PREVIEW
+    ) -> List[CommentResponse]:
+        """为一页顶级评论附带回复预览、回复数与点赞状态（固定 3~4 次查询）"""
+        parent_ids = [comment.id for comment in comments]
+        if not parent_ids:
+            return []
+
+        replies = self.top_replies(parent_ids, preview)
+        reply_counts = self.reply_counts(parent_ids)
+        liked = self.liked_ids(
+            user_id, parent_ids + [reply.id for group in replies.values() for reply in group]
+        )
+
+        return [
+            build_comment(
+                comment,
+                is_liked=comment.id in liked,
+                reply_count=reply_counts.get(comment.id, 0),
+                replies=[
+                    build_comment(reply, is_liked=reply.id in liked)
+                    for reply in replies.get(comment.id, [])
+                ],
+            )
+            for comment in comments
+        ]
+
+    def build_flat(self, comments: List[Comment], user_id: Optional[str]) -> List[CommentResponse]:
+        """构建不带回复的评论列表（回复分页使用）"""
+        liked = self.liked_ids(user_id, [comment.id for comment in comments])
+        return [build_comment(comment, is_liked=comment.id in liked) for comment in comments]
+
+    def top_replies(self, parent_ids: list, limit: int) -> Dict[object, List[Comment]]:
+        """每个父评论最早的 limit 条回复（窗口函数一次取出）"""
+        if limit <= 0:
+            return {}
+        ranked = self.db.query(
+            Comment.id.label("id"),
+            func.row_number().over(
+                partition_by=Comment.parent_id,
+                order_by=(Comment.created_at, Comment.id),
+            ).label("rn"),
+        ).filter(Comment.parent_id.in_(parent_ids)).subquery()
+
+        rows = self.db.query(Comment).options(
+            joinedload(Comment.user)
+        ).join(
+            ranked, ranked.c.id == Comment.id
+        ).filter(
+            ranked.c.rn <= limit
+        ).order_by(Comment.parent_id, Comment.created_at, Comment.id).all()
+
+        grouped: Dict[object, List[Comment]] = {}
+        for reply in rows:
+            grouped.setdefault(reply.parent_id, []).append(reply)
+        return grouped
+
+    def reply_counts(self, parent_ids: list) -> Dict[object, int]:
+        """各父评论的回复数（一次 GROUP BY）"""
+        rows = self.db.query(
+            Comment.parent_id, func.count(Comment.id)
+        ).filter(Comment.parent_id.in_(parent_ids)).group_by(Comment.parent_id).all()
+        return {parent_id: count for parent_id, count in rows}
+
+    def liked_ids(self, user_id: Optional[str], comment_ids: list) -> Set[object]:
+        """当前用户点赞过的评论 ID（一次 IN 查询）"""
+        if not user_id or not comment_ids:
+            return set()
+        rows = self.db.query(CommentLike.comment_id).filter(
+            CommentLike.user_id == user_id,
+            CommentLike.comment_id.in_(comment_ids),
+        ).all()
+        return {row.comment_id for row in rows}
@@ -0,0 +1,133 @@
+"""
+评论线程（物化路径）
+
+每条评论保存从根评论到自身的路径：
+  path = 祖先路径 + "/" + 本级片段，片段 = 创建时间（微秒，定长十六进制）+ ID 前缀
+片段定长且按时间递增，按 path 排序即为线程的深度优先、同级按时间先后的展示顺序。
+path 列使用 "C" 排序规则（按字节比较），子树即 (root_id, path) 索引上的一段连续范围：
+  path > 父路径 + "/" AND path < 父路径 + "0"   （"0" 是 "/" 的下一个字符）
+
+depth 为层级（根评论为 0），descendant_count 为子树评论数（不含自身），
+均在创建评论时于同一事务内维护；历史数据见 migrations/add_comment_thread_path.py。
+"""
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import text
+from datetime import datetime, timedelta
+from fastapi import HTTPException, status
+from typing import List, Optional
+import uuid
+
+from app.models.content import Comment
+from app.services.comment_loader import CommentLoader, build_comment
+
+PATH_SEPARATOR = "/"
+# 字节序上紧随分隔符的字符，用作子树范围的上界
+_PATH_UPPER = chr(ord(PATH_SEPARATOR) + 1)
+
+_EPOCH = datetime(1970, 1, 1)
+
+_INCREMENT_ANCESTORS_SQL = text("""
+    UPDATE comments
+    SET descendant_count = COALESCE(descendant_count, 0) + 1
+    WHERE root_id = :root_id AND path = ANY(CAST(:paths AS text[]))
+""")
+
+
+def path_segment(created_at: datetime, comment_id) -> str:
+    """路径片段：13 位十六进制微秒时间戳 + 6 位 ID 前缀（同一微秒内也能区分）"""
+    micros = (created_at - _EPOCH) // timedelta(microseconds=1)
+    return f"{micros:013x}{uuid.UUID(str(comment_id)).hex[:6]}"
+
+
+def ancestor_paths(path: str) -> List[str]:
+    """路径自身及其所有祖先的路径"""
+    segments = path.split(PATH_SEPARATOR)
+    return [PATH_SEPARATOR.join(segments[:i]) for i in range(1, len(segments) + 1)]
+
+
+class CommentThreadService:
+    """评论线程服务"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def attach(self, comment: Comment, parent: Optional[Comment]) -> None:
+        """
+        为新评论计算路径并累加祖先的子树计数（调用方在同一事务中提交）
+
+        comment 需已设置 id 与 created_at
+        """
+        segment = path_segment(comment.created_at, comment.id)
+        if parent is None:
+            comment.root_id = comment.id
+            comment.depth = 0
+            comment.path = segment
+            return
+
+        comment.root_id = parent.root_id or parent.id
+        comment.depth = (parent.depth or 0) + 1
+        # 父评论尚未回填路径时暂不生成，迁移脚本回填时一并处理
+        comment.path = f"{parent.path}{PATH_SEPARATOR}{segment}" if parent.path else None
+        if parent.path:
+            self.db.execute(_INCREMENT_ANCESTORS_SQL, {
+                "root_id": str(comment.root_id),
+                "paths": ancestor_paths(parent.path),
+            })
+
+    def get_subtree(
+        self,
+        comment_id: str,
+        user_id: Optional[str] = None,
+        max_depth: Optional[int] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> dict:
+        """
+        按路径顺序获取评论的整棵子树（根评论、子树、点赞状态共 3 次查询，与线程深度无关）
+
+        Args:
+            max_depth: 相对根评论的最大层级，不传表示不限
+            cursor: 上一页返回的 next_cursor（最后一条评论的路径）
+        """
+        root = self.db.query(Comment).options(
+            joinedload(Comment.user)
+        ).filter(Comment.id == comment_id).first()
+        if not root:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="评论不存在")
+        if not root.path:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="评论线程尚未建立路径索引"
+            )
+
+        lower = f"{root.path}{PATH_SEPARATOR}"
+        if cursor:
+            if not cursor.startswith(lower):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="无效的分页游标")
+            lower = cursor
+
+        query = self.db.query(Comment).options(
+            joinedload(Comment.user)
+        ).filter(
+            Comment.root_id == root.root_id,
+            Comment.path > lower,
+            Comment.path < f"{root.path}{_PATH_UPPER}",
+        )
+        if max_depth is not None:
+            query = query.filter(Comment.depth <= (root.depth or 0) + max_depth)
+        rows = query.order_by(Comment.path).limit(limit + 1).all()
+        nodes, has_more = rows[:limit], len(rows) > limit
+
+        liked = CommentLoader(self.db).liked_ids(user_id, [root.id] + [node.id for node in nodes])
+
+        def build(comment: Comment):
+            data = build_comment(comment, is_liked=comment.id in liked)
+            data.depth = comment.depth
+            data.descendant_count = comment.descendant_count or 0
+            return data
+
+        return {
+            "root": build(root),
+            "items": [build(node) for node in nodes],
+            "next_cursor": nodes[-1].path if has_more and nodes else None,
+        }
@@ -1,16 +1,42 @@
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import desc, or_, and_, func
-from typing import List, Optional
+from typing import Optional, Tuple
 from fastapi import HTTPException, status
+from datetime import datetime
 import logging
+import uuid
 
-from app.models.content import Content, ContentType, ContentLike, ContentSave, Comment, CommentLike, ContentView
-from app.models.user import User
+from app.core.config import settings
+from app.models.content import Content, ContentType, ContentLike, Comment, ContentView
 from app.schemas.content import (
     ContentCreate, ContentUpdate, ContentResponse, ContentListResponse,
-    CommentCreate, CommentResponse, LikeResponse, SaveResponse, UserBrief, ContentListItem, CommentLikeResponse
+    CommentCreate, CommentResponse, LikeResponse, SaveResponse, UserBrief, CommentLikeResponse,
+    AlbumPhotoResponse, AlbumPhotoListResponse
 )
 from app.schemas import ApiResponse
+from app.utils.pagination import apply_keyset, fetch_page, next_cursor_of
+from app.services.count_service import (
+    CountService, total_pages_of, COUNT_MODE_EXACT, COUNT_MODE_ESTIMATED, COUNT_MODE_NONE
+)
+from app.services.feed_cache_service import FeedCacheService, categories_of
+from app.services.search_service import SearchService
+from app.services.trigram_search import TrigramQueryBuilder
+from app.services.tag_stats_service import TagStatsService, tag_snapshot
+from app.services.album_stats_service import (
+    AlbumStatsService, album_snapshot, time_label, SCOPE_PUBLIC, DIMENSION_LOCATION, DIMENSION_TAG, TIME_DIMENSIONS
+)
+from app.services.view_tracker import ViewTracker
+from app.services.interaction_index import InteractionIndex, STATE_LIKED, STATE_SAVED, STATE_VIEWED
+from app.services.interaction_service import (
+    InteractionService, INTERACTION_LIKE, INTERACTION_SAVE, INTERACTION_COMMENT_LIKE
+)
+from app.services.album_photo_service import AlbumPhotoService, is_album
+from app.services.comment_loader import CommentLoader
+from app.services.comment_thread import CommentThreadService
+from app.services.list_projection import list_columns, list_query, with_authors, build_list_item, order_rows, load_bodies
+from app.services.tag_query import parse_tags, tag_clause, tag_filters_key, count_tag_facets, TAG_MODE_ANY
+from app.utils.tokenizer import highlight, normalize
 
 logger = logging.getLogger(__name__)
 
@@ -43,8 +69,20 @@ class ContentService:
             )
             
             self.db.add(content)
+            self.db.flush()
+            
+            # 同步相册照片、搜索索引与相册统计（与内容在同一事务中提交）
+            AlbumPhotoService(self.db).sync(
+                content, [photo.dict() for photo in content_data.photos] if content_data.photos else None
+            )
+            SearchService(self.db).index_content(content)
+            AlbumStatsService(self.db).apply_change(None, album_snapshot(content))
             self.db.commit()
             self.db.refresh(content)
+            CountService.invalidate("contents", f"contents:user:{user_id}")
+            TagStatsService.apply_change(None, tag_snapshot(content))
+            if content.is_public:
+                FeedCacheService.mark_stale(categories_of(content.type))
             
             logger.info(f"✅ 内容创建成功 - ID: {content.id}")
             
@@ -63,7 +101,11 @@ class ContentService:
             )
     
     def get_content(self, content_id: str, user_id: Optional[str] = None) -> ApiResponse[ContentResponse]:
-        """获取内容详情"""
+        """
+        获取内容详情（只读）
+
+        浏览记录（ViewTracker.record）与当前用户的互动状态由路由在查询完成后通过异步 Redis 客户端补充
+        """
         try:
             logger.info(f"🔍 获取内容详情 - ID: {content_id}")
             
@@ -86,39 +128,15 @@ class ContentService:
                     detail="无权访问此内容"
                 )
             
-            # 增加浏览次数
-            content.view_count += 1
-            
-            # 记录浏览历史（如果用户已登录）
-            if user_id:
-                existing_view = self.db.query(ContentView).filter(
-                    and_(ContentView.content_id == content_id, ContentView.user_id == user_id)
-                ).first()
-                
-                if existing_view:
-                    # 更新浏览时间
-                    existing_view.updated_at = func.now()
-                else:
-                    # 创建新的浏览记录
-                    new_view = ContentView(content_id=content_id, user_id=user_id)
-                    self.db.add(new_view)
-            
-            self.db.commit()
-            
             # 构建响应
             response_data = ContentResponse.from_orm(content)
             response_data.user = UserBrief.from_orm(content.user) if content.user else None
+            response_data.view_count = content.view_count or 0
             
-            # 检查当前用户是否点赞/收藏
-            if user_id:
-                is_liked = self.db.query(ContentLike).filter(
-                    and_(ContentLike.content_id == content_id, ContentLike.user_id == user_id)
-                ).first() is not None
-                is_saved = self.db.query(ContentSave).filter(
-                    and_(ContentSave.content_id == content_id, ContentSave.user_id == user_id)
-                ).first() is not None
-                response_data.is_liked = is_liked
-                response_data.is_saved = is_saved
+            # 相册只返回前几张照片，完整列表通过照片分页接口获取
+            if is_album(content):
+                response_data.photo_count = len(content.images or [])
+                response_data.images = response_data.images[:settings.ALBUM_DETAIL_PREVIEW]
             
             logger.info(f"✅ 获取内容成功 - ID: {content_id}")
             
@@ -165,12 +183,30 @@ class ContentService:
                 )
             
             # 更新字段
+            old_tags = tag_snapshot(content)
+            old_album = album_snapshot(content)
             update_data = content_data.dict(exclude_unset=True)
+            photos = update_data.pop("photos", None)
             for field, value in update_data.items():
                 setattr(content, field, value)
             
+            # 照片或扩展数据变化时重建照片行并维护 extra_data.photo_count
+            if update_data.keys() & {"images", "extra_data"} or photos is not None:
+                AlbumPhotoService(self.db).sync(content, photos)
+            
+            # 同步搜索索引
+            if update_data.keys() & {"title", "description", "content", "is_public"}:
+                SearchService(self.db).index_content(content)
+            AlbumStatsService(self.db).apply_change(old_album, album_snapshot(content))
+            
             self.db.commit()
             self.db.refresh(content)
+            CountService.invalidate("contents", f"contents:user:{user_id}")
+            TagStatsService.apply_change(old_tags, tag_snapshot(content))
+            if content.is_public:
+                FeedCacheService.mark_stale(categories_of(content.type))
+            else:
+                FeedCacheService.remove_content(content_id)
             
             logger.info(f"✅ 内容更新成功 - ID: {content_id}")
             
@@ -212,8 +248,14 @@ class ContentService:
                     detail="无权删除此内容"
                 )
             
+            old_tags = tag_snapshot(content)
+            SearchService(self.db).remove_content(content.id)
+            AlbumStatsService(self.db).apply_change(album_snapshot(content), None)
             self.db.delete(content)
             self.db.commit()
+            CountService.invalidate("contents", f"contents:user:{user_id}")
+            TagStatsService.apply_change(old_tags, None)
+            FeedCacheService.remove_content(content_id)
             
             logger.info(f"✅ 内容删除成功 - ID: {content_id}")
             
@@ -243,12 +285,24 @@ class ContentService:
         keyword: Optional[str] = None,
         tag: Optional[str] = None,
         is_featured: Optional[bool] = None,
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+        tags: Optional[str] = None,
+        tag_mode: str = TAG_MODE_ANY,
+        with_facets: bool = False,
+        sort: str = "latest",
     ) -> ApiResponse[ContentListResponse]:
-        """获取内容列表"""
+        """
+        获取内容列表（传入 cursor 时使用游标分页，忽略 page）
+
+        tag 与逗号分隔的 tags 合并后按 tag_mode（any/all）筛选；with_facets 时附带标签分面计数
+        sort=hot 时按热度分排序（热门信息流）
+        """
         try:
-            logger.info(f"📋 获取内容列表 - 页码: {page}, 类型: {content_type}")
+            logger.info(f"📋 获取内容列表 - 页码: {page}, 游标: {cursor}, 类型: {content_type}")
             
-            query = self.db.query(Content).options(joinedload(Content.user))
+            # 只查询列表项需要的列（不含正文与完整用户信息）
+            query = list_query(self.db)
             
             # 筛选条件
             if content_type:
@@ -264,33 +318,46 @@ class ContentService:
                 query = query.filter(Content.is_featured == is_featured)
             
             if keyword:
-                query = query.filter(
-                    or_(
-                        Content.title.ilike(f"%{keyword}%"),
-                        Content.content.ilike(f"%{keyword}%"),
-                        Content.description.ilike(f"%{keyword}%"),
+                # 公开内容按全文索引的精确命中集合筛选；个人内容（范围小）或无法分词时使用模糊匹配
+                terms = SearchService.query_terms(keyword) if is_public is True else []
+                if terms:
+                    query = query.filter(Content.id.in_(SearchService(self.db).match_ids(terms)))
+                else:
+                    query = query.filter(
+                        or_(
+                            Content.title.ilike(f"%{keyword}%"),
+                            Content.content.ilike(f"%{keyword}%"),
+                            Content.description.ilike(f"%{keyword}%"),
+                        )
                     )
-                )
             
-            if tag:
-                query = query.filter(Content.tags.contains([tag]))
+            tag_set = parse_tags(tag, tags)
+            if tag_set:
+                query = query.filter(tag_clause(Content.tags, tag_set, tag_mode))
+            
+            # 总数（公开信息流无筛选时使用规划器估算，其余按筛选条件缓存精确值）
+            total, total_mode = CountService(self.db).get_total(
+                query,
+                scope=f"contents:user:{user_id}" if user_id else "contents",
+                filters={
+                    "type": content_type, "user_id": user_id, "is_public": is_public,
+                    "keyword": keyword, "tags": tag_filters_key(tag_set, tag_mode), "is_featured": is_featured,
+                },
+                with_total=with_total,
+                allow_estimate=is_public is True and not (user_id or keyword or tag_set),
+            )
+            facets = count_tag_facets(self.db, query) if with_facets else None
             
-            # 总数
-            total = query.count()
-            
-            # 分页
-            offset = (page - 1) * page_size
-            contents = query.order_by(desc(Content.created_at)).offset(offset).limit(page_size).all()
+            # 分页（游标模式下按 (排序键, id) 定位，不再扫描跳过的行）
+            sort_col = Content.hot_score if sort == "hot" else Content.created_at
+            query = apply_keyset(with_authors(query), sort_col, Content.id, cursor)
+            contents, has_more = fetch_page(query, page, page_size, cursor)
             
             # 计算总页数
-            total_pages = (total + page_size - 1) // page_size
+            total_pages = total_pages_of(total, page_size)
             
             # 构建响应
-            items = []
-            for content in contents:
-                item = ContentListItem.from_orm(content)
-                item.user = UserBrief.from_orm(content.user) if content.user else None
-                items.append(item)
+            items = [build_list_item(row) for row in contents]
             
             logger.info(f"✅ 获取内容列表成功 - 总数: {total}")
             
@@ -302,10 +369,18 @@ class ContentService:
                     page=page,
                     page_size=page_size,
                     total_pages=total_pages,
+                    total_mode=total_mode,
+                    next_cursor=next_cursor_of(
+                        contents, has_more, key=lambda row: (getattr(row, sort_col.key), row.id),
+                        sort_key=sort_col.key,
+                    ),
+                    facets=facets,
                 ),
                 msg="获取成功",
                 errMsg=None
             )
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"❌ 获取内容列表失败 - 错误: {str(e)}", exc_info=True)
             raise HTTPException(
@@ -313,39 +388,96 @@ class ContentService:
                 detail=f"获取内容列表失败: {str(e)}"
             )
     
+    def explore_contents(
+        self,
+        page: int = 1,
+        page_size: int = 20,
+        category: Optional[str] = None,
+        keyword: Optional[str] = None,
+        tag: Optional[str] = None,
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+        tags: Optional[str] = None,
+        tag_mode: str = TAG_MODE_ANY,
+        with_facets: bool = False,
+    ) -> ApiResponse[ContentListResponse]:
+        """探索内容（信息流缓存由路由通过 explore_cache_slot 判断并读取）"""
+        # 处理分类
+        content_type = None
+        sort = "latest"
+        if category == "daily":
+            content_type = ContentType.DAILY
+        elif category == "album":
+            content_type = ContentType.ALBUM
+        elif category == "travel":
+            content_type = ContentType.TRAVEL
+        elif category == "popular":
+            # 按热度分排序（后台任务按互动与时间衰减刷新）
+            sort = "hot"
+        
+        return self.list_contents(
+            page=page,
+            page_size=page_size,
+            content_type=content_type,
+            is_public=True,
+            keyword=keyword,
+            tag=tag,
+            cursor=cursor,
+            with_total=with_total,
+            sort=sort,
+            tags=tags,
+            tag_mode=tag_mode,
+            with_facets=with_facets,
+        )
+    
+    @staticmethod
+    def explore_cache_slot(
+        page: int,
+        category: Optional[str] = None,
+        keyword: Optional[str] = None,
+        tag: Optional[str] = None,
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+        anonymous: bool = False,
+        tags: Optional[str] = None,
+        with_facets: bool = False,
+    ) -> Optional[Tuple[str, Optional[str]]]:
+        """
+        探索页请求对应的信息流缓存位置 (分类, 标签)，不走缓存时返回 None
+
+        缓存只覆盖未登录访客的单标签页面；多标签组合与分面请求直接查询（均走 GIN 索引）
+        """
+        tag_set = parse_tags(tag, tags)
+        if (
+            not with_total
+            or len(tag_set) > 1
+            or with_facets
+            or not FeedCacheService.is_cacheable(page, keyword, cursor, anonymous)
+        ):
+            return None
+        cache_category = category if category in ("daily", "album", "travel", "popular") else "all"
+        return cache_category, (tag_set[0] if tag_set else None)
+    
     def toggle_like(self, content_id: str, user_id: str) -> ApiResponse[LikeResponse]:
         """切换点赞状态"""
         try:
             logger.info(f"👍 切换点赞 - 内容ID: {content_id}, 用户ID: {user_id}")
             
-            content = self.db.query(Content).filter(Content.id == content_id).first()
-            if not content:
+            # 单条语句完成切换与计数更新
+            result = InteractionService(self.db).toggle(INTERACTION_LIKE, content_id, user_id)
+            if result is None:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="内容不存在")
-            
-            # 检查是否已点赞
-            existing_like = self.db.query(ContentLike).filter(
-                and_(ContentLike.content_id == content_id, ContentLike.user_id == user_id)
-            ).first()
-            
-            if existing_like:
-                # 取消点赞
-                self.db.delete(existing_like)
-                content.like_count = max(0, content.like_count - 1)
-                is_liked = False
-            else:
-                # 添加点赞
-                new_like = ContentLike(content_id=content_id, user_id=user_id)
-                self.db.add(new_like)
-                content.like_count += 1
-                is_liked = True
+            is_liked, like_count = result
             
             self.db.commit()
+            InteractionIndex.update(user_id, STATE_LIKED, content_id, is_liked)
+            CountService.invalidate(f"likes:{user_id}")
             
             logger.info(f"✅ 点赞状态更新 - 是否点赞: {is_liked}")
             
             return ApiResponse(
                 code=200,
-                data=LikeResponse(is_liked=is_liked, like_count=content.like_count),
+                data=LikeResponse(is_liked=is_liked, like_count=like_count),
                 msg="操作成功",
                 errMsg=None
             )
@@ -364,34 +496,20 @@ class ContentService:
         try:
             logger.info(f"⭐ 切换收藏 - 内容ID: {content_id}, 用户ID: {user_id}")
             
-            content = self.db.query(Content).filter(Content.id == content_id).first()
-            if not content:
+            # 单条语句完成切换与计数更新
+            result = InteractionService(self.db).toggle(INTERACTION_SAVE, content_id, user_id)
+            if result is None:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="内容不存在")
-            
-            # 检查是否已收藏
-            existing_save = self.db.query(ContentSave).filter(
-                and_(ContentSave.content_id == content_id, ContentSave.user_id == user_id)
-            ).first()
-            
-            if existing_save:
-                # 取消收藏
-                self.db.delete(existing_save)
-                content.save_count = max(0, content.save_count - 1)
-                is_saved = False
-            else:
-                # 添加收藏
-                new_save = ContentSave(content_id=content_id, user_id=user_id)
-                self.db.add(new_save)
-                content.save_count += 1
-                is_saved = True
+            is_saved, save_count = result
             
             self.db.commit()
+            InteractionIndex.update(user_id, STATE_SAVED, content_id, is_saved)
             
             logger.info(f"✅ 收藏状态更新 - 是否收藏: {is_saved}")
             
             return ApiResponse(
                 code=200,
-                data=SaveResponse(is_saved=is_saved, save_count=content.save_count),
+                data=SaveResponse(is_saved=is_saved, save_count=save_count),
                 msg="操作成功",
                 errMsg=None
             )
@@ -416,18 +534,30 @@ class ContentService:
             if not content:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="内容不存在")
             
-            # 创建评论
+            parent = None
+            if comment_data.parent_id:
+                parent = self.db.query(Comment).filter(
+                    and_(Comment.id == comment_data.parent_id, Comment.content_id == content_id)
+                ).first()
+                if not parent:
+                    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="父评论不存在")
+            
+            # 创建评论（先确定 id 与创建时间，用于生成线程路径）
             comment = Comment(
+                id=uuid.uuid4(),
                 content_id=content_id,
                 user_id=user_id,
                 comment_text=comment_data.comment_text,
                 parent_id=comment_data.parent_id,
+                created_at=datetime.utcnow(),
             )
+            CommentThreadService(self.db).attach(comment, parent)
             
             self.db.add(comment)
             content.comment_count += 1
             self.db.commit()
             self.db.refresh(comment)
+            CountService.invalidate(f"comments:{content_id}", f"user_comments:{user_id}")
             
             # 加载用户信息
             comment_with_user = self.db.query(Comment).options(
@@ -470,7 +600,8 @@ class ContentService:
             )
     
     def get_comments(
-        self, content_id: str, page: int = 1, page_size: int = 20, user_id: Optional[str] = None
+        self, content_id: str, page: int = 1, page_size: int = 20, user_id: Optional[str] = None,
+        with_total: bool = True,
     ) -> ApiResponse[dict]:
         """获取评论列表"""
         try:
@@ -483,75 +614,18 @@ class ContentService:
                 and_(Comment.content_id == content_id, Comment.parent_id == None)
             )
             
-            total = query.count()
+            total, total_mode = CountService(self.db).get_total(
+                query, scope=f"comments:{content_id}", filters={"top_level": 1}, with_total=with_total
+            )
             offset = (page - 1) * page_size
-            comments = query.order_by(desc(Comment.created_at)).offset(offset).limit(page_size).all()
+            comments = query.order_by(
+                desc(Comment.created_at), desc(Comment.id)
+            ).offset(offset).limit(page_size).all()
             
-            # 构建响应
-            items = []
-            for comment in comments:
-                # 手动构建 CommentResponse，避免 content 字段验证问题
-                comment_data = CommentResponse(
-                    id=str(comment.id),
-                    content_id=str(comment.content_id),
-                    user_id=str(comment.user_id),
-                    comment_text=comment.comment_text,
-                    parent_id=str(comment.parent_id) if comment.parent_id else None,
-                    like_count=comment.like_count,
-                    created_at=comment.created_at,
-                    updated_at=comment.updated_at,
-                    user=UserBrief.from_orm(comment.user) if comment.user else None,
-                    replies=[],
-                    is_liked=False,
-                    reply_count=0,
-                    content=None
-                )
-                
-                # 检查当前用户是否点赞
-                if user_id:
-                    is_liked = self.db.query(CommentLike).filter(
-                        and_(CommentLike.comment_id == comment.id, CommentLike.user_id == user_id)
-                    ).first() is not None
-                    comment_data.is_liked = is_liked
-                
-                # 获取回复数量（只获取前3条回复用于预览）
-                reply_count = self.db.query(Comment).filter(Comment.parent_id == comment.id).count()
-                comment_data.reply_count = reply_count
-                
-                # 获取前3条回复作为预览
-                replies = self.db.query(Comment).options(
-                    joinedload(Comment.user)
-                ).filter(Comment.parent_id == comment.id).order_by(Comment.created_at).limit(3).all()
-                
-                for reply in replies:
-                    reply_data = CommentResponse(
-                        id=str(reply.id),
-                        content_id=str(reply.content_id),
-                        user_id=str(reply.user_id),
-                        comment_text=reply.comment_text,
-                        parent_id=str(reply.parent_id) if reply.parent_id else None,
-                        like_count=reply.like_count,
-                        created_at=reply.created_at,
-                        updated_at=reply.updated_at,
-                        user=UserBrief.from_orm(reply.user) if reply.user else None,
-                        replies=None,
-                        is_liked=False,
-                        reply_count=0,
-                        content=None
-                    )
-                    
-                    # 检查当前用户是否点赞回复
-                    if user_id:
-                        is_liked = self.db.query(CommentLike).filter(
-                            and_(CommentLike.comment_id == reply.id, CommentLike.user_id == user_id)
-                        ).first() is not None
-                        reply_data.is_liked = is_liked
-                    
-                    comment_data.replies.append(reply_data)
-                
-                items.append(comment_data)
+            # 回复预览、回复数、点赞状态按整页批量加载
+            items = CommentLoader(self.db).load_threads(comments, user_id)
             
-            total_pages = (total + page_size - 1) // page_size
+            total_pages = total_pages_of(total, page_size)
             
             logger.info(f"✅ 获取评论列表成功 - 总数: {total}")
             
@@ -563,6 +637,7 @@ class ContentService:
                     "page": page,
                     "page_size": page_size,
                     "total_pages": total_pages,
+                    "total_mode": total_mode,
                 },
                 msg="获取成功",
                 errMsg=None
@@ -574,23 +649,21 @@ class ContentService:
                 detail=f"获取评论列表失败: {str(e)}"
             )
     
-    def get_hot_tags(self, limit: int = 10) -> ApiResponse[dict]:
-        """获取热门标签"""
+    @staticmethod
+    async def get_hot_tags(
+        db: AsyncSession,
+        limit: int = 10,
+        window: str = "all",
+        content_type: Optional[ContentType] = None,
+    ) -> ApiResponse[dict]:
+        """获取热门标签（异步读取增量维护的标签计数，不再扫描内容表）"""
         try:
-            logger.info(f"🏷️  获取热门标签 - 数量: {limit}")
-            
-            # 查询所有公开内容的标签
-            contents = self.db.query(Content).filter(Content.is_public == True).all()
+            logger.info(f"🏷️  获取热门标签 - 数量: {limit}, 时间窗口: {window}, 类型: {content_type}")
             
-            # 统计标签使用次数
-            tag_counts = {}
-            for content in contents:
-                if content.tags:
-                    for tag in content.tags:
-                        tag_counts[tag] = tag_counts.get(tag, 0) + 1
+            hot_tags = await TagStatsService.top_tags_async(db, limit, window, content_type)
             
             # 如果没有标签，返回默认热门标签
-            if not tag_counts:
+            if not hot_tags:
                 default_tags = [
                     {"name": "生活", "count": 0},
                     {"name": "美食", "count": 0},
@@ -611,15 +684,6 @@ class ContentService:
                     errMsg=None
                 )
             
-            # 按使用次数排序
-            sorted_tags = sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)
-            
-            # 构建响应
-            hot_tags = [
-                {"name": tag, "count": count}
-                for tag, count in sorted_tags[:limit]
-            ]
-            
             logger.info(f"✅ 获取热门标签成功 - 数量: {len(hot_tags)}")
             
             return ApiResponse(
@@ -635,53 +699,103 @@ class ContentService:
                 detail=f"获取热门标签失败: {str(e)}"
             )
     
-    def get_album_stats_by_location(self, user_id: Optional[str] = None) -> ApiResponse[dict]:
-        """按地点统计相册"""
+    def _album_stats(
+        self, dimension: str, user_id: Optional[str], page: int, page_size: int, build_item
+    ) -> Tuple[list, int]:
+        """读取相册统计汇总（user_id 为空时统计全部公开相册）"""
+        rows, total = AlbumStatsService(self.db).list_buckets(
+            user_id or SCOPE_PUBLIC, dimension, page, page_size
+        )
+        return [build_item(row) for row in rows], total
+    
+    def get_album_photos(
+        self,
+        content_id: str,
+        user_id: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 50,
+        cursor: Optional[str] = None,
+    ) -> ApiResponse[AlbumPhotoListResponse]:
+        """分页获取相册照片（按相册中的顺序）"""
         try:
-            logger.info(f"📍 按地点统计相册 - 用户ID: {user_id}")
+            logger.info(f"🖼️  获取相册照片 - 相册ID: {content_id}, 页码: {page}, 游标: {cursor}")
             
-            query = self.db.query(Content).filter(Content.type == ContentType.ALBUM)
+            album = self.db.query(
+                Content.user_id,
+                Content.type,
+                Content.is_public,
+                func.coalesce(func.cardinality(Content.images), 0).label("photo_count"),
+            ).filter(Content.id == content_id).first()
             
-            # 如果指定用户，只统计该用户的相册
-            if user_id:
-                query = query.filter(Content.user_id == user_id)
-            else:
-                # 否则只统计公开的相册
-                query = query.filter(Content.is_public == True)
+            if not album or not is_album(album):
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="相册不存在")
+            
+            # 私密相册只有作者可以查看
+            if not album.is_public and str(album.user_id) != user_id:
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="无权访问此内容")
+            
+            photos, next_cursor = AlbumPhotoService(self.db).list_photos(content_id, page, page_size, cursor)
+            
+            items = [
+                AlbumPhotoResponse(
+                    id=str(photo.id),
+                    position=photo.position,
+                    url=photo.object_key,
+                    width=photo.width,
+                    height=photo.height,
+                    size=photo.size,
+                    taken_at=photo.taken_at,
+                )
+                for photo in photos
+            ]
+            
+            logger.info(f"✅ 获取相册照片成功 - 总数: {album.photo_count}")
+            
+            return ApiResponse(
+                code=200,
+                data=AlbumPhotoListResponse(
+                    items=items,
+                    total=album.photo_count,
+                    page=page,
+                    page_size=page_size,
+                    total_pages=total_pages_of(album.photo_count, page_size),
+                    next_cursor=next_cursor,
+                ),
+                msg="获取成功",
+                errMsg=None
+            )
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"❌ 获取相册照片失败 - 错误: {str(e)}", exc_info=True)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"获取相册照片失败: {str(e)}"
+            )
+    
+    def get_album_stats_by_location(
+        self, user_id: Optional[str] = None, page: int = 1, page_size: int = 50
+    ) -> ApiResponse[dict]:
+        """按地点统计相册（读取汇总表，桶内相册通过下钻接口分页获取）"""
+        try:
+            logger.info(f"📍 按地点统计相册 - 用户ID: {user_id}")
             
-            albums = query.all()
-            
-            # 统计地点
-            location_stats = {}
-            for album in albums:
-                if album.location:
-                    location = album.location.strip()
-                    if location not in location_stats:
-                        location_stats[location] = {
-                            "location": location,
-                            "count": 0,
-                            "photo_count": 0,
-                            "albums": []
-                        }
-                    
-                    location_stats[location]["count"] += 1
-                    photo_count = len(album.images) if album.images else 0
-                    location_stats[location]["photo_count"] += photo_count
-                    location_stats[location]["albums"].append({
-                        "id": str(album.id),
-                        "title": album.title,
-                        "photo_count": photo_count,
-                        "created_at": album.created_at.isoformat(),
-                    })
-            
-            # 按相册数量排序
-            sorted_stats = sorted(location_stats.values(), key=lambda x: x["count"], reverse=True)
-            
-            logger.info(f"✅ 地点统计成功 - 地点数: {len(sorted_stats)}")
+            locations, total = self._album_stats(
+                DIMENSION_LOCATION, user_id, page, page_size,
+                lambda row: {"location": row.bucket, "count": row.album_count, "photo_count": row.photo_count},
+            )
+            
+            logger.info(f"✅ 地点统计成功 - 地点数: {total}")
             
             return ApiResponse(
                 code=200,
-                data={"locations": sorted_stats},
+                data={
+                    "locations": locations,
+                    "total": total,
+                    "page": page,
+                    "page_size": page_size,
+                    "total_pages": total_pages_of(total, page_size),
+                },
                 msg="获取成功",
                 errMsg=None
             )
@@ -692,54 +806,29 @@ class ContentService:
                 detail=f"地点统计失败: {str(e)}"
             )
     
-    def get_album_stats_by_tag(self, user_id: Optional[str] = None) -> ApiResponse[dict]:
-        """按标签统计相册"""
+    def get_album_stats_by_tag(
+        self, user_id: Optional[str] = None, page: int = 1, page_size: int = 50
+    ) -> ApiResponse[dict]:
+        """按标签统计相册（读取汇总表，桶内相册通过下钻接口分页获取）"""
         try:
             logger.info(f"🏷️  按标签统计相册 - 用户ID: {user_id}")
             
-            query = self.db.query(Content).filter(Content.type == ContentType.ALBUM)
-            
-            # 如果指定用户，只统计该用户的相册
-            if user_id:
-                query = query.filter(Content.user_id == user_id)
-            else:
-                # 否则只统计公开的相册
-                query = query.filter(Content.is_public == True)
+            tags, total = self._album_stats(
+                DIMENSION_TAG, user_id, page, page_size,
+                lambda row: {"tag": row.bucket, "count": row.album_count, "photo_count": row.photo_count},
+            )
             
-            albums = query.all()
-            
-            # 统计标签
-            tag_stats = {}
-            for album in albums:
-                if album.tags:
-                    for tag in album.tags:
-                        tag = tag.strip()
-                        if tag not in tag_stats:
-                            tag_stats[tag] = {
-                                "tag": tag,
-                                "count": 0,
-                                "photo_count": 0,
-                                "albums": []
-                            }
-                        
-                        tag_stats[tag]["count"] += 1
-                        photo_count = len(album.images) if album.images else 0
-                        tag_stats[tag]["photo_count"] += photo_count
-                        tag_stats[tag]["albums"].append({
-                            "id": str(album.id),
-                            "title": album.title,
-                            "photo_count": photo_count,
-                            "created_at": album.created_at.isoformat(),
-                        })
-            
-            # 按相册数量排序
-            sorted_stats = sorted(tag_stats.values(), key=lambda x: x["count"], reverse=True)
-            
-            logger.info(f"✅ 标签统计成功 - 标签数: {len(sorted_stats)}")
+            logger.info(f"✅ 标签统计成功 - 标签数: {total}")
             
             return ApiResponse(
                 code=200,
-                data={"tags": sorted_stats},
+                data={
+                    "tags": tags,
+                    "total": total,
+                    "page": page,
+                    "page_size": page_size,
+                    "total_pages": total_pages_of(total, page_size),
+                },
                 msg="获取成功",
                 errMsg=None
             )
@@ -750,78 +839,101 @@ class ContentService:
                 detail=f"标签统计失败: {str(e)}"
             )
     
-    def get_album_stats_by_timeline(self, user_id: Optional[str] = None, group_by: str = "month") -> ApiResponse[dict]:
-        """按时间轴统计相册"""
+    def get_album_stats_by_timeline(
+        self, user_id: Optional[str] = None, group_by: str = "month", page: int = 1, page_size: int = 50
+    ) -> ApiResponse[dict]:
+        """按时间轴统计相册（读取汇总表，桶内相册通过下钻接口分页获取）"""
         try:
             logger.info(f"📅 按时间轴统计相册 - 用户ID: {user_id}, 分组: {group_by}")
             
-            query = self.db.query(Content).filter(Content.type == ContentType.ALBUM)
+            if group_by not in TIME_DIMENSIONS:
+                group_by = "month"
+            
+            timeline, total = self._album_stats(
+                group_by, user_id, page, page_size,
+                lambda row: {
+                    "time_key": row.bucket,
+                    "time_label": time_label(group_by, row.bucket),
+                    "count": row.album_count,
+                    "photo_count": row.photo_count,
+                },
+            )
+            
+            logger.info(f"✅ 时间轴统计成功 - 时间段数: {total}")
+            
+            return ApiResponse(
+                code=200,
+                data={
+                    "timeline": timeline,
+                    "group_by": group_by,
+                    "total": total,
+                    "page": page,
+                    "page_size": page_size,
+                    "total_pages": total_pages_of(total, page_size),
+                },
+                msg="获取成功",
+                errMsg=None
+            )
+        except Exception as e:
+            logger.error(f"❌ 时间轴统计失败 - 错误: {str(e)}", exc_info=True)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"时间轴统计失败: {str(e)}"
+            )
+    
+    def get_album_stats_bucket_albums(
+        self,
+        dimension: str,
+        bucket: str,
+        user_id: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 20,
+        cursor: Optional[str] = None,
+    ) -> ApiResponse[ContentListResponse]:
+        """统计桶下钻：分页获取某个地点/标签/时间段内的相册（总数直接取自汇总表）"""
+        try:
+            logger.info(f"🔎 相册统计下钻 - 维度: {dimension}, 分桶: {bucket}, 用户ID: {user_id}")
             
-            # 如果指定用户，只统计该用户的相册
+            stats_service = AlbumStatsService(self.db)
+            query = list_query(self.db).filter(
+                Content.type == ContentType.ALBUM,
+                stats_service.bucket_filter(dimension, bucket),
+            )
             if user_id:
                 query = query.filter(Content.user_id == user_id)
             else:
-                # 否则只统计公开的相册
                 query = query.filter(Content.is_public == True)
             
-            albums = query.order_by(desc(Content.created_at)).all()
+            stat = stats_service.get_bucket(user_id or SCOPE_PUBLIC, dimension, bucket)
+            total = stat.album_count if stat else 0
             
-            # 统计时间轴
-            timeline_stats = {}
-            for album in albums:
-                created_at = album.created_at
-                
-                # 根据分组方式生成时间键
-                if group_by == "year":
-                    time_key = created_at.strftime("%Y")
-                    time_label = f"{created_at.year}年"
-                elif group_by == "month":
-                    time_key = created_at.strftime("%Y-%m")
-                    time_label = f"{created_at.year}年{created_at.month}月"
-                elif group_by == "day":
-                    time_key = created_at.strftime("%Y-%m-%d")
-                    time_label = f"{created_at.year}年{created_at.month}月{created_at.day}日"
-                else:
-                    time_key = created_at.strftime("%Y-%m")
-                    time_label = f"{created_at.year}年{created_at.month}月"
-                
-                if time_key not in timeline_stats:
-                    timeline_stats[time_key] = {
-                        "time_key": time_key,
-                        "time_label": time_label,
-                        "count": 0,
-                        "photo_count": 0,
-                        "albums": []
-                    }
-                
-                timeline_stats[time_key]["count"] += 1
-                photo_count = len(album.images) if album.images else 0
-                timeline_stats[time_key]["photo_count"] += photo_count
-                timeline_stats[time_key]["albums"].append({
-                    "id": str(album.id),
-                    "title": album.title,
-                    "photo_count": photo_count,
-                    "location": album.location,
-                    "tags": album.tags,
-                    "created_at": album.created_at.isoformat(),
-                })
-            
-            # 按时间倒序排序
-            sorted_stats = sorted(timeline_stats.values(), key=lambda x: x["time_key"], reverse=True)
-            
-            logger.info(f"✅ 时间轴统计成功 - 时间段数: {len(sorted_stats)}")
+            query = apply_keyset(with_authors(query), Content.created_at, Content.id, cursor)
+            albums, has_more = fetch_page(query, page, page_size, cursor)
+            
+            items = [build_list_item(row) for row in albums]
+            
+            logger.info(f"✅ 相册统计下钻成功 - 总数: {total}")
             
             return ApiResponse(
                 code=200,
-                data={"timeline": sorted_stats, "group_by": group_by},
+                data=ContentListResponse(
+                    items=items,
+                    total=total,
+                    page=page,
+                    page_size=page_size,
+                    total_pages=total_pages_of(total, page_size),
+                    next_cursor=next_cursor_of(albums, has_more),
+                ),
                 msg="获取成功",
                 errMsg=None
             )
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"❌ 时间轴统计失败 - 错误: {str(e)}", exc_info=True)
+            logger.error(f"❌ 相册统计下钻失败 - 错误: {str(e)}", exc_info=True)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"时间轴统计失败: {str(e)}"
+                detail=f"相册统计下钻失败: {str(e)}"
             )
     
     def search_contents(
@@ -831,52 +943,130 @@ class ContentService:
         content_type: Optional[ContentType] = None,
         page: int = 1,
         page_size: int = 20,
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+        match: str = "fulltext",
     ) -> ApiResponse[ContentListResponse]:
-        """搜索内容（支持标题和作者名称模糊检索）"""
+        """
+        搜索内容（支持标题和作者名称检索）
+
+        - match=fulltext：关键词走全文索引按相关度排序；无法分词时回退到子串匹配
+        - match=substring：标题/描述子串匹配，有三元组索引时按相似度排序
+        按相关度/相似度排序时忽略 cursor；仅按时间排序时支持游标分页
+        """
         try:
             logger.info(f"🔍 搜索内容 - 关键词: {keyword}, 作者: {author}, 类型: {content_type}")
             
-            query = self.db.query(Content).options(joinedload(Content.user)).filter(Content.is_public == True)
+            filters = [Content.is_public == True]
             
             # 内容类型筛选
             if content_type:
-                query = query.filter(Content.type == content_type)
+                filters.append(Content.type == content_type)
             
-            # 标题关键词搜索
-            if keyword:
-                query = query.filter(
-                    or_(
-                        Content.title.ilike(f"%{keyword}%"),
-                        Content.description.ilike(f"%{keyword}%"),
-                        Content.content.ilike(f"%{keyword}%"),
-                    )
-                )
+            trigram = TrigramQueryBuilder(self.db)
+            score = None
             
-            # 作者名称模糊搜索
-            if author:
-                query = query.join(User).filter(
-                    or_(
-                        User.username.ilike(f"%{author}%"),
-                        User.email.ilike(f"%{author}%"),
-                    )
-                )
+            # 作者名称模糊搜索：先在 users 上筛出作者，再按 user_id 关联内容
+            authors = trigram.author_subquery(author) if author else None
+            if authors is not None and trigram.enabled:
+                score = authors.c.author_score
             
-            # 总数
-            total = query.count()
+            def base_query(*entities):
+                q = self.db.query(*entities).filter(*filters)
+                if authors is not None:
+                    q = q.join(authors, Content.user_id == authors.c.user_id)
+                return q
             
-            # 分页
-            offset = (page - 1) * page_size
-            contents = query.order_by(desc(Content.created_at)).offset(offset).limit(page_size).all()
+            # 只查询列表项需要的列（不含正文与完整用户信息）
+            query = base_query(*list_columns())
+            
+            # 关键词搜索：优先使用全文索引
+            terms = []
+            if keyword:
+                if match != "substring":
+                    terms = SearchService.query_terms(keyword)
+                if not terms:
+                    clause, keyword_score = trigram.keyword_clause(keyword)
+                    query = query.filter(clause)
+                    if keyword_score is not None:
+                        score = keyword_score if score is None else score + keyword_score
+            
+            if terms:
+                search_service = SearchService(self.db)
+                offset = (page - 1) * page_size
+                limit = max(settings.SEARCH_MAX_CANDIDATES, offset + page_size)
+                # 有类型/作者筛选时每个词项只读取筛选后内容的倒排记录，避免候选集被其他内容占满
+                filtered = content_type is not None or authors is not None
+                candidates = base_query(Content.id).statement if filtered else None
+                hits, _, complete = search_service.search(keyword, limit, candidates)
+                if not complete and len(hits) < offset + page_size:
+                    # 倒排记录被截断且请求的页超出已排序的结果：只为这一页做一次精确检索
+                    hits, _, complete = search_service.search(keyword, limit, candidates, exact=True)
+                
+                # 候选集已按相关度排好序，这里只做筛选与分页
+                scores = dict(hits)
+                matched = [
+                    row.id for row in base_query(Content.id).filter(Content.id.in_(list(scores))).all()
+                ] if scores else []
+                matched.sort(key=lambda cid: scores[cid], reverse=True)
+                
+                if complete or not with_total:
+                    total = len(matched) if with_total else None
+                    total_mode = COUNT_MODE_EXACT if with_total else COUNT_MODE_NONE
+                else:
+                    # 结果被截断时估算总数（按词项文档频率，筛选条件按规划器估算的比例折算），不做全量计数
+                    selectivity = 1.0
+                    if filtered:
+                        doc_count = search_service.doc_count()
+                        estimated = CountService(self.db).estimate(base_query(Content.id))
+                        if doc_count and estimated is not None:
+                            selectivity = estimated / doc_count
+                    total = max(len(matched), search_service.estimate_matches(terms, selectivity))
+                    total_mode = COUNT_MODE_ESTIMATED
+                page_ids = matched[offset:offset + page_size]
+                rows = with_authors(query).filter(Content.id.in_(page_ids)).all() if page_ids else []
+                contents = order_rows(rows, page_ids)
+                next_cursor = None
+            else:
+                # 总数
+                total, total_mode = CountService(self.db).get_total(
+                    query,
+                    scope="contents",
+                    filters={
+                        "search": 1, "keyword": keyword, "author": author,
+                        "type": content_type, "match": match,
+                    },
+                    with_total=with_total,
+                )
+                
+                if score is not None:
+                    # 三元组相似度排序
+                    offset = (page - 1) * page_size
+                    contents = with_authors(query).order_by(
+                        desc(score), desc(Content.created_at), desc(Content.id)
+                    ).offset(offset).limit(page_size).all()
+                    next_cursor = None
+                else:
+                    # 分页（游标模式下按 (created_at, id) 定位，不再扫描跳过的行）
+                    query = apply_keyset(with_authors(query), Content.created_at, Content.id, cursor)
+                    contents, has_more = fetch_page(query, page, page_size, cursor)
+                    next_cursor = next_cursor_of(contents, has_more)
             
             # 计算总页数
-            total_pages = (total + page_size - 1) // page_size
+            total_pages = total_pages_of(total, page_size)
             
             # 构建响应
-            items = []
-            for content in contents:
-                item = ContentListItem.from_orm(content)
-                item.user = UserBrief.from_orm(content.user) if content.user else None
-                items.append(item)
+            highlight_terms = terms or ([normalize(keyword)] if keyword else [])
+            items = [build_list_item(row) for row in contents]
+            if highlight_terms:
+                snippets = {row.id: highlight(row.description, highlight_terms) for row in contents}
+                # 描述未命中时才读取正文生成摘要（只针对本页的少量内容）
+                bodies = load_bodies(self.db, [cid for cid, snippet in snippets.items() if snippet is None])
+                for row, item in zip(contents, items):
+                    item.highlight = {
+                        "title": highlight(row.title, highlight_terms),
+                        "snippet": snippets[row.id] or highlight(bodies.get(row.id), highlight_terms),
+                    }
             
             logger.info(f"✅ 搜索成功 - 找到 {total} 条结果")
             
@@ -888,42 +1078,31 @@ class ContentService:
                     page=page,
                     page_size=page_size,
                     total_pages=total_pages,
+                    total_mode=total_mode,
+                    next_cursor=next_cursor,
                 ),
                 msg="搜索成功",
                 errMsg=None
             )
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"❌ 搜索失败 - 错误: {str(e)}", exc_info=True)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"搜索失败: {str(e)}"
             )
-    
+
     def toggle_comment_like(self, comment_id: str, user_id: str) -> ApiResponse[CommentLikeResponse]:
         """切换评论点赞状态"""
         try:
             logger.info(f"👍 切换评论点赞 - 评论ID: {comment_id}, 用户ID: {user_id}")
             
-            comment = self.db.query(Comment).filter(Comment.id == comment_id).first()
-            if not comment:
+            # 单条语句完成切换与计数更新
+            result = InteractionService(self.db).toggle(INTERACTION_COMMENT_LIKE, comment_id, user_id)
+            if result is None:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="评论不存在")
-            
-            # 检查是否已点赞
-            existing_like = self.db.query(CommentLike).filter(
-                and_(CommentLike.comment_id == comment_id, CommentLike.user_id == user_id)
-            ).first()
-            
-            if existing_like:
-                # 取消点赞
-                self.db.delete(existing_like)
-                comment.like_count = max(0, comment.like_count - 1)
-                is_liked = False
-            else:
-                # 添加点赞
-                new_like = CommentLike(comment_id=comment_id, user_id=user_id)
-                self.db.add(new_like)
-                comment.like_count += 1
-                is_liked = True
+            is_liked, like_count = result
             
             self.db.commit()
             
@@ -931,7 +1110,7 @@ class ContentService:
             
             return ApiResponse(
                 code=200,
-                data=CommentLikeResponse(is_liked=is_liked, like_count=comment.like_count),
+                data=CommentLikeResponse(is_liked=is_liked, like_count=like_count),
                 msg="操作成功",
                 errMsg=None
             )
@@ -946,42 +1125,33 @@ class ContentService:
             )
     
     def get_comment_replies(
-        self, comment_id: str, page: int = 1, page_size: int = 10, user_id: Optional[str] = None
+        self, comment_id: str, page: int = 1, page_size: int = 10, user_id: Optional[str] = None,
+        cursor: Optional[str] = None, with_total: bool = True,
     ) -> ApiResponse[dict]:
-        """获取评论的回复列表（分页）"""
+        """获取评论的回复列表（按时间正序；传入 cursor 时使用游标分页，忽略 page）"""
         try:
-            logger.info(f"📋 获取评论回复 - 评论ID: {comment_id}, 页码: {page}")
+            logger.info(f"📋 获取评论回复 - 评论ID: {comment_id}, 页码: {page}, 游标: {cursor}")
             
             # 检查评论是否存在
-            comment = self.db.query(Comment).filter(Comment.id == comment_id).first()
-            if not comment:
+            exists = self.db.query(Comment.id).filter(Comment.id == comment_id).first()
+            if not exists:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="评论不存在")
             
             # 查询回复
-            query = self.db.query(Comment).options(
-                joinedload(Comment.user)
-            ).filter(Comment.parent_id == comment_id)
+            query = self.db.query(Comment).filter(Comment.parent_id == comment_id)
             
-            total = query.count()
-            offset = (page - 1) * page_size
-            replies = query.order_by(Comment.created_at).offset(offset).limit(page_size).all()
+            total = query.count() if with_total else None
             
-            # 构建响应
-            items = []
-            for reply in replies:
-                reply_data = CommentResponse.from_orm(reply)
-                reply_data.user = UserBrief.from_orm(reply.user) if reply.user else None
-                
-                # 检查当前用户是否点赞
-                if user_id:
-                    is_liked = self.db.query(CommentLike).filter(
-                        and_(CommentLike.comment_id == reply.id, CommentLike.user_id == user_id)
-                    ).first() is not None
-                    reply_data.is_liked = is_liked
-                
-                items.append(reply_data)
+            # 分页（游标模式下按 (created_at, id) 正序定位，命中 (parent_id, created_at, id) 索引）
+            query = apply_keyset(
+                query.options(joinedload(Comment.user)), Comment.created_at, Comment.id, cursor, ascending=True
+            )
+            replies, has_more = fetch_page(query, page, page_size, cursor)
+            
+            # 构建响应（点赞状态一次 IN 查询）
+            items = CommentLoader(self.db).build_flat(replies, user_id)
             
-            total_pages = (total + page_size - 1) // page_size
+            total_pages = total_pages_of(total, page_size)
             
             logger.info(f"✅ 获取评论回复成功 - 总数: {total}")
             
@@ -993,6 +1163,8 @@ class ContentService:
                     "page": page,
                     "page_size": page_size,
                     "total_pages": total_pages,
+                    "total_mode": COUNT_MODE_EXACT if with_total else COUNT_MODE_NONE,
+                    "next_cursor": next_cursor_of(replies, has_more),
                 },
                 msg="获取成功",
                 errMsg=None
@@ -1006,7 +1178,40 @@ class ContentService:
                 detail=f"获取评论回复失败: {str(e)}"
             )
     
-    def get_user_views(self, user_id: str, page: int = 1, page_size: int = 20) -> ApiResponse[ContentListResponse]:
+    def get_comment_thread(
+        self,
+        comment_id: str,
+        user_id: Optional[str] = None,
+        max_depth: Optional[int] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> ApiResponse[dict]:
+        """获取评论的完整子树（按线程顺序平铺，带层级与子树评论数）"""
+        try:
+            logger.info(f"🧵 获取评论线程 - 评论ID: {comment_id}, 最大层级: {max_depth}, 游标: {cursor}")
+            
+            data = CommentThreadService(self.db).get_subtree(comment_id, user_id, max_depth, limit, cursor)
+            
+            logger.info(f"✅ 获取评论线程成功 - 数量: {len(data['items'])}")
+            
+            return ApiResponse(
+                code=200,
+                data=data,
+                msg="获取成功",
+                errMsg=None
+            )
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"❌ 获取评论线程失败 - 错误: {str(e)}", exc_info=True)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"获取评论线程失败: {str(e)}"
+            )
+    
+    def get_user_views(
+        self, user_id: str, page: int = 1, page_size: int = 20, with_total: bool = True
+    ) -> ApiResponse[ContentListResponse]:
         """获取用户的浏览记录"""
         try:
             logger.info(f"📋 获取浏览记录 - 用户ID: {user_id}, 页码: {page}")
@@ -1016,28 +1221,22 @@ class ContentService:
                 ContentView.user_id == user_id
             ).order_by(desc(ContentView.updated_at))
             
-            total = query.count()
+            total, total_mode = CountService(self.db).get_total(
+                query, scope=f"views:{user_id}", filters={}, with_total=with_total
+            )
             offset = (page - 1) * page_size
-            views = query.offset(offset).limit(page_size).all()
-            
-            # 获取内容详情
-            content_ids = [str(view.content_id) for view in views]
-            contents = self.db.query(Content).options(
-                joinedload(Content.user)
-            ).filter(Content.id.in_(content_ids)).all()
             
-            # 按浏览时间排序
-            content_dict = {str(c.id): c for c in contents}
-            sorted_contents = [content_dict[cid] for cid in content_ids if cid in content_dict]
+            # 记录与内容列表投影一次关联查询，按浏览时间排序
+            rows = with_authors(list_query(self.db)).join(
+                ContentView, ContentView.content_id == Content.id
+            ).filter(
+                ContentView.user_id == user_id
+            ).order_by(desc(ContentView.updated_at)).offset(offset).limit(page_size).all()
             
             # 构建响应
-            items = []
-            for content in sorted_contents:
-                item = ContentListItem.from_orm(content)
-                item.user = UserBrief.from_orm(content.user) if content.user else None
-                items.append(item)
+            items = [build_list_item(row) for row in rows]
             
-            total_pages = (total + page_size - 1) // page_size
+            total_pages = total_pages_of(total, page_size)
             
             logger.info(f"✅ 获取浏览记录成功 - 总数: {total}")
             
@@ -1049,6 +1248,7 @@ class ContentService:
                     page=page,
                     page_size=page_size,
                     total_pages=total_pages,
+                    total_mode=total_mode,
                 ),
                 msg="获取成功",
                 errMsg=None
@@ -1060,7 +1260,9 @@ class ContentService:
                 detail=f"获取浏览记录失败: {str(e)}"
             )
     
-    def get_user_likes(self, user_id: str, page: int = 1, page_size: int = 20) -> ApiResponse[ContentListResponse]:
+    def get_user_likes(
+        self, user_id: str, page: int = 1, page_size: int = 20, with_total: bool = True
+    ) -> ApiResponse[ContentListResponse]:
         """获取用户点赞的内容"""
         try:
             logger.info(f"📋 获取点赞记录 - 用户ID: {user_id}, 页码: {page}")
@@ -1070,28 +1272,22 @@ class ContentService:
                 ContentLike.user_id == user_id
             ).order_by(desc(ContentLike.created_at))
             
-            total = query.count()
+            total, total_mode = CountService(self.db).get_total(
+                query, scope=f"likes:{user_id}", filters={}, with_total=with_total
+            )
             offset = (page - 1) * page_size
-            likes = query.offset(offset).limit(page_size).all()
-            
-            # 获取内容详情
-            content_ids = [str(like.content_id) for like in likes]
-            contents = self.db.query(Content).options(
-                joinedload(Content.user)
-            ).filter(Content.id.in_(content_ids)).all()
             
-            # 按点赞时间排序
-            content_dict = {str(c.id): c for c in contents}
-            sorted_contents = [content_dict[cid] for cid in content_ids if cid in content_dict]
+            # 记录与内容列表投影一次关联查询，按点赞时间排序
+            rows = with_authors(list_query(self.db)).join(
+                ContentLike, ContentLike.content_id == Content.id
+            ).filter(
+                ContentLike.user_id == user_id
+            ).order_by(desc(ContentLike.created_at)).offset(offset).limit(page_size).all()
             
             # 构建响应
-            items = []
-            for content in sorted_contents:
-                item = ContentListItem.from_orm(content)
-                item.user = UserBrief.from_orm(content.user) if content.user else None
-                items.append(item)
+            items = [build_list_item(row) for row in rows]
             
-            total_pages = (total + page_size - 1) // page_size
+            total_pages = total_pages_of(total, page_size)
             
             logger.info(f"✅ 获取点赞记录成功 - 总数: {total}")
             
@@ -1103,6 +1299,7 @@ class ContentService:
                     page=page,
                     page_size=page_size,
                     total_pages=total_pages,
+                    total_mode=total_mode,
                 ),
                 msg="获取成功",
                 errMsg=None
@@ -1114,7 +1311,9 @@ class ContentService:
                 detail=f"获取点赞记录失败: {str(e)}"
             )
     
-    def get_user_comments(self, user_id: str, page: int = 1, page_size: int = 20) -> ApiResponse[dict]:
+    def get_user_comments(
+        self, user_id: str, page: int = 1, page_size: int = 20, with_total: bool = True
+    ) -> ApiResponse[dict]:
         """获取用户的评论记录"""
         try:
             logger.info(f"📋 获取评论记录 - 用户ID: {user_id}, 页码: {page}")
@@ -1125,7 +1324,9 @@ class ContentService:
                 joinedload(Comment.user)
             ).filter(Comment.user_id == user_id).order_by(desc(Comment.created_at))
             
-            total = query.count()
+            total, total_mode = CountService(self.db).get_total(
+                query, scope=f"user_comments:{user_id}", filters={}, with_total=with_total
+            )
             offset = (page - 1) * page_size
             comments = query.offset(offset).limit(page_size).all()
             
@@ -1157,7 +1358,7 @@ class ContentService:
                 comment_data = CommentResponse(**comment_dict)
                 items.append(comment_data)
             
-            total_pages = (total + page_size - 1) // page_size
+            total_pages = total_pages_of(total, page_size)
             
             logger.info(f"✅ 获取评论记录成功 - 总数: {total}")
             
@@ -1169,6 +1370,7 @@ class ContentService:
                     "page": page,
                     "page_size": page_size,
                     "total_pages": total_pages,
+                    "total_mode": total_mode,
                 },
                 msg="获取成功",
                 errMsg=None
@@ -1195,8 +1397,18 @@ class ContentService:
             if str(content.user_id) != user_id:
                 raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="无权操作此内容")
             
+            old_tags = tag_snapshot(content)
+            old_album = album_snapshot(content)
             content.is_public = is_public
+            SearchService(self.db).index_content(content)
+            AlbumStatsService(self.db).apply_change(old_album, album_snapshot(content))
             self.db.commit()
+            CountService.invalidate("contents", f"contents:user:{user_id}")
+            TagStatsService.apply_change(old_tags, tag_snapshot(content))
+            if is_public:
+                FeedCacheService.mark_stale(categories_of(content.type))
+            else:
+                FeedCacheService.remove_content(content_id)
             
             logger.info(f"✅ 内容{action}成功 - ID: {content_id}")
             
@@ -1225,11 +1437,17 @@ class ContentService:
                 and_(ContentView.content_id == content_id, ContentView.user_id == user_id)
             ).first()
             
-            if not view:
+            # 同时删除尚未落库的缓冲记录，避免稍后被重新写入
+            buffered = ViewTracker.discard_history(content_id, user_id)
+            
+            if not view and not buffered:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="浏览记录不存在")
             
-            self.db.delete(view)
-            self.db.commit()
+            if view:
+                self.db.delete(view)
+                self.db.commit()
+            InteractionIndex.update(user_id, STATE_VIEWED, content_id, False)
+            CountService.invalidate(f"views:{user_id}")
             
             logger.info(f"✅ 浏览记录删除成功")
             
@@ -0,0 +1,130 @@
+"""
+列表总数服务
+
+分页接口的总数有三种模式：
+- exact：精确计数，按（作用域 + 规范化后的筛选条件）缓存在 Redis，写操作时按作用域失效
+- estimated：公开信息流在无筛选条件时直接读取查询规划器的行数估算
+- none：调用方传 with_total=false 时不计算总数
+"""
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Optional, Tuple
+import hashlib
+import json
+import logging
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+COUNT_MODE_EXACT = "exact"
+COUNT_MODE_ESTIMATED = "estimated"
+COUNT_MODE_NONE = "none"
+
+
+def _cache_key(scope: str) -> str:
+    return f"count:{scope}"
+
+
+def _filters_digest(filters: Dict[str, Any]) -> str:
+    """规范化筛选条件：去掉空值、按键排序，保证同一筛选集合命中同一缓存"""
+    normalized = {k: str(v) for k, v in filters.items() if v is not None and v != ""}
+    raw = json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def total_pages_of(total: Optional[int], page_size: int) -> Optional[int]:
+    """根据总数计算总页数，未计算总数时返回 None"""
+    if total is None:
+        return None
+    return (total + page_size - 1) // page_size
+
+
+class CountService:
+    """列表总数服务"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_total(
+        self,
+        query,
+        scope: str,
+        filters: Dict[str, Any],
+        with_total: bool = True,
+        allow_estimate: bool = False,
+    ) -> Tuple[Optional[int], str]:
+        """
+        获取查询总数
+
+        Args:
+            query: 未分页的 ORM 查询
+            scope: 失效作用域，例如 contents / contents:user:{id} / comments:{content_id}
+            filters: 构成查询的筛选条件，用于生成缓存键
+            with_total: 为 False 时直接跳过计数
+            allow_estimate: 是否允许使用规划器估算（仅用于无筛选条件的公开信息流）
+
+        Returns:
+            (total, mode)
+        """
+        if not with_total:
+            return None, COUNT_MODE_NONE
+
+        if allow_estimate:
+            estimated = self.estimate(query)
+            # 数据量较小时估算误差大，精确计数也足够便宜
+            if estimated is not None and estimated >= settings.COUNT_ESTIMATE_THRESHOLD:
+                return estimated, COUNT_MODE_ESTIMATED
+
+        key = _cache_key(scope)
+        field = _filters_digest(filters)
+        redis_client = get_redis()
+
+        try:
+            cached = redis_client.hget(key, field)
+            if cached is not None:
+                return int(cached), COUNT_MODE_EXACT
+        except Exception as e:
+            logger.warning(f"⚠️  读取计数缓存失败 - 作用域: {scope}, 错误: {str(e)}")
+
+        total = query.order_by(None).count()
+
+        try:
+            pipe = redis_client.pipeline()
+            pipe.hset(key, field, total)
+            pipe.expire(key, settings.COUNT_CACHE_TTL_SECONDS)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"⚠️  写入计数缓存失败 - 作用域: {scope}, 错误: {str(e)}")
+
+        return total, COUNT_MODE_EXACT
+
+    def estimate(self, query) -> Optional[int]:
+        """使用 EXPLAIN 读取规划器对结果行数的估算"""
+        try:
+            statement = query.order_by(None).statement
+            # 参数直接渲染为字面量：不同驱动的占位符格式不同（psycopg2 为 %(name)s，asyncpg 为 $n），
+            # 且 EXPLAIN 不需要参数化
+            compiled = statement.compile(
+                dialect=self.db.get_bind().dialect,
+                compile_kwargs={"literal_binds": True},
+            )
+            result = self.db.connection().exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) {compiled}",
+                execution_options={"no_parameters": True},
+            ).scalar()
+            plan = result if isinstance(result, list) else json.loads(result)
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except Exception as e:
+            logger.warning(f"⚠️  估算总数失败，改用精确计数 - 错误: {str(e)}")
+            return None
+
+    @staticmethod
+    def invalidate(*scopes: str) -> None:
+        """写操作提交后调用，清除相关作用域下所有筛选条件的缓存总数"""
+        if not scopes:
+            return
+        try:
+            get_redis().delete(*[_cache_key(scope) for scope in scopes])
+        except Exception as e:
+            logger.warning(f"⚠️  清除计数缓存失败 - 作用域: {scopes}, 错误: {str(e)}")
@@ -0,0 +1,211 @@
+"""
+探索页信息流缓存
+
+未登录访客看到的探索页（分类 + 标签）完全相同，将前 N 页序列化后缓存在 Redis：
+- 新鲜期内直接返回缓存
+- 写操作提交后把相关分类标记为过期；过期数据继续返回，同时只由一个请求（持有刷新锁）重建
+- 缓存未命中时同样只由持有刷新锁的请求重建，其余请求短暂等待结果，超时后各自查询
+- built_at 取重建开始前的时间：重建期间发生的写操作会使这份结果立即过期，而不是被当作新鲜数据
+- 内容被删除或设为私密时，立即从已缓存的页面中剔除该条目
+
+读取与重建（get_or_build）在 async 路由中使用异步客户端；标记过期与剔除条目在写操作的
+run_sync 或后台线程中执行，使用同步客户端。
+"""
+from typing import Awaitable, Callable, Iterable, Optional
+import asyncio
+import json
+import logging
+import time
+
+from app.core.config import settings
+from app.core.redis import get_async_redis, get_redis
+from app.schemas.content import ContentListResponse
+
+logger = logging.getLogger(__name__)
+
+FEED_KEY_PREFIX = "feed:explore"
+FEED_REGISTRY_KEY = f"{FEED_KEY_PREFIX}:keys"
+
+
+def _entry_key(category: str, tag: Optional[str], page: int, page_size: int) -> str:
+    return f"{FEED_KEY_PREFIX}:{category}:{tag or ''}:{page}:{page_size}"
+
+
+def _stale_key(category: str) -> str:
+    return f"{FEED_KEY_PREFIX}:stale_at:{category}"
+
+
+def _lock_key(entry_key: str) -> str:
+    return f"{entry_key}:lock"
+
+
+# 未命中且未拿到刷新锁时轮询缓存的间隔（秒）
+_MISS_POLL_INTERVAL = 0.05
+
+
+def _entry_ttl() -> int:
+    return settings.FEED_CACHE_TTL_SECONDS + settings.FEED_CACHE_STALE_SECONDS
+
+
+def categories_of(content_type) -> list:
+    """
+    内容变更时受影响的探索分类
+
+    popular 按热度分排序，由热度刷新任务统一标记过期
+    """
+    type_value = getattr(content_type, "value", content_type)
+    return ["all", type_value]
+
+
+class FeedCacheService:
+    """探索页信息流缓存服务"""
+
+    @staticmethod
+    def is_cacheable(page: int, keyword: Optional[str], cursor: Optional[str], anonymous: bool) -> bool:
+        """只缓存未登录访客、无关键词、偏移分页的前 N 页"""
+        return (
+            anonymous
+            and not keyword
+            and not cursor
+            and page <= settings.FEED_CACHE_PAGES
+        )
+
+    @staticmethod
+    async def get_or_build(
+        category: str,
+        tag: Optional[str],
+        page: int,
+        page_size: int,
+        builder: Callable[[], Awaitable[ContentListResponse]],
+    ) -> ContentListResponse:
+        """读取缓存页；未命中或过期时按需重建（builder 为异步函数，通常在内部 run_sync 查询）"""
+        key = _entry_key(category, tag, page, page_size)
+        redis_client = get_async_redis()
+
+        try:
+            raw, stale_at = await redis_client.mget(key, _stale_key(category))
+        except Exception as e:
+            logger.warning(f"⚠️  读取信息流缓存失败 - key: {key}, 错误: {str(e)}")
+            return await builder()
+
+        if raw:
+            entry = json.loads(raw)
+            is_fresh = (
+                time.time() < entry["fresh_until"]
+                and entry["built_at"] > float(stale_at or 0)
+            )
+            if is_fresh:
+                return ContentListResponse.model_validate(entry["data"])
+
+            # 已过期：只有拿到刷新锁的请求去重建，其余请求继续返回旧数据
+            locked = await FeedCacheService._acquire_lock(key)
+            if not locked:
+                return ContentListResponse.model_validate(entry["data"])
+            logger.info(f"🔄 重建信息流缓存 - key: {key}")
+        else:
+            # 未命中：只有拿到刷新锁的请求去构建，其余请求等待其写入
+            locked = await FeedCacheService._acquire_lock(key)
+            if not locked:
+                cached = await FeedCacheService._wait_for_entry(key)
+                if cached is not None:
+                    return cached
+
+        try:
+            built_at = time.time()
+            data = await builder()
+            await FeedCacheService._store(key, data, built_at)
+            return data
+        finally:
+            if locked:
+                await FeedCacheService._release_lock(key)
+
+    @staticmethod
+    def mark_stale(categories: Iterable[str]) -> None:
+        """写操作提交后调用：标记分类下的缓存页为过期（下次访问时由单个请求重建）"""
+        try:
+            now = time.time()
+            pipe = get_redis().pipeline()
+            for category in set(categories):
+                pipe.set(_stale_key(category), now, ex=_entry_ttl())
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"⚠️  标记信息流缓存过期失败 - 错误: {str(e)}")
+
+    @staticmethod
+    def remove_content(content_id: str) -> None:
+        """内容删除或设为私密时，从所有缓存页中剔除该条目"""
+        content_id = str(content_id)
+        redis_client = get_redis()
+        try:
+            for key in redis_client.smembers(FEED_REGISTRY_KEY):
+                raw = redis_client.get(key)
+                if raw is None:
+                    redis_client.srem(FEED_REGISTRY_KEY, key)
+                    continue
+
+                entry = json.loads(raw)
+                items = entry["data"]["items"]
+                kept = [item for item in items if item["id"] != content_id]
+                if len(kept) == len(items):
+                    continue
+
+                entry["data"]["items"] = kept
+                if entry["data"].get("total") is not None:
+                    entry["data"]["total"] = max(0, entry["data"]["total"] - 1)
+                redis_client.set(key, json.dumps(entry, ensure_ascii=False), keepttl=True)
+        except Exception as e:
+            logger.warning(f"⚠️  剔除信息流缓存条目失败 - 内容ID: {content_id}, 错误: {str(e)}")
+
+    @staticmethod
+    async def _wait_for_entry(key: str) -> Optional[ContentListResponse]:
+        """等待持有刷新锁的请求写入缓存，最长 FEED_CACHE_LOCK_SECONDS；锁释放或超时仍未写入时返回 None"""
+        redis_client = get_async_redis()
+        deadline = time.monotonic() + settings.FEED_CACHE_LOCK_SECONDS
+        try:
+            while time.monotonic() < deadline:
+                await asyncio.sleep(_MISS_POLL_INTERVAL)
+                raw, holder = await redis_client.mget(key, _lock_key(key))
+                if raw:
+                    return ContentListResponse.model_validate(json.loads(raw)["data"])
+                if holder is None:
+                    # 构建方失败或写入缓存失败，不再等待
+                    return None
+        except Exception as e:
+            logger.warning(f"⚠️  等待信息流缓存失败 - key: {key}, 错误: {str(e)}")
+        return None
+
+    @staticmethod
+    async def _store(key: str, data: ContentListResponse, built_at: float) -> None:
+        """
+        写入缓存页
+
+        Args:
+            built_at: 开始构建（查询）前的时间，与分类的过期标记比较
+        """
+        entry = {
+            "built_at": built_at,
+            "fresh_until": time.time() + settings.FEED_CACHE_TTL_SECONDS,
+            "data": data.model_dump(mode="json"),
+        }
+        try:
+            pipe = get_async_redis().pipeline()
+            pipe.set(key, json.dumps(entry, ensure_ascii=False), ex=_entry_ttl())
+            pipe.sadd(FEED_REGISTRY_KEY, key)
+            pipe.expire(FEED_REGISTRY_KEY, _entry_ttl())
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"⚠️  写入信息流缓存失败 - key: {key}, 错误: {str(e)}")
+
+    @staticmethod
+    async def _acquire_lock(key: str) -> bool:
+        try:
+            return bool(await get_async_redis().set(_lock_key(key), "1", nx=True, ex=settings.FEED_CACHE_LOCK_SECONDS))
+        except Exception:
+            return False
+
+    @staticmethod
+    async def _release_lock(key: str) -> None:
+        try:
+            await get_async_redis().delete(_lock_key(key))
+        except Exception:
+            pass
@@ -0,0 +1,222 @@
+"""
+用户互动状态索引
+
+每个用户已点赞/已收藏/已浏览的内容 ID 保存在 Redis 集合中：
+  user:{user_id}:liked / user:{user_id}:saved / user:{user_id}:viewed
+集合在首次查询时从数据库一次性加载（写入哨兵成员表示已加载），之后由点赞、收藏、
+浏览等写操作增量维护；集合带过期时间，过期后下次查询重新加载。
+
+一页内容的状态只需一次 Redis 往返（管道中批量 SISMEMBER），与行数无关地避免逐条查库。
+async 路由在 run_sync 查询完成后通过 flags_async / apply_flags_async 使用异步客户端读取，
+只有集合需要加载或 Redis 不可用时才回到 run_sync 查库。
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, List, Optional
+import logging
+
+from app.core.config import settings
+from app.core.redis import get_async_redis, get_redis
+from app.models.content import ContentLike, ContentSave, ContentView
+
+logger = logging.getLogger(__name__)
+
+STATE_LIKED = "liked"
+STATE_SAVED = "saved"
+STATE_VIEWED = "viewed"
+
+# 状态 -> 数据来源表
+_SOURCES = {
+    STATE_LIKED: ContentLike,
+    STATE_SAVED: ContentSave,
+    STATE_VIEWED: ContentView,
+}
+
+# 已加载哨兵（集合为空时也能区分"没有记录"与"尚未加载"）
+LOADED_MARKER = "__loaded__"
+
+_LOAD_BATCH_SIZE = 1000
+
+
+def state_key(user_id: str, state: str) -> str:
+    """用户互动状态集合的键"""
+    return f"user:{user_id}:{state}"
+
+
+def _queue_membership(pipe, user_id: str, ids: List[str]) -> None:
+    """在管道中加入各状态集合的 SISMEMBER（同步与异步管道通用）"""
+    for state in _SOURCES:
+        key = state_key(user_id, state)
+        for content_id in ids:
+            pipe.sismember(key, content_id)
+
+
+def _parse_membership(results: List, ids: List[str]) -> Dict[str, Dict[str, bool]]:
+    flags = {content_id: {} for content_id in ids}
+    for offset, state in enumerate(_SOURCES):
+        chunk = results[offset * len(ids):(offset + 1) * len(ids)]
+        for content_id, hit in zip(ids, chunk):
+            flags[content_id][f"is_{state}"] = bool(hit)
+    return flags
+
+
+def _queue_load(pipe, user_id: str, state: str, content_ids: List[str]) -> None:
+    """在管道中写入从数据库加载的集合成员与已加载哨兵"""
+    key = state_key(user_id, state)
+    for start in range(0, len(content_ids), _LOAD_BATCH_SIZE):
+        pipe.sadd(key, *content_ids[start:start + _LOAD_BATCH_SIZE])
+    pipe.sadd(key, LOADED_MARKER)
+    pipe.expire(key, settings.INTERACTION_INDEX_TTL_SECONDS)
+    logger.info(f"📇 加载互动状态索引 - 用户: {user_id}, 类型: {state}, 数量: {len(content_ids)}")
+
+
+class InteractionIndex:
+    """用户互动状态索引"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def flags(self, user_id: str, content_ids: Iterable[str]) -> Dict[str, Dict[str, bool]]:
+        """
+        批量查询当前用户对内容的互动状态
+
+        Returns:
+            {内容ID: {"is_liked": bool, "is_saved": bool, "is_viewed": bool}}
+        """
+        ids = list(dict.fromkeys(str(content_id) for content_id in content_ids))
+        if not ids:
+            return {}
+
+        try:
+            redis_client = get_redis()
+            self._ensure_loaded(redis_client, user_id)
+
+            pipe = redis_client.pipeline(transaction=False)
+            _queue_membership(pipe, user_id, ids)
+            results = pipe.execute()
+        except Exception as e:
+            logger.warning(f"⚠️  读取互动状态索引失败，回退到数据库 - 错误: {str(e)}")
+            return self._query_flags(user_id, ids)
+
+        return _parse_membership(results, ids)
+
+    @staticmethod
+    async def flags_async(
+        db: AsyncSession, user_id: str, content_ids: Iterable[str]
+    ) -> Dict[str, Dict[str, bool]]:
+        """flags 的异步版本：Redis 访问不占用事件循环，加载集合与回退查询通过 run_sync 执行"""
+        ids = list(dict.fromkeys(str(content_id) for content_id in content_ids))
+        if not ids:
+            return {}
+
+        try:
+            redis_client = get_async_redis()
+            pipe = redis_client.pipeline(transaction=False)
+            for state in _SOURCES:
+                pipe.sismember(state_key(user_id, state), LOADED_MARKER)
+            loaded = await pipe.execute()
+
+            for state, is_loaded in zip(_SOURCES, loaded):
+                if not is_loaded:
+                    content_ids_of_state = await db.run_sync(
+                        lambda session, state=state: InteractionIndex(session)._load_ids(user_id, state)
+                    )
+                    pipe = redis_client.pipeline()
+                    _queue_load(pipe, user_id, state, content_ids_of_state)
+                    await pipe.execute()
+
+            pipe = redis_client.pipeline(transaction=False)
+            _queue_membership(pipe, user_id, ids)
+            results = await pipe.execute()
+        except Exception as e:
+            logger.warning(f"⚠️  读取互动状态索引失败，回退到数据库 - 错误: {str(e)}")
+            return await db.run_sync(lambda session: InteractionIndex(session)._query_flags(user_id, ids))
+
+        return _parse_membership(results, ids)
+
+    def apply_flags(self, user_id: Optional[str], items: List) -> None:
+        """为列表项填充 is_liked / is_saved（未登录或空列表时不做任何查询）"""
+        if not user_id or not items:
+            return
+        flags = self.flags(user_id, [item.id for item in items])
+        for item in items:
+            state = flags.get(str(item.id), {})
+            item.is_liked = state.get("is_liked", False)
+            item.is_saved = state.get("is_saved", False)
+
+    @staticmethod
+    async def apply_flags_async(db: AsyncSession, user_id: Optional[str], items: List) -> None:
+        """apply_flags 的异步版本，供 async 路由在 run_sync 查询完成后调用"""
+        if not user_id or not items:
+            return
+        flags = await InteractionIndex.flags_async(db, user_id, [item.id for item in items])
+        for item in items:
+            state = flags.get(str(item.id), {})
+            item.is_liked = state.get("is_liked", False)
+            item.is_saved = state.get("is_saved", False)
+
+    @staticmethod
+    def update(user_id: str, state: str, content_id: str, active: bool) -> None:
+        """
+        写操作成功提交后同步索引
+
+        集合尚未加载时直接写入也无妨：下次查询加载时会与数据库记录合并
+        """
+        try:
+            key = state_key(user_id, state)
+            if active:
+                get_redis().sadd(key, str(content_id))
+            else:
+                get_redis().srem(key, str(content_id))
+        except Exception as e:
+            # 索引与数据库不一致时删除整个集合，下次查询重新加载
+            logger.warning(f"⚠️  更新互动状态索引失败 - 用户: {user_id}, 错误: {str(e)}")
+            InteractionIndex.invalidate(user_id, state)
+
+    @staticmethod
+    def invalidate(user_id: str, *states: str) -> None:
+        """删除用户的索引集合（不传 states 时删除全部）"""
+        try:
+            get_redis().delete(*[state_key(user_id, state) for state in (states or _SOURCES)])
+        except Exception as e:
+            logger.warning(f"⚠️  删除互动状态索引失败 - 用户: {user_id}, 错误: {str(e)}")
+
+    def _ensure_loaded(self, redis_client, user_id: str) -> None:
+        """加载尚未建立的集合"""
+        pipe = redis_client.pipeline(transaction=False)
+        for state in _SOURCES:
+            pipe.sismember(state_key(user_id, state), LOADED_MARKER)
+        loaded = pipe.execute()
+
+        for state, is_loaded in zip(_SOURCES, loaded):
+            if not is_loaded:
+                self._load(redis_client, user_id, state)
+
+    def _load(self, redis_client, user_id: str, state: str) -> None:
+        """从数据库加载一个集合（与期间增量写入的成员合并，不会丢失）"""
+        pipe = redis_client.pipeline()
+        _queue_load(pipe, user_id, state, self._load_ids(user_id, state))
+        pipe.execute()
+
+    def _load_ids(self, user_id: str, state: str) -> List[str]:
+        """读取用户某一状态下的全部内容 ID"""
+        model = _SOURCES[state]
+        return [
+            str(row.content_id)
+            for row in self.db.query(model.content_id).filter(model.user_id == user_id).all()
+        ]
+
+    def _query_flags(self, user_id: str, ids: List[str]) -> Dict[str, Dict[str, bool]]:
+        """Redis 不可用时按状态各执行一次 IN 查询"""
+        flags = {content_id: {} for content_id in ids}
+        for state, model in _SOURCES.items():
+            hits = {
+                str(row.content_id)
+                for row in self.db.query(model.content_id).filter(
+                    model.user_id == user_id,
+                    model.content_id.in_(ids),
+                ).all()
+            }
+            for content_id in ids:
+                flags[content_id][f"is_{state}"] = content_id in hits
+        return flags
@@ -0,0 +1,76 @@
+"""
+点赞/收藏/评论点赞的切换
+
+每次切换只执行一条 SQL：
+- DELETE ... RETURNING 尝试取消；没有可删除的记录时 INSERT ... ON CONFLICT DO NOTHING 添加
+- 计数通过 UPDATE ... SET count = count ± n 原子更新，并 RETURNING 新值
+并发请求不会丢失更新，也不需要先读出整行再在 Python 中修改计数。
+依赖 (目标ID, user_id) 上的唯一约束（见 migrations/add_interaction_unique.py）。
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from typing import Optional, Tuple
+import uuid
+
+INTERACTION_LIKE = "like"
+INTERACTION_SAVE = "save"
+INTERACTION_COMMENT_LIKE = "comment_like"
+
+# 种类 -> (关联表, 目标表, 关联表中的目标列, 计数列)
+_INTERACTIONS = {
+    INTERACTION_LIKE: ("content_likes", "contents", "content_id", "like_count"),
+    INTERACTION_SAVE: ("content_saves", "contents", "content_id", "save_count"),
+    INTERACTION_COMMENT_LIKE: ("comment_likes", "comments", "comment_id", "like_count"),
+}
+
+
+def _toggle_sql(kind: str):
+    link_table, target_table, target_column, count_column = _INTERACTIONS[kind]
+    return text(f"""
+        WITH removed AS (
+            DELETE FROM {link_table}
+            WHERE {target_column} = :target_id AND user_id = :user_id
+            RETURNING 1
+        ), added AS (
+            INSERT INTO {link_table} (id, {target_column}, user_id, created_at)
+            SELECT :new_id, :target_id, :user_id, now() AT TIME ZONE 'utc'
+            WHERE NOT EXISTS (SELECT 1 FROM removed)
+              AND EXISTS (SELECT 1 FROM {target_table} WHERE id = :target_id)
+            ON CONFLICT ({target_column}, user_id) DO NOTHING
+            RETURNING 1
+        )
+        UPDATE {target_table}
+        SET {count_column} = GREATEST(
+            COALESCE({count_column}, 0) + (SELECT count(*) FROM added) - (SELECT count(*) FROM removed), 0
+        )
+        WHERE id = :target_id
+        RETURNING {count_column} AS count, NOT EXISTS (SELECT 1 FROM removed) AS active
+    """)
+
+
+_TOGGLE_SQL = {kind: _toggle_sql(kind) for kind in _INTERACTIONS}
+
+
+class InteractionService:
+    """互动切换服务"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def toggle(self, kind: str, target_id: str, user_id: str) -> Optional[Tuple[bool, int]]:
+        """
+        切换互动状态（调用方负责提交事务）
+
+        并发下同一用户重复添加时 ON CONFLICT 不会插入第二条，计数不变，仍视为已添加
+
+        Returns:
+            (是否处于已点赞/已收藏状态, 最新计数)；目标不存在时返回 None
+        """
+        row = self.db.execute(_TOGGLE_SQL[kind], {
+            "target_id": target_id,
+            "user_id": user_id,
+            "new_id": str(uuid.uuid4()),
+        }).first()
+        if row is None:
+            return None
+        return bool(row.active), int(row.count)
@@ -0,0 +1,108 @@
+"""
+内容列表投影
+
+列表页只查询 ContentListItem 需要的列，不加载正文 content、extra_data 以及完整的 User 行：
+- 图片/视频只返回前 LIST_MEDIA_PREVIEW 个（数据库端切片），另附封面与数量
+- 作者信息通过 LEFT JOIN 只取 UserBrief 需要的列
+- 直接由行元组构建响应对象
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from typing import Dict, Iterable, Optional
+
+from app.core.config import settings
+from app.models.content import Content, ContentType
+from app.models.user import User
+from app.schemas.content import ContentListItem, UserBrief
+
+
+def list_columns() -> tuple:
+    """ContentListItem 对应的列（tags、created_at、hot_score 同时供分面与游标使用）"""
+    preview = settings.LIST_MEDIA_PREVIEW
+    return (
+        Content.id,
+        Content.user_id,
+        Content.type,
+        Content.title,
+        Content.description,
+        Content.tags,
+        Content.images[1:preview].label("images"),
+        Content.videos[1:preview].label("videos"),
+        Content.video_thumbnails[1:preview].label("video_thumbnails"),
+        # 与前端封面一致：优先视频封面，其次首张图片
+        func.coalesce(Content.video_thumbnails[1], Content.images[1]).label("cover_image"),
+        func.coalesce(func.cardinality(Content.images), 0).label("image_count"),
+        func.coalesce(func.cardinality(Content.videos), 0).label("video_count"),
+        Content.location,
+        Content.is_public,
+        Content.is_featured,
+        Content.view_count,
+        Content.like_count,
+        Content.comment_count,
+        Content.save_count,
+        Content.hot_score,
+        Content.created_at,
+    )
+
+
+def author_columns() -> tuple:
+    """UserBrief 对应的作者列"""
+    return (
+        User.username.label("author_username"),
+        User.email.label("author_email"),
+    )
+
+
+def list_query(db: Session, *extra_columns):
+    """构造列表投影查询（尚未关联作者，调用方完成筛选与计数后再调用 with_authors）"""
+    return db.query(*list_columns(), *extra_columns)
+
+
+def with_authors(query):
+    """关联作者简要信息（主键关联，放在计数之后以免计数查询多一次关联）"""
+    return query.add_columns(*author_columns()).outerjoin(User, User.id == Content.user_id)
+
+
+def build_list_item(row) -> ContentListItem:
+    """由投影行构建列表项"""
+    item = ContentListItem(
+        id=row.id,
+        user_id=row.user_id,
+        type=row.type,
+        title=row.title,
+        description=row.description,
+        tags=row.tags or [],
+        images=row.images or [],
+        videos=row.videos or [],
+        video_thumbnails=row.video_thumbnails or [],
+        cover_image=row.cover_image,
+        image_count=row.image_count,
+        video_count=row.video_count,
+        location=row.location,
+        is_public=row.is_public,
+        is_featured=row.is_featured,
+        view_count=row.view_count or 0,
+        like_count=row.like_count or 0,
+        comment_count=row.comment_count or 0,
+        save_count=row.save_count or 0,
+        created_at=row.created_at,
+    )
+    if getattr(row.type, "value", row.type) == ContentType.ALBUM.value:
+        item.photo_count = row.image_count
+    if row.author_username is not None:
+        item.user = UserBrief(id=row.user_id, username=row.author_username, email=row.author_email)
+    return item
+
+
+def order_rows(rows: Iterable, ids: list) -> list:
+    """按给定的 id 顺序排列投影行（IN 查询不保证顺序）"""
+    by_id: Dict[object, object] = {row.id: row for row in rows}
+    return [by_id[item_id] for item_id in ids if item_id in by_id]
+
+
+def load_bodies(db: Session, ids: list) -> Dict[object, Optional[str]]:
+    """按需加载少量内容的正文（例如生成搜索摘要时描述未命中）"""
+    if not ids:
+        return {}
+    rows = db.query(Content.id, Content.content).filter(Content.id.in_(ids)).all()
+    return {row.id: row.content for row in rows}
@@ -0,0 +1,132 @@
+"""
+密码哈希线程池
+
+bcrypt 单次计算耗时数十到数百毫秒，直接在 async 路由中调用会阻塞事件循环。
+哈希与校验统一提交到专用线程池执行（bcrypt 计算期间释放 GIL，多个线程可并行）：
+- 线程数 PASSWORD_HASH_WORKERS，排队上限 PASSWORD_HASH_QUEUE_SIZE，队列满时直接返回繁忙，
+  登录洪峰不会无限堆积
+- 哈希成本由 BCRYPT_ROUNDS 配置；登录校验通过时若原哈希成本与配置不同（或为旧的
+  SHA256 截断格式），在同一个任务中生成新哈希，由调用方写回数据库
+- 记录排队等待与计算耗时，通过 /health/auth 查看
+"""
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException, status
+from typing import Callable, Optional, Tuple
+import asyncio
+import logging
+import threading
+import time
+
+from app.core.config import settings
+from app.core.metrics import Counters, Histogram
+from app.utils.security import (
+    get_password_hash,
+    password_needs_rehash,
+    verify_legacy_password,
+    verify_password,
+)
+
+logger = logging.getLogger(__name__)
+
+BUSY_MESSAGE = "服务繁忙，请稍后再试"
+
+# 计算耗时分桶上界（秒）
+HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+queue_wait_seconds = Histogram()
+hash_seconds = Histogram(HASH_BUCKETS)
+hasher_counters = Counters()
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+_lock = threading.Lock()
+_pending = 0  # 已提交未完成的任务数（排队 + 执行中）
+
+
+def _acquire() -> bool:
+    global _pending
+    with _lock:
+        if _pending >= settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_SIZE:
+            return False
+        _pending += 1
+        return True
+
+
+def _release(_future=None) -> None:
+    global _pending
+    with _lock:
+        _pending -= 1
+
+
+async def _run(func: Callable, *args):
+    """在哈希线程池中执行，队列满时抛出繁忙异常"""
+    if not _acquire():
+        hasher_counters.inc("rejected")
+        logger.warning(f"⚠️  密码哈希队列已满，拒绝请求 - 排队上限: {settings.PASSWORD_HASH_QUEUE_SIZE}")
+        raise HTTPException(status_code=status.HTTP_200_OK, detail=BUSY_MESSAGE)
+    submitted = time.perf_counter()
+
+    def job():
+        started = time.perf_counter()
+        queue_wait_seconds.observe(started - submitted)
+        try:
+            return func(*args)
+        finally:
+            hash_seconds.observe(time.perf_counter() - started)
+
+    future = _executor.submit(job)
+    # 任务完成或被取消（客户端断开）时都归还名额
+    future.add_done_callback(_release)
+    return await asyncio.wrap_future(future)
+
+
+async def hash_password(password: str) -> str:
+    """生成密码哈希"""
+    return await _run(get_password_hash, password)
+
+
+async def check_password(plain_password: str, hashed_password: str) -> bool:
+    """验证密码"""
+    return await _run(verify_password, plain_password, hashed_password)
+
+
+def _verify_and_rehash(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    valid = verify_password(plain_password, hashed_password)
+    legacy = False
+    if not valid:
+        # 兼容旧的哈希方法
+        valid = legacy = verify_legacy_password(plain_password, hashed_password)
+    if valid and (legacy or password_needs_rehash(hashed_password)):
+        return True, get_password_hash(plain_password)
+    return valid, None
+
+
+async def verify_and_rehash(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    登录校验密码
+
+    返回 (是否通过, 新哈希)；新哈希不为 None 时调用方需写回数据库
+    """
+    valid, new_hash = await _run(_verify_and_rehash, plain_password, hashed_password)
+    if new_hash:
+        hasher_counters.inc("rehashed")
+    return valid, new_hash
+
+
+def hasher_status() -> dict:
+    return {
+        "workers": settings.PASSWORD_HASH_WORKERS,
+        "queue_size": settings.PASSWORD_HASH_QUEUE_SIZE,
+        "pending": _pending,
+        "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+        "queue_wait_seconds": queue_wait_seconds.snapshot(),
+        "hash_seconds": hash_seconds.snapshot(),
+        "counters": hasher_counters.snapshot(),
+    }
+
+
+def shutdown_hasher() -> None:
+    """应用关闭时丢弃未开始的任务"""
+    _executor.shutdown(wait=False, cancel_futures=True)
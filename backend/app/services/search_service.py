@@ -0,0 +1,288 @@
+"""
+内容全文搜索服务
+
+基于 PostgreSQL 表实现的倒排索引：
+- search_postings：词项 -> 内容，索引时预先计算 BM25 词项权重（impact）
+- search_terms：文档频率，查询时计算 IDF
+- search_stats：文档总数与总长度（分片累加），用于计算平均文档长度
+
+只有公开内容进入索引。查询时每个词项只按 impact 倒序读取前 N 条倒排记录（带类型/作者等
+筛选条件时为筛选后的前 N 条），因此查询耗时取决于查询词数量而不是内容总量。
+有词项的倒排记录被截断时结果标记为不完整：调用方只在请求的页超出已排序结果时才做一次
+不截断的精确检索（search(exact=True)），总数改用 estimate_matches 估算。
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, update, select, func, desc, true
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import List, Tuple
+import math
+import random
+import logging
+
+from app.core.config import settings
+from app.models.content import Content
+from app.models.search import SearchDocument, SearchTerm, SearchPosting, SearchStats
+from app.utils.tokenizer import tokenize, weighted_term_frequencies
+
+logger = logging.getLogger(__name__)
+
+# 字段权重（BM25F 简化版）
+TITLE_WEIGHT = 3
+DESCRIPTION_WEIGHT = 2
+CONTENT_WEIGHT = 1
+
+class SearchService:
+    """内容全文搜索服务"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def index_content(self, content: Content) -> None:
+        """
+        同步单条内容的索引（在调用方事务内执行，随调用方一起提交）
+
+        私密内容只会被移出索引
+        """
+        frequencies = {}
+        if content.is_public:
+            frequencies = weighted_term_frequencies([
+                (content.title, TITLE_WEIGHT),
+                (content.description, DESCRIPTION_WEIGHT),
+                (content.content, CONTENT_WEIGHT),
+            ])
+        # 新旧词项一次性按顺序加锁，后续的减计数与插入不会和其他事务交叉等待
+        self._lock_terms(set(frequencies) | set(self._indexed_terms(content.id)))
+        self.remove_content(content.id)
+        if not frequencies:
+            return
+
+        length = float(sum(frequencies.values()))
+        doc_count, total_length = self._corpus_stats()
+        doc_count += 1
+        total_length += length
+        avg_length = total_length / doc_count if doc_count > 0 and total_length > 0 else length
+
+        k1 = settings.SEARCH_BM25_K1
+        b = settings.SEARCH_BM25_B
+        norm = k1 * (1 - b + b * length / avg_length)
+
+        self.db.execute(pg_insert(SearchDocument).values(content_id=content.id, length=length))
+        self.db.execute(pg_insert(SearchPosting), [
+            {
+                "term": term,
+                "content_id": content.id,
+                "tf": tf,
+                "impact": tf * (k1 + 1) / (tf + norm),
+            }
+            for term, tf in frequencies.items()
+        ])
+        # 按词项排序插入：多行 upsert 按 VALUES 顺序加锁
+        upsert = pg_insert(SearchTerm).values([{"term": term, "doc_freq": 1} for term in sorted(frequencies)])
+        self.db.execute(upsert.on_conflict_do_update(
+            index_elements=[SearchTerm.term],
+            set_={"doc_freq": SearchTerm.doc_freq + 1},
+        ))
+        self._update_stats(1, length)
+
+    def remove_content(self, content_id) -> None:
+        """将内容移出索引（需在删除内容之前调用，以便维护文档频率）"""
+        length = self.db.execute(
+            select(SearchDocument.length).where(SearchDocument.content_id == content_id)
+        ).scalar()
+        if length is None:
+            return
+
+        terms = self._indexed_terms(content_id)
+        self._lock_terms(terms)
+        if terms:
+            self.db.execute(
+                update(SearchTerm)
+                .where(SearchTerm.term.in_(terms))
+                .values(doc_freq=SearchTerm.doc_freq - 1)
+            )
+        self.db.execute(delete(SearchPosting).where(SearchPosting.content_id == content_id))
+        self.db.execute(delete(SearchDocument).where(SearchDocument.content_id == content_id))
+        self._update_stats(-1, -length)
+
+    def _indexed_terms(self, content_id) -> List[str]:
+        return list(self.db.execute(
+            select(SearchPosting.term).where(SearchPosting.content_id == content_id)
+        ).scalars())
+
+    def _lock_terms(self, terms) -> None:
+        """按词项顺序锁定已存在的 search_terms 行，避免共享词项的并发写入互相死锁"""
+        if terms:
+            self.db.execute(
+                select(SearchTerm.term)
+                .where(SearchTerm.term.in_(sorted(terms)))
+                .order_by(SearchTerm.term)
+                .with_for_update()
+            )
+
+    @staticmethod
+    def query_terms(keyword: str) -> List[str]:
+        """
+        查询词项
+
+        中文按二元组索引，单字只会出现在孤立的单字片段中，作为查询词项几乎无法命中
+        （例如“猫”匹配不到“我的猫咪日记”），因此不参与检索；全部为单字时返回空列表，
+        由调用方回退到子串匹配
+        """
+        terms = [term for term in dict.fromkeys(tokenize(keyword)) if len(term) >= 2]
+        return terms[:settings.SEARCH_MAX_QUERY_TERMS]
+
+    @staticmethod
+    def min_match(terms: List[str]) -> int:
+        """至少需要命中的词项数"""
+        return max(1, math.ceil(len(terms) * settings.SEARCH_MIN_MATCH_RATIO))
+
+    def match_ids(self, terms: List[str]):
+        """
+        命中足够词项的内容 ID 子查询
+
+        不按词项截断倒排记录，结果是精确的命中集合，可与类型、标签等筛选条件组合后计数/分页
+        """
+        return (
+            select(SearchPosting.content_id)
+            .where(SearchPosting.term.in_(terms))
+            .group_by(SearchPosting.content_id)
+            .having(func.count() >= self.min_match(terms))
+        )
+
+    def search(
+        self, keyword: str, limit: int, candidates=None, exact: bool = False
+    ) -> Tuple[List[Tuple[object, float]], List[str], bool]:
+        """
+        按 BM25 相关度检索
+
+        Args:
+            limit: 最多返回的结果数
+            candidates: 内容 ID 子查询（类型、作者等筛选条件），每个词项只读取候选内容的倒排记录
+            exact: 为 False 时每个词项最多读取 impact 最高的 SEARCH_POSTINGS_PER_TERM 条倒排记录；
+                为 True 时不截断（开销与命中的倒排记录数成正比，只在深分页时使用）
+
+        Returns:
+            ([(content_id, score), ...] 按相关度倒序, 查询词项, 结果是否完整)
+            查询无法分词时词项为空，调用方应回退到模糊匹配；
+            结果不完整表示有词项的倒排记录被截断或结果数达到 limit
+        """
+        terms = self.query_terms(keyword)
+        if not terms:
+            return [], terms, True
+
+        doc_count = self.doc_count()
+        if doc_count == 0:
+            return [], terms, True
+
+        per_term = settings.SEARCH_POSTINGS_PER_TERM
+        matched_terms = (
+            select(SearchTerm.term, SearchTerm.doc_freq)
+            .where(SearchTerm.term.in_(terms))
+            .subquery("t")
+        )
+        postings = (
+            select(SearchPosting.content_id, SearchPosting.impact)
+            .where(SearchPosting.term == matched_terms.c.term)
+            .order_by(desc(SearchPosting.impact))
+        )
+        if candidates is not None:
+            postings = postings.where(SearchPosting.content_id.in_(candidates))
+        if not exact:
+            postings = postings.limit(per_term)
+        postings = postings.lateral("sp")
+        read = (
+            select(matched_terms.c.term, matched_terms.c.doc_freq, postings.c.content_id, postings.c.impact)
+            .select_from(matched_terms.join(postings, true()))
+            .cte("p")
+        )
+
+        # 读满 per_term 条的词项数（大于 0 表示倒排记录被截断）
+        per_term_counts = select(read.c.term, func.count().label("n")).group_by(read.c.term).subquery()
+        saturated = (
+            select(func.count())
+            .select_from(per_term_counts)
+            .where(per_term_counts.c.n >= per_term)
+            .scalar_subquery()
+        )
+        idf = func.ln(1 + (doc_count - read.c.doc_freq + 0.5) / (read.c.doc_freq + 0.5))
+        score = func.sum(idf * read.c.impact).label("score")
+        rows = self.db.execute(
+            select(read.c.content_id, score, saturated.label("saturated"))
+            .group_by(read.c.content_id)
+            .having(func.count() >= self.min_match(terms))
+            .order_by(desc(score))
+            .limit(limit)
+        ).all()
+
+        if exact:
+            truncated = False
+        elif rows:
+            truncated = rows[0].saturated > 0
+        else:
+            # 没有结果时无法从结果行读出截断情况，按文档频率判断是否可能被截断
+            max_doc_freq = self.db.execute(
+                select(func.max(SearchTerm.doc_freq)).where(SearchTerm.term.in_(terms))
+            ).scalar() or 0
+            truncated = max_doc_freq > per_term
+        complete = not truncated and len(rows) < limit
+
+        logger.info(f"🔍 全文检索 - 词项: {len(terms)}, 命中: {len(rows)}, 完整: {complete}, 精确: {exact}")
+        return [(row.content_id, float(row.score)) for row in rows], terms, complete
+
+    def estimate_matches(self, terms: List[str], selectivity: float = 1.0) -> int:
+        """
+        估算命中足够词项的内容数（结果被截断时代替精确计数）
+
+        假设各词项独立出现，按文档频率计算命中至少 min_match 个词项的概率；
+        selectivity 为筛选条件保留的内容比例
+        """
+        doc_count = self.doc_count()
+        if doc_count == 0 or not terms:
+            return 0
+        doc_freqs = dict(self.db.execute(
+            select(SearchTerm.term, SearchTerm.doc_freq).where(SearchTerm.term.in_(terms))
+        ).all())
+
+        # distribution[k]：恰好命中 k 个词项的概率
+        distribution = [1.0]
+        for term in terms:
+            p = min(1.0, max(0, doc_freqs.get(term, 0)) / doc_count)
+            distribution = [
+                (distribution[k] if k < len(distribution) else 0.0) * (1 - p)
+                + (distribution[k - 1] * p if k > 0 else 0.0)
+                for k in range(len(distribution) + 1)
+            ]
+        probability = sum(distribution[self.min_match(terms):])
+        return int(round(doc_count * probability * min(1.0, max(0.0, selectivity))))
+
+    def doc_count(self) -> int:
+        """索引中的文档数（公开内容数）"""
+        return self._corpus_stats()[0]
+
+    def _corpus_stats(self) -> Tuple[int, float]:
+        """语料统计（各分片求和）：(文档数, 总长度)"""
+        doc_count, total_length = self.db.execute(
+            select(func.coalesce(func.sum(SearchStats.doc_count), 0),
+                   func.coalesce(func.sum(SearchStats.total_length), 0))
+        ).one()
+        return int(doc_count), float(total_length)
+
+    def _update_stats(self, doc_delta: int, length_delta: float) -> None:
+        """
+        累加语料统计
+
+        统计分散在 SEARCH_STATS_SHARDS 行中，每次随机更新其中一行（单行为负数也无妨，
+        读取时求和），并发的内容写入不会都排队等待同一行的行锁
+        """
+        stmt = pg_insert(SearchStats).values(
+            id=random.randrange(settings.SEARCH_STATS_SHARDS),
+            doc_count=doc_delta,
+            total_length=length_delta,
+        ).on_conflict_do_update(
+            index_elements=[SearchStats.id],
+            set_={
+                "doc_count": SearchStats.doc_count + doc_delta,
+                "total_length": SearchStats.total_length + length_delta,
+            },
+        )
+        self.db.execute(stmt)
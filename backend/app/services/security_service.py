@@ -1,7 +1,8 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc, func
 from typing import Optional, List
 from datetime import datetime, timedelta
+from functools import lru_cache
 import hashlib
 
 from app.models.login_log import LoginLog, LoginDevice
@@ -17,10 +18,10 @@ from app.schemas.auth import (
 class SecurityService:
     """安全设置服务"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def create_login_log(
+    async def create_login_log(
         self,
         user_id: str,
         ip_address: str,
@@ -45,11 +46,11 @@ class SecurityService:
             status=status
         )
         self.db.add(log)
-        self.db.commit()
-        self.db.refresh(log)
+        await self.db.commit()
+        await self.db.refresh(log)
         return log
     
-    def get_login_logs(
+    async def get_login_logs(
         self,
         user_id: str,
         page: int = 1,
@@ -57,9 +58,11 @@ class SecurityService:
     ) -> ApiResponse[List[LoginLogResponse]]:
         """获取登录日志"""
         offset = (page - 1) * page_size
-        logs = self.db.query(LoginLog).filter(
-            LoginLog.user_id == user_id
-        ).order_by(desc(LoginLog.created_at)).limit(page_size).offset(offset).all()
+        logs = (await self.db.execute(
+            select(LoginLog).where(
+                LoginLog.user_id == user_id
+            ).order_by(desc(LoginLog.created_at)).limit(page_size).offset(offset)
+        )).scalars().all()
         
         log_responses = [LoginLogResponse.model_validate(log) for log in logs]
         
@@ -70,7 +73,7 @@ class SecurityService:
             errMsg=None
         )
     
-    def create_or_update_device(
+    async def create_or_update_device(
         self,
         user_id: str,
         device_id: str,
@@ -83,9 +86,9 @@ class SecurityService:
     ) -> LoginDevice:
         """创建或更新登录设备"""
         # 查找现有设备
-        device = self.db.query(LoginDevice).filter(
-            LoginDevice.device_id == device_id
-        ).first()
+        device = (await self.db.execute(
+            select(LoginDevice).where(LoginDevice.device_id == device_id)
+        )).scalars().first()
         
         if device:
             # 更新现有设备
@@ -106,19 +109,21 @@ class SecurityService:
             )
             self.db.add(device)
         
-        self.db.commit()
-        self.db.refresh(device)
+        await self.db.commit()
+        await self.db.refresh(device)
         return device
     
-    def get_login_devices(
+    async def get_login_devices(
         self,
         user_id: str,
         current_device_id: Optional[str] = None
     ) -> ApiResponse[List[LoginDeviceResponse]]:
         """获取登录设备列表"""
-        devices = self.db.query(LoginDevice).filter(
-            LoginDevice.user_id == user_id
-        ).order_by(desc(LoginDevice.last_active)).all()
+        devices = (await self.db.execute(
+            select(LoginDevice).where(
+                LoginDevice.user_id == user_id
+            ).order_by(desc(LoginDevice.last_active))
+        )).scalars().all()
         
         device_responses = []
         for device in devices:
@@ -133,16 +138,18 @@ class SecurityService:
             errMsg=None
         )
     
-    def remove_device(
+    async def remove_device(
         self,
         user_id: str,
         device_id: str
     ) -> ApiResponse[None]:
         """移除登录设备"""
-        device = self.db.query(LoginDevice).filter(
-            LoginDevice.user_id == user_id,
-            LoginDevice.device_id == device_id
-        ).first()
+        device = (await self.db.execute(
+            select(LoginDevice).where(
+                LoginDevice.user_id == user_id,
+                LoginDevice.device_id == device_id
+            )
+        )).scalars().first()
         
         if not device:
             return ApiResponse(
@@ -152,8 +159,8 @@ class SecurityService:
                 errMsg="设备不存在"
             )
         
-        self.db.delete(device)
-        self.db.commit()
+        await self.db.delete(device)
+        await self.db.commit()
         
         return ApiResponse(
             code=200,
@@ -162,16 +169,18 @@ class SecurityService:
             errMsg=None
         )
     
-    def force_logout_device(
+    async def force_logout_device(
         self,
         user_id: str,
         device_id: str
     ) -> ApiResponse[None]:
         """强制设备下线"""
-        device = self.db.query(LoginDevice).filter(
-            LoginDevice.user_id == user_id,
-            LoginDevice.device_id == device_id
-        ).first()
+        device = (await self.db.execute(
+            select(LoginDevice).where(
+                LoginDevice.user_id == user_id,
+                LoginDevice.device_id == device_id
+            )
+        )).scalars().first()
         
         if not device:
             return ApiResponse(
@@ -183,11 +192,11 @@ class SecurityService:
         
         # 从 Redis 删除该设备的 Token，使其立即失效
         from app.utils.security import remove_token
-        remove_token(user_id, device_id)
+        await remove_token(user_id, device_id)
         
         # 删除设备记录，强制下线
-        self.db.delete(device)
-        self.db.commit()
+        await self.db.delete(device)
+        await self.db.commit()
         
         return ApiResponse(
             code=200,
@@ -196,13 +205,13 @@ class SecurityService:
             errMsg=None
         )
     
-    def get_security_settings(
+    async def get_security_settings(
         self,
         user_id: str
     ) -> ApiResponse[SecuritySettingsResponse]:
         """获取安全设置信息"""
         # 获取用户信息
-        user = self.db.query(User).filter(User.id == user_id).first()
+        user = (await self.db.execute(select(User).where(User.id == user_id))).scalars().first()
         
         if not user:
             return ApiResponse(
@@ -213,17 +222,19 @@ class SecurityService:
             )
         
         # 获取活跃设备数量
-        active_devices_count = self.db.query(func.count(LoginDevice.id)).filter(
-            LoginDevice.user_id == user_id
-        ).scalar() or 0
+        active_devices_count = (await self.db.execute(
+            select(func.count(LoginDevice.id)).where(LoginDevice.user_id == user_id)
+        )).scalar() or 0
         
         # 获取最近30天登录次数
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_login_count = self.db.query(func.count(LoginLog.id)).filter(
-            LoginLog.user_id == user_id,
-            LoginLog.created_at >= thirty_days_ago,
-            LoginLog.status == "success"
-        ).scalar() or 0
+        recent_login_count = (await self.db.execute(
+            select(func.count(LoginLog.id)).where(
+                LoginLog.user_id == user_id,
+                LoginLog.created_at >= thirty_days_ago,
+                LoginLog.status == "success"
+            )
+        )).scalar() or 0
         
         settings = SecuritySettingsResponse(
             two_factor_enabled=False,  # 暂未实现两步验证
@@ -241,8 +252,9 @@ class SecurityService:
         )
     
     @staticmethod
+    @lru_cache(maxsize=4096)
     def generate_device_id(user_agent: str, ip_address: str) -> str:
-        """生成设备唯一标识"""
+        """生成设备唯一标识（同一设备的请求直接复用计算结果）"""
         raw = f"{user_agent}:{ip_address}"
         return hashlib.md5(raw.encode()).hexdigest()
     
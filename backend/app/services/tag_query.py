@@ -0,0 +1,80 @@
+"""
+标签筛选与分面统计
+
+contents.tags（ARRAY）与 todos/expenses/notes.tags（JSONB）都建有 GIN 索引：
+- any（任一标签）：ARRAY 使用 &&，JSONB 使用 ?|
+- all（全部标签）：ARRAY 使用 @>，JSONB 使用 ?&
+以上运算符均可走 GIN 索引。分面统计在筛选后的结果集上展开标签并分组计数。
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, desc
+from sqlalchemy.dialects.postgresql import ARRAY, array
+from typing import Dict, Iterable, List, Optional
+
+from app.core.config import settings
+
+TAG_MODE_ANY = "any"
+TAG_MODE_ALL = "all"
+
+
+def parse_tags(*values: Optional[str]) -> List[str]:
+    """合并单标签与逗号分隔的多标签参数，去空、去重并限制数量"""
+    tags = []
+    for value in values:
+        for tag in (value or "").split(","):
+            tag = tag.strip()
+            if tag and tag not in tags:
+                tags.append(tag)
+    return tags[:settings.TAG_FILTER_MAX_TAGS]
+
+
+def tag_clause(column, tags: List[str], mode: str = TAG_MODE_ANY):
+    """构造可走 GIN 索引的标签筛选条件"""
+    if isinstance(column.type, ARRAY):
+        if mode == TAG_MODE_ALL:
+            return column.contains(tags)
+        return column.overlap(tags)
+
+    # JSONB 标签数组
+    if mode == TAG_MODE_ALL:
+        return column.has_all(array(tags))
+    return column.has_any(array(tags))
+
+
+def tag_filters_key(tags: Iterable[str], mode: str) -> Optional[str]:
+    """用于计数缓存键的规范化标签条件"""
+    tags = sorted(tags)
+    if not tags:
+        return None
+    return f"{mode}:{','.join(tags)}"
+
+
+def count_tag_facets(db: Session, query, limit: Optional[int] = None) -> List[Dict]:
+    """
+    统计筛选结果中各标签出现的次数
+
+    Args:
+        query: 已应用筛选条件、未分页的 ORM 查询（实体需包含 tags 列）
+        limit: 返回的标签数量，默认 settings.TAG_FACET_LIMIT
+    """
+    # subquery() 会关闭预加载，joinedload 不会进入子查询
+    results = query.order_by(None).subquery()
+    tags_column = results.c.tags
+
+    if isinstance(tags_column.type, ARRAY):
+        expanded = select(func.unnest(tags_column).label("tag"))
+    else:
+        expanded = select(func.jsonb_array_elements_text(tags_column).label("tag")).where(
+            func.jsonb_typeof(tags_column) == "array"
+        )
+    expanded = expanded.subquery()
+
+    count = func.count().label("count")
+    rows = db.execute(
+        select(expanded.c.tag, count)
+        .where(func.btrim(expanded.c.tag) != "")
+        .group_by(expanded.c.tag)
+        .order_by(desc(count), expanded.c.tag)
+        .limit(limit or settings.TAG_FACET_LIMIT)
+    ).all()
+    return [{"name": row.tag, "count": row.count} for row in rows]
@@ -0,0 +1,296 @@
+"""
+标签统计服务
+
+使用 Redis 有序集合增量维护"带有某标签的公开内容数"：
+- tags:hot:all[:type]              全部时间
+- tags:hot:h:{YYYYMMDDHH}[:type]   按小时分桶（用于 24h 窗口）
+- tags:hot:d:{YYYYMMDD}[:type]     按天分桶（用于 7d/30d 窗口）
+
+内容创建、更新标签、删除、切换可见性时按差量更新；读取时 ZREVRANGE 取前 N，
+时间窗口先合并分桶并短暂缓存。Redis 数据丢失时从数据库按 SQL 聚合重建：结果先写入
+tags:hot:rebuild:{批次} 下的临时键，完成后一次性 RENAME 覆盖正式键，重建期间读取与增量更新
+仍作用于旧数据；尚未就绪（其他进程正在重建或重建失败）时读取改为数据库聚合。
+热门标签接口通过 top_tags_async 使用异步客户端读取，只有需要重建或查库时才进入 run_sync。
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import logging
+import uuid
+
+from app.core.redis import get_async_redis, get_redis
+
+logger = logging.getLogger(__name__)
+
+TAG_KEY_PREFIX = "tags:hot"
+READY_KEY = f"{TAG_KEY_PREFIX}:ready"
+REBUILD_LOCK_KEY = f"{TAG_KEY_PREFIX}:rebuild_lock"
+REBUILD_STAGING_PREFIX = f"{TAG_KEY_PREFIX}:rebuild"
+REBUILD_STAGING_TTL = 600  # 重建中断时临时键自动过期
+
+WINDOW_HOURS = {"24h": 24}
+WINDOW_DAYS = {"7d": 7, "30d": 30}
+HOUR_BUCKET_TTL = 25 * 3600
+DAY_BUCKET_TTL = 31 * 86400
+WINDOW_CACHE_TTL = 60
+
+
+def _type_suffix(content_type) -> str:
+    type_value = getattr(content_type, "value", content_type)
+    return f":{type_value}" if type_value else ""
+
+
+def _all_key(content_type=None) -> str:
+    return f"{TAG_KEY_PREFIX}:all{_type_suffix(content_type)}"
+
+
+def _hour_key(moment: datetime, content_type=None) -> str:
+    return f"{TAG_KEY_PREFIX}:h:{moment.strftime('%Y%m%d%H')}{_type_suffix(content_type)}"
+
+
+def _day_key(moment: datetime, content_type=None) -> str:
+    return f"{TAG_KEY_PREFIX}:d:{moment.strftime('%Y%m%d')}{_type_suffix(content_type)}"
+
+
+def _window_key(window: str, content_type=None) -> str:
+    return f"{TAG_KEY_PREFIX}:window:{window}{_type_suffix(content_type)}"
+
+
+def _window_sources(window: str, content_type=None) -> List[str]:
+    """时间窗口覆盖的分桶键"""
+    now = datetime.utcnow()
+    if window in WINDOW_HOURS:
+        return [_hour_key(now - timedelta(hours=i), content_type) for i in range(WINDOW_HOURS[window])]
+    return [_day_key(now - timedelta(days=i), content_type) for i in range(WINDOW_DAYS[window])]
+
+
+def tag_snapshot(content) -> Optional[Dict]:
+    """记录内容对标签统计有影响的字段；非公开内容不计入统计"""
+    if content is None or not content.is_public:
+        return None
+    return {
+        "type": getattr(content.type, "value", content.type),
+        "tags": {tag.strip() for tag in (content.tags or []) if tag and tag.strip()},
+        "created_at": content.created_at or datetime.utcnow(),
+    }
+
+
+class TagStatsService:
+    """标签统计服务"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def apply_change(old: Optional[Dict], new: Optional[Dict]) -> None:
+        """
+        写操作提交后调用，按变更前后的快照差量更新计数
+
+        Args:
+            old: 变更前的 tag_snapshot（新建内容时为 None）
+            new: 变更后的 tag_snapshot（删除内容时为 None）
+        """
+        deltas = []
+        if old:
+            deltas.extend((tag, -1, old) for tag in old["tags"] - (new["tags"] if new else set()))
+        if new:
+            deltas.extend((tag, 1, new) for tag in new["tags"] - (old["tags"] if old else set()))
+        if not deltas:
+            return
+
+        try:
+            now = datetime.utcnow()
+            pipe = get_redis().pipeline()
+            touched = set()
+            for tag, delta, snapshot in deltas:
+                created_at = snapshot["created_at"]
+                for content_type in (None, snapshot["type"]):
+                    pipe.zincrby(_all_key(content_type), delta, tag)
+                    touched.add(_all_key(content_type))
+                    if now - created_at <= timedelta(hours=24):
+                        key = _hour_key(created_at, content_type)
+                        pipe.zincrby(key, delta, tag)
+                        pipe.expire(key, HOUR_BUCKET_TTL)
+                        touched.add(key)
+                    if now - created_at <= timedelta(days=30):
+                        key = _day_key(created_at, content_type)
+                        pipe.zincrby(key, delta, tag)
+                        pipe.expire(key, DAY_BUCKET_TTL)
+                        touched.add(key)
+            # 计数归零的标签移出集合
+            for key in touched:
+                pipe.zremrangebyscore(key, "-inf", 0)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"⚠️  更新标签统计失败，等待下次重建 - 错误: {str(e)}")
+            TagStatsService.mark_dirty()
+
+    @staticmethod
+    def mark_dirty() -> None:
+        """计数可能失真时调用，下次读取会从数据库重建"""
+        try:
+            get_redis().delete(READY_KEY)
+        except Exception:
+            pass
+
+    def top_tags(self, limit: int = 10, window: str = "all", content_type=None) -> List[Dict]:
+        """获取前 N 个热门标签"""
+        redis_client = get_redis()
+        try:
+            if not redis_client.exists(READY_KEY):
+                self.rebuild()
+                if not redis_client.exists(READY_KEY):
+                    # 其他进程正在重建：不读取可能不完整的计数
+                    return self._query_top_tags(limit, window, content_type)
+
+            if window == "all":
+                key = _all_key(content_type)
+            else:
+                key = self._merge_window(window, content_type)
+
+            rows = redis_client.zrevrange(key, 0, limit - 1, withscores=True)
+            return [{"name": tag, "count": int(score)} for tag, score in rows]
+        except Exception as e:
+            logger.warning(f"⚠️  读取标签统计失败，改用数据库聚合 - 错误: {str(e)}")
+            return self._query_top_tags(limit, window, content_type)
+
+    @staticmethod
+    async def top_tags_async(
+        db: AsyncSession, limit: int = 10, window: str = "all", content_type=None
+    ) -> List[Dict]:
+        """top_tags 的异步版本：计数就绪时只访问 Redis，需要重建或回退查库时通过 run_sync 执行"""
+        redis_client = get_async_redis()
+        try:
+            if not await redis_client.exists(READY_KEY):
+                return await db.run_sync(
+                    lambda session: TagStatsService(session).top_tags(limit, window, content_type)
+                )
+
+            if window == "all":
+                key = _all_key(content_type)
+            else:
+                key = _window_key(window, content_type)
+                if not await redis_client.exists(key):
+                    pipe = redis_client.pipeline()
+                    pipe.zunionstore(key, _window_sources(window, content_type))
+                    pipe.expire(key, WINDOW_CACHE_TTL)
+                    await pipe.execute()
+
+            rows = await redis_client.zrevrange(key, 0, limit - 1, withscores=True)
+            return [{"name": tag, "count": int(score)} for tag, score in rows]
+        except Exception as e:
+            logger.warning(f"⚠️  读取标签统计失败，改用数据库聚合 - 错误: {str(e)}")
+            return await db.run_sync(
+                lambda session: TagStatsService(session)._query_top_tags(limit, window, content_type)
+            )
+
+    def _merge_window(self, window: str, content_type=None) -> str:
+        """合并时间窗口内的分桶，结果缓存 WINDOW_CACHE_TTL 秒"""
+        redis_client = get_redis()
+        target = _window_key(window, content_type)
+        if redis_client.exists(target):
+            return target
+
+        pipe = redis_client.pipeline()
+        pipe.zunionstore(target, _window_sources(window, content_type))
+        pipe.expire(target, WINDOW_CACHE_TTL)
+        pipe.execute()
+        return target
+
+    def rebuild(self) -> None:
+        """从数据库按 SQL 聚合重建全部计数（同一时间只允许一个进程执行）"""
+        redis_client = get_redis()
+        if not redis_client.set(REBUILD_LOCK_KEY, "1", nx=True, ex=300):
+            return
+
+        try:
+            logger.info("🔄 重建标签统计")
+            live_keys = {
+                key for key in redis_client.scan_iter(match=f"{TAG_KEY_PREFIX}:*", count=1000)
+                if key not in (REBUILD_LOCK_KEY, READY_KEY)
+                and not key.startswith(f"{REBUILD_STAGING_PREFIX}:")
+            }
+            staging_prefix = f"{REBUILD_STAGING_PREFIX}:{uuid.uuid4().hex}:"
+            built = {}  # 正式键 -> 过期时间（None 表示不过期）
+
+            def staging(key: str) -> str:
+                return staging_prefix + key
+
+            pipe = redis_client.pipeline(transaction=False)
+
+            # 全部时间：按 (标签, 类型) 聚合
+            totals = self.db.execute(text("""
+                SELECT btrim(tag) AS tag, lower(type::text) AS type, count(*) AS cnt
+                FROM contents, unnest(tags) AS tag
+                WHERE is_public = true AND btrim(tag) <> ''
+                GROUP BY 1, 2
+            """)).all()
+            for row in totals:
+                for key in (_all_key(), _all_key(row.type)):
+                    pipe.zincrby(staging(key), row.cnt, row.tag)
+                    built[key] = None
+
+            # 近 30 天按天分桶、近 24 小时按小时分桶
+            for unit, ttl, key_of, since in (
+                ("day", DAY_BUCKET_TTL, _day_key, timedelta(days=30)),
+                ("hour", HOUR_BUCKET_TTL, _hour_key, timedelta(hours=24)),
+            ):
+                buckets = self.db.execute(text(f"""
+                    SELECT btrim(tag) AS tag, lower(type::text) AS type,
+                           date_trunc('{unit}', created_at) AS bucket, count(*) AS cnt
+                    FROM contents, unnest(tags) AS tag
+                    WHERE is_public = true AND btrim(tag) <> '' AND created_at >= :since
+                    GROUP BY 1, 2, 3
+                """), {"since": datetime.utcnow() - since}).all()
+                for row in buckets:
+                    for content_type in (None, row.type):
+                        key = key_of(row.bucket, content_type)
+                        pipe.zincrby(staging(key), row.cnt, row.tag)
+                        built[key] = ttl
+
+            for key in built:
+                pipe.expire(staging(key), REBUILD_STAGING_TTL)
+            pipe.execute()
+
+            # 一次事务内替换：临时键 RENAME 为正式键，不再存在的旧键（含时间窗口缓存）删除
+            pipe = redis_client.pipeline()
+            for key, ttl in built.items():
+                pipe.rename(staging(key), key)
+                if ttl is None:
+                    pipe.persist(key)
+                else:
+                    pipe.expire(key, ttl)
+            stale = live_keys - set(built)
+            if stale:
+                pipe.delete(*stale)
+            pipe.set(READY_KEY, "1")
+            pipe.execute()
+            logger.info(f"✅ 标签统计重建完成 - 标签/类型组合: {len(totals)}")
+        finally:
+            redis_client.delete(REBUILD_LOCK_KEY)
+
+    def _query_top_tags(self, limit: int, window: str, content_type=None) -> List[Dict]:
+        """Redis 不可用时的兜底：数据库端聚合"""
+        conditions = ["is_public = true", "btrim(tag) <> ''"]
+        params = {"limit": limit}
+        if content_type:
+            conditions.append("lower(type::text) = :type")
+            params["type"] = getattr(content_type, "value", content_type)
+        if window in WINDOW_HOURS:
+            conditions.append("created_at >= :since")
+            params["since"] = datetime.utcnow() - timedelta(hours=WINDOW_HOURS[window])
+        elif window in WINDOW_DAYS:
+            conditions.append("created_at >= :since")
+            params["since"] = datetime.utcnow() - timedelta(days=WINDOW_DAYS[window])
+
+        rows = self.db.execute(text(f"""
+            SELECT btrim(tag) AS tag, count(*) AS cnt
+            FROM contents, unnest(tags) AS tag
+            WHERE {' AND '.join(conditions)}
+            GROUP BY 1
+            ORDER BY cnt DESC
+            LIMIT :limit
+        """), params).all()
+        return [{"name": row.tag, "count": row.cnt} for row in rows]
@@ -0,0 +1,73 @@
+"""
+认证快速路径
+
+已登录请求的认证开销主要来自 JWT 验签、设备 ID 计算与 Redis 中的 Token 比对，
+常见情况下都改为进程内的字典查找：
+- 声明缓存：按 Token 的 SHA-256 摘要缓存验签后的声明，有效期不超过 Token 的 exp
+- 有效性缓存：按 user_id:device_id 缓存最近一次与 Redis 比对通过的 Token 摘要，
+  有效期 AUTH_VALIDITY_CACHE_SECONDS；强制下线、重新登录时通过 Redis 频道广播，
+  各进程立即丢弃对应条目
+- 认证耗时与缓存命中情况记录在进程内指标中，通过 /health/auth 查看
+"""
+from typing import Optional
+import hashlib
+import time
+
+from app.core.config import settings
+from app.core.invalidation import subscribe
+from app.core.metrics import Counters, Histogram
+from app.utils.security import TOKEN_REVOKE_CHANNEL, decode_token, is_token_valid, token_slot
+from app.utils.ttl_cache import TTLCache
+
+# 声明缓存的最长有效期（实际不超过 Token 剩余有效期）
+_CLAIMS_MAX_TTL_SECONDS = 24 * 3600
+
+claims_cache = TTLCache(settings.AUTH_CLAIMS_CACHE_SIZE, _CLAIMS_MAX_TTL_SECONDS)
+validity_cache = TTLCache(settings.AUTH_CLAIMS_CACHE_SIZE, settings.AUTH_VALIDITY_CACHE_SECONDS)
+subscribe(TOKEN_REVOKE_CHANNEL, validity_cache.invalidate, on_reset=validity_cache.clear)
+
+auth_seconds = Histogram()
+auth_counters = Counters()
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def cached_claims(token: str, digest: str) -> Optional[dict]:
+    """验签后的声明（命中缓存时不再验签）"""
+    claims = claims_cache.get(digest)
+    if claims is not None:
+        auth_counters.inc("claims_hit")
+        return claims
+    auth_counters.inc("claims_miss")
+    claims = decode_token(token)
+    if claims is None:
+        return None
+    exp = claims.get("exp")
+    ttl = exp - time.time() if isinstance(exp, (int, float)) else None
+    if ttl is None or ttl > 0:
+        claims_cache.put(digest, claims, ttl)
+    return claims
+
+
+async def check_token(user_id: str, device_id: str, digest: str, token: str) -> bool:
+    """Token 是否为该设备当前有效的 Token（短时间内复用上次的比对结果）"""
+    slot = token_slot(user_id, device_id)
+    if validity_cache.get(slot) == digest:
+        auth_counters.inc("validity_hit")
+        return True
+    auth_counters.inc("validity_miss")
+    if not await is_token_valid(user_id, device_id, token):
+        return False
+    validity_cache.put(slot, digest)
+    return True
+
+
+def auth_status() -> dict:
+    return {
+        "auth_seconds": auth_seconds.snapshot(),
+        "counters": auth_counters.snapshot(),
+        "claims_cached": len(claims_cache),
+        "validity_cached": len(validity_cache),
+    }
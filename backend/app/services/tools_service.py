@@ -17,6 +17,8 @@ from app.schemas.tools import (
     NoteCreate, NoteUpdate, NoteResponse, NoteListResponse,
 )
 from app.schemas import ApiResponse
+from app.services.count_service import CountService, total_pages_of
+from app.services.tag_query import parse_tags, tag_clause, tag_filters_key, count_tag_facets, TAG_MODE_ANY
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +40,7 @@ class ToolsService:
             )
             self.db.add(countdown)
             self.db.commit()
+            CountService.invalidate(f"countdowns:{user_id}")
             self.db.refresh(countdown)
             
             response = CountdownResponse.from_orm(countdown)
@@ -51,13 +54,15 @@ class ToolsService:
             raise HTTPException(status_code=500, detail=str(e))
     
     def get_countdown_list(
-        self, user_id: str, page: int = 1, page_size: int = 20
+        self, user_id: str, page: int = 1, page_size: int = 20, with_total: bool = True
     ) -> ApiResponse[CountdownListResponse]:
         """获取倒计时列表"""
         try:
             query = self.db.query(Countdown).filter(Countdown.user_id == user_id)
             
-            total = query.count()
+            total, _ = CountService(self.db).get_total(
+                query, scope=f"countdowns:{user_id}", filters={}, with_total=with_total
+            )
             offset = (page - 1) * page_size
             countdowns = query.order_by(Countdown.target_date).offset(offset).limit(page_size).all()
             
@@ -68,7 +73,7 @@ class ToolsService:
                 item.days_remaining = (countdown.target_date - now).days
                 items.append(item)
             
-            total_pages = (total + page_size - 1) // page_size
+            total_pages = total_pages_of(total, page_size)
             
             return ApiResponse(
                 code=200,
@@ -102,6 +107,7 @@ class ToolsService:
                 setattr(countdown, field, value)
             
             self.db.commit()
+            CountService.invalidate(f"countdowns:{user_id}")
             self.db.refresh(countdown)
             
             response = CountdownResponse.from_orm(countdown)
@@ -128,6 +134,7 @@ class ToolsService:
             
             self.db.delete(countdown)
             self.db.commit()
+            CountService.invalidate(f"countdowns:{user_id}")
             
             return ApiResponse(code=200, data=None, msg="删除成功")
         except HTTPException:
@@ -148,6 +155,7 @@ class ToolsService:
             )
             self.db.add(todo)
             self.db.commit()
+            CountService.invalidate(f"todos:{user_id}")
             self.db.refresh(todo)
             
             return ApiResponse(code=200, data=TodoResponse.from_orm(todo), msg="创建成功")
@@ -161,7 +169,11 @@ class ToolsService:
         user_id: str, 
         status: Optional[TodoStatus] = None,
         page: int = 1, 
-        page_size: int = 50
+        page_size: int = 50,
+        with_total: bool = True,
+        tags: Optional[str] = None,
+        tag_mode: str = TAG_MODE_ANY,
+        with_facets: bool = False
     ) -> ApiResponse[TodoListResponse]:
         """获取待办列表"""
         try:
@@ -170,12 +182,21 @@ class ToolsService:
             if status:
                 query = query.filter(Todo.status == status)
             
-            total = query.count()
+            tag_set = parse_tags(tags)
+            if tag_set:
+                query = query.filter(tag_clause(Todo.tags, tag_set, tag_mode))
+            
+            total, _ = CountService(self.db).get_total(
+                query, scope=f"todos:{user_id}",
+                filters={"status": status, "tags": tag_filters_key(tag_set, tag_mode)},
+                with_total=with_total
+            )
+            facets = count_tag_facets(self.db, query) if with_facets else None
             offset = (page - 1) * page_size
             todos = query.order_by(desc(Todo.created_at)).offset(offset).limit(page_size).all()
             
             items = [TodoResponse.from_orm(todo) for todo in todos]
-            total_pages = (total + page_size - 1) // page_size
+            total_pages = total_pages_of(total, page_size)
             
             return ApiResponse(
                 code=200,
@@ -184,7 +205,8 @@ class ToolsService:
                     total=total,
                     page=page,
                     page_size=page_size,
-                    total_pages=total_pages
+                    total_pages=total_pages,
+                    facets=facets
                 ),
                 msg="获取成功"
             )
@@ -214,6 +236,7 @@ class ToolsService:
                 setattr(todo, field, value)
             
             self.db.commit()
+            CountService.invalidate(f"todos:{user_id}")
             self.db.refresh(todo)
             
             return ApiResponse(code=200, data=TodoResponse.from_orm(todo), msg="更新成功")
@@ -236,6 +259,7 @@ class ToolsService:
             
             self.db.delete(todo)
             self.db.commit()
+            CountService.invalidate(f"todos:{user_id}")
             
             return ApiResponse(code=200, data=None, msg="删除成功")
         except HTTPException:
@@ -291,6 +315,7 @@ class ToolsService:
             )
             self.db.add(expense)
             self.db.commit()
+            CountService.invalidate(f"expenses:{user_id}")
             self.db.refresh(expense)
             
             return ApiResponse(code=200, data=ExpenseResponse.from_orm(expense), msg="创建成功")
@@ -306,7 +331,11 @@ class ToolsService:
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
         page: int = 1,
-        page_size: int = 50
+        page_size: int = 50,
+        with_total: bool = True,
+        tags: Optional[str] = None,
+        tag_mode: str = TAG_MODE_ANY,
+        with_facets: bool = False
     ) -> ApiResponse[ExpenseListResponse]:
         """获取记账列表"""
         try:
@@ -319,12 +348,24 @@ class ToolsService:
             if end_date:
                 query = query.filter(Expense.date <= end_date)
             
-            total = query.count()
+            tag_set = parse_tags(tags)
+            if tag_set:
+                query = query.filter(tag_clause(Expense.tags, tag_set, tag_mode))
+            
+            total, _ = CountService(self.db).get_total(
+                query, scope=f"expenses:{user_id}",
+                filters={
+                    "type": type, "start_date": start_date, "end_date": end_date,
+                    "tags": tag_filters_key(tag_set, tag_mode),
+                },
+                with_total=with_total
+            )
+            facets = count_tag_facets(self.db, query) if with_facets else None
             offset = (page - 1) * page_size
             expenses = query.order_by(desc(Expense.date)).offset(offset).limit(page_size).all()
             
             items = [ExpenseResponse.from_orm(expense) for expense in expenses]
-            total_pages = (total + page_size - 1) // page_size
+            total_pages = total_pages_of(total, page_size)
             
             return ApiResponse(
                 code=200,
@@ -333,7 +374,8 @@ class ToolsService:
                     total=total,
                     page=page,
                     page_size=page_size,
-                    total_pages=total_pages
+                    total_pages=total_pages,
+                    facets=facets
                 ),
                 msg="获取成功"
             )
@@ -358,6 +400,7 @@ class ToolsService:
                 setattr(expense, field, value)
             
             self.db.commit()
+            CountService.invalidate(f"expenses:{user_id}")
             self.db.refresh(expense)
             
             return ApiResponse(code=200, data=ExpenseResponse.from_orm(expense), msg="更新成功")
@@ -380,6 +423,7 @@ class ToolsService:
             
             self.db.delete(expense)
             self.db.commit()
+            CountService.invalidate(f"expenses:{user_id}")
             
             return ApiResponse(code=200, data=None, msg="删除成功")
         except HTTPException:
@@ -625,6 +669,7 @@ class ToolsService:
             )
             self.db.add(note)
             self.db.commit()
+            CountService.invalidate(f"notes:{user_id}")
             self.db.refresh(note)
             
             return ApiResponse(code=200, data=NoteResponse.from_orm(note), msg="创建成功")
@@ -640,7 +685,11 @@ class ToolsService:
         category: Optional[str] = None,
         is_archived: bool = False,
         page: int = 1,
-        page_size: int = 50
+        page_size: int = 50,
+        with_total: bool = True,
+        tags: Optional[str] = None,
+        tag_mode: str = TAG_MODE_ANY,
+        with_facets: bool = False
     ) -> ApiResponse[NoteListResponse]:
         """获取笔记列表"""
         try:
@@ -656,14 +705,26 @@ class ToolsService:
             if category:
                 query = query.filter(Note.category == category)
             
-            total = query.count()
+            tag_set = parse_tags(tags)
+            if tag_set:
+                query = query.filter(tag_clause(Note.tags, tag_set, tag_mode))
+            
+            total, _ = CountService(self.db).get_total(
+                query, scope=f"notes:{user_id}",
+                filters={
+                    "keyword": keyword, "category": category, "is_archived": is_archived,
+                    "tags": tag_filters_key(tag_set, tag_mode),
+                },
+                with_total=with_total
+            )
+            facets = count_tag_facets(self.db, query) if with_facets else None
             offset = (page - 1) * page_size
             notes = query.order_by(
                 desc(Note.is_pinned), desc(Note.updated_at)
             ).offset(offset).limit(page_size).all()
             
             items = [NoteResponse.from_orm(note) for note in notes]
-            total_pages = (total + page_size - 1) // page_size
+            total_pages = total_pages_of(total, page_size)
             
             return ApiResponse(
                 code=200,
@@ -672,7 +733,8 @@ class ToolsService:
                     total=total,
                     page=page,
                     page_size=page_size,
-                    total_pages=total_pages
+                    total_pages=total_pages,
+                    facets=facets
                 ),
                 msg="获取成功"
             )
@@ -697,6 +759,7 @@ class ToolsService:
                 setattr(note, field, value)
             
             self.db.commit()
+            CountService.invalidate(f"notes:{user_id}")
             self.db.refresh(note)
             
             return ApiResponse(code=200, data=NoteResponse.from_orm(note), msg="更新成功")
@@ -719,6 +782,7 @@ class ToolsService:
             
             self.db.delete(note)
             self.db.commit()
+            CountService.invalidate(f"notes:{user_id}")
             
             return ApiResponse(code=200, data=None, msg="删除成功")
         except HTTPException:
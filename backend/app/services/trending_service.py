@@ -0,0 +1,144 @@
+"""
+内容热度（趋势）服务
+
+热度分采用重力衰减公式：
+    hot_score = (浏览 × Wv + 点赞 × Wl + 评论 × Wc + 收藏 × Ws) / (发布小时数 + 2) ^ G
+
+分数保存在 contents.hot_score（与 is_public、id 组成复合索引），热门信息流按该列
+一次索引范围读取。后台任务增量刷新：
+- 有新互动的内容（点赞/收藏/评论/浏览时写入 Redis 集合 trending:dirty）
+- 当前排名前 TRENDING_TOP_K 的内容（只有它们的衰减会影响热门页排序）
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from datetime import datetime
+import logging
+import uuid
+
+from app.core.config import settings
+from app.core.redis import get_async_redis, get_redis
+from app.services.feed_cache_service import FeedCacheService
+
+logger = logging.getLogger(__name__)
+
+DIRTY_KEY = "trending:dirty"
+
+# created_at 以 UTC 无时区时间存储
+_SCORE_SQL = """
+    (COALESCE(view_count, 0) * :w_view
+     + COALESCE(like_count, 0) * :w_like
+     + COALESCE(comment_count, 0) * :w_comment
+     + COALESCE(save_count, 0) * :w_save)
+    / power(GREATEST(EXTRACT(EPOCH FROM (now() AT TIME ZONE 'utc') - created_at) / 3600, 0) + 2, :gravity)
+"""
+
+_REFRESH_SQL = text(f"""
+    UPDATE contents SET hot_score = {_SCORE_SQL}
+    WHERE id = ANY(CAST(:ids AS uuid[]))
+       OR id IN (
+           SELECT id FROM contents
+           WHERE is_public = true
+           ORDER BY hot_score DESC, id DESC
+           LIMIT :top_k
+       )
+""")
+
+_BACKFILL_SQL = text(f"""
+    UPDATE contents SET hot_score = {_SCORE_SQL}
+    WHERE id IN (
+        SELECT id FROM contents
+        WHERE (created_at, id) < (:after_created_at, CAST(:after_id AS uuid))
+        ORDER BY created_at DESC, id DESC
+        LIMIT :batch_size
+    )
+    RETURNING created_at, id
+""")
+
+
+def _score_params() -> dict:
+    return {
+        "w_view": settings.TRENDING_WEIGHT_VIEW,
+        "w_like": settings.TRENDING_WEIGHT_LIKE,
+        "w_comment": settings.TRENDING_WEIGHT_COMMENT,
+        "w_save": settings.TRENDING_WEIGHT_SAVE,
+        "gravity": settings.TRENDING_GRAVITY,
+    }
+
+
+class TrendingService:
+    """内容热度服务"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def mark_active(*content_ids) -> None:
+        """记录有新互动的内容，下一轮刷新时重算热度"""
+        if not content_ids:
+            return
+        try:
+            get_redis().sadd(DIRTY_KEY, *[str(content_id) for content_id in content_ids])
+        except Exception as e:
+            logger.warning(f"⚠️  记录热度变更失败 - 错误: {str(e)}")
+
+    @staticmethod
+    async def mark_active_async(*content_ids) -> None:
+        """mark_active 的异步版本，供 async 路由在写操作提交后调用"""
+        if not content_ids:
+            return
+        try:
+            await get_async_redis().sadd(DIRTY_KEY, *[str(content_id) for content_id in content_ids])
+        except Exception as e:
+            logger.warning(f"⚠️  记录热度变更失败 - 错误: {str(e)}")
+
+    def refresh(self) -> int:
+        """增量刷新热度分（后台任务调用），返回更新的行数"""
+        ids = self._take_dirty_ids()
+        try:
+            result = self.db.execute(_REFRESH_SQL, {
+                **_score_params(),
+                "ids": ids,
+                "top_k": settings.TRENDING_TOP_K,
+            })
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            # 放回集合，下一轮重试
+            self.mark_active(*ids)
+            raise
+
+        # 热门页排序已变化，标记缓存过期（过期数据仍会返回直到重建完成）
+        FeedCacheService.mark_stale(["popular"])
+
+        logger.info(f"🔥 热度刷新完成 - 有互动: {len(ids)}, 更新行数: {result.rowcount}")
+        return result.rowcount
+
+    def backfill(self, batch_size: int = 1000) -> int:
+        """按 (created_at, id) 分批重算全部内容的热度分（迁移时使用）"""
+        after_created_at, after_id = datetime.max, uuid.UUID(int=(1 << 128) - 1)
+        total = 0
+        while True:
+            rows = self.db.execute(_BACKFILL_SQL, {
+                **_score_params(),
+                "after_created_at": after_created_at,
+                "after_id": str(after_id),
+                "batch_size": batch_size,
+            }).all()
+            self.db.commit()
+            if not rows:
+                return total
+            total += len(rows)
+            after_created_at, after_id = min((row.created_at, row.id) for row in rows)
+
+    @staticmethod
+    def _take_dirty_ids() -> list:
+        """原子地取出并清空待刷新集合"""
+        try:
+            pipe = get_redis().pipeline()
+            pipe.smembers(DIRTY_KEY)
+            pipe.delete(DIRTY_KEY)
+            members, _ = pipe.execute()
+            return list(members)
+        except Exception as e:
+            logger.warning(f"⚠️  读取热度变更集合失败 - 错误: {str(e)}")
+            return []
@@ -0,0 +1,94 @@
+"""
+基于 pg_trgm 的子串检索
+
+标题/描述/正文/作者名的子串匹配（ILIKE '%kw%'）在建立 gin_trgm_ops 索引后可以走索引，
+并可按标题/描述的 similarity() 相似度排序。索引由 migrations/add_trigram_indexes.py 创建；
+未创建时自动退回普通 ILIKE。两种模式匹配的字段相同，只有排序不同。
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import select, or_, func, literal, text
+from typing import Optional, Tuple
+import logging
+
+from app.core.config import settings
+from app.models.content import Content
+from app.models.user import User
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+TRIGRAM_INDEXES = {
+    "idx_contents_title_trgm": "contents USING gin (title gin_trgm_ops)",
+    "idx_contents_description_trgm": "contents USING gin (description gin_trgm_ops)",
+    "idx_contents_content_trgm": "contents USING gin (content gin_trgm_ops)",
+    "idx_users_username_trgm": "users USING gin (username gin_trgm_ops)",
+    "idx_users_email_trgm": "users USING gin (email gin_trgm_ops)",
+}
+
+# 进程内缓存索引检测结果，避免每次请求查询系统表；
+# 带有效期，迁移在服务运行期间执行后无需重启即可生效
+_DETECT_TTL_SECONDS = 60
+_detection = TTLCache(1, _DETECT_TTL_SECONDS)
+
+
+def trigram_available(db: Session) -> bool:
+    """检测 pg_trgm 扩展与索引是否已就绪"""
+    available = _detection.get("available")
+    if available is None:
+        try:
+            count = db.execute(
+                text("SELECT count(*) FROM pg_indexes WHERE indexname = ANY(:names)"),
+                {"names": list(TRIGRAM_INDEXES)},
+            ).scalar()
+        except Exception as e:
+            logger.warning(f"⚠️  检测三元组索引失败: {str(e)}")
+            return False
+        available = count == len(TRIGRAM_INDEXES)
+        _detection.put("available", available)
+        logger.info(f"🔤 三元组索引{'已启用' if available else '未创建，使用普通模糊匹配'}")
+    return available
+
+
+class TrigramQueryBuilder:
+    """子串检索条件构造器：有三元组索引时附带相似度得分用于排序"""
+
+    def __init__(self, db: Session):
+        self.enabled = settings.SEARCH_TRIGRAM_ENABLED and trigram_available(db)
+
+    def keyword_clause(self, keyword: str) -> Tuple[object, Optional[object]]:
+        """
+        标题/描述/正文子串匹配
+
+        Returns:
+            (筛选条件, 相似度得分表达式；未启用三元组索引时为 None)
+        """
+        pattern = f"%{keyword}%"
+        clause = or_(
+            Content.title.ilike(pattern),
+            Content.description.ilike(pattern),
+            Content.content.ilike(pattern),
+        )
+        if not self.enabled:
+            return clause, None
+
+        score = func.greatest(
+            func.similarity(Content.title, keyword),
+            func.similarity(func.coalesce(Content.description, ""), keyword),
+        )
+        return clause, score
+
+    def author_subquery(self, author: str):
+        """
+        作者名/邮箱子串匹配，先在 users 表上走索引筛出作者，再按 user_id 关联内容
+
+        Returns:
+            子查询，列为 user_id 与 author_score
+        """
+        pattern = f"%{author}%"
+        score = func.similarity(User.username, author) if self.enabled else literal(0.0)
+        return select(
+            User.id.label("user_id"),
+            score.label("author_score"),
+        ).where(
+            or_(User.username.ilike(pattern), User.email.ilike(pattern))
+        ).subquery()
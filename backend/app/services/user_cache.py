@@ -0,0 +1,79 @@
+"""
+登录用户缓存
+
+认证依赖每次请求都要确认用户存在且已激活。每个工作进程用一个带 TTL 的 LRU
+缓存用户快照（id、用户名、头像、激活/验证状态），命中时不再查询 users 表。
+
+用户记录提交变更（修改资料、修改邮箱、禁用账户等）后，通过 Redis 频道
+user_cache:invalidate 广播用户 ID，各工作进程收到后删除对应缓存
+（见 app/core/invalidation.py）。TTL 兜底保证最终一致。
+"""
+from dataclasses import dataclass
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from typing import Iterable, Optional
+import uuid
+
+from app.core.config import settings
+from app.core.invalidation import publish, subscribe
+from app.models.user import User
+from app.utils.ttl_cache import TTLCache
+
+INVALIDATE_CHANNEL = "user_cache:invalidate"
+
+# 会话 info 中记录待广播失效的用户 ID
+_DIRTY_KEY = "user_cache_dirty"
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """认证用的用户快照（详细资料需从数据库读取）"""
+    id: uuid.UUID
+    username: str
+    avatar: Optional[str]
+    is_active: bool
+    is_verified: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "CachedUser":
+        return cls(
+            id=user.id,
+            username=user.username,
+            avatar=user.avatar,
+            is_active=user.is_active,
+            is_verified=user.is_verified,
+        )
+
+
+user_cache = TTLCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL_SECONDS)
+subscribe(INVALIDATE_CHANNEL, user_cache.invalidate, on_reset=user_cache.clear)
+
+
+def publish_invalidation(user_ids: Iterable[str]) -> None:
+    """删除本进程缓存并通知其他工作进程"""
+    for user_id in user_ids:
+        user_cache.invalidate(user_id)
+        publish(INVALIDATE_CHANNEL, user_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_dirty_users(session: Session, flush_context) -> None:
+    # after_flush 时 dirty/deleted 仍是本次 flush 前的状态
+    user_ids = {
+        str(obj.id) for obj in (*session.dirty, *session.deleted)
+        if isinstance(obj, User) and obj.id is not None
+    }
+    if user_ids:
+        session.info.setdefault(_DIRTY_KEY, set()).update(user_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session: Session) -> None:
+    user_ids = session.info.pop(_DIRTY_KEY, None)
+    if user_ids:
+        publish_invalidation(user_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_DIRTY_KEY, None)
@@ -0,0 +1,244 @@
+"""
+浏览量与浏览历史的缓冲写入
+
+详情接口只在 Redis 中记录浏览，不再开启写事务：
+- 去重：同一访客（用户 ID 或客户端标识）在 VIEW_DEDUP_WINDOW_SECONDS 内重复浏览只计一次
+- views:pending:counts   内容 ID -> 待累加的浏览量
+- views:pending:history  "用户ID:内容ID" -> 最后浏览时间戳
+
+后台任务 view_flush 每 VIEW_FLUSH_SECONDS 秒取走缓冲区，批量累加 view_count，
+并以 INSERT ... ON CONFLICT 更新 content_views。
+
+写入是幂等的：缓冲区取走时改名为带批次 ID 的处理中键，批次 ID 与浏览量在同一事务中
+写入 view_flush_batches。同一批次被重复处理（两个实例并发执行、提交后清理 Redis 失败）
+时，数据库中已有记录，直接跳过写库只做清理，浏览量不会重复累加。
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from datetime import datetime
+from typing import Optional
+import logging
+import uuid
+
+from app.core.config import settings
+from app.core.redis import get_async_redis, get_redis
+from app.services.count_service import CountService
+from app.services.interaction_index import state_key, STATE_VIEWED
+from app.services.trending_service import TrendingService
+
+logger = logging.getLogger(__name__)
+
+PENDING_COUNTS_KEY = "views:pending:counts"
+PENDING_HISTORY_KEY = "views:pending:history"
+FLUSHING_BATCH_KEY = "views:flushing:batch"  # 当前处理中的批次 ID
+_LEGACY_FLUSHING_COUNTS_KEY = "views:flushing:counts"
+_LEGACY_FLUSHING_HISTORY_KEY = "views:flushing:history"
+
+# 已处理批次的保留时间（只需覆盖清理失败后的重试窗口）
+_BATCH_RETENTION = "1 day"
+
+
+def _flushing_counts_key(batch_id: str) -> str:
+    return f"views:flushing:counts:{batch_id}"
+
+
+def _flushing_history_key(batch_id: str) -> str:
+    return f"views:flushing:history:{batch_id}"
+
+
+# 没有处理中的批次时，把缓冲区原子地改名为新批次；返回当前批次 ID（缓冲区为空时返回 nil）
+_TAKE_PENDING_SCRIPT = """
+local batch = redis.call('GET', KEYS[1])
+if batch then
+    return batch
+end
+-- 升级前遗留的无批次处理中数据优先作为本批次，其次是缓冲区
+local counts = KEYS[4]
+if redis.call('EXISTS', counts) == 0 then
+    counts = KEYS[2]
+end
+local history = KEYS[5]
+if redis.call('EXISTS', history) == 0 then
+    history = KEYS[3]
+end
+local has_counts = redis.call('EXISTS', counts) == 1
+local has_history = redis.call('EXISTS', history) == 1
+if not has_counts and not has_history then
+    return false
+end
+batch = ARGV[1]
+if has_counts then
+    redis.call('RENAME', counts, 'views:flushing:counts:' .. batch)
+end
+if has_history then
+    redis.call('RENAME', history, 'views:flushing:history:' .. batch)
+end
+redis.call('SET', KEYS[1], batch)
+return batch
+"""
+
+# 清理已写库的批次（只在批次 ID 未变化时清理）
+_FINISH_BATCH_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[1], 'views:flushing:counts:' .. ARGV[1], 'views:flushing:history:' .. ARGV[1])
+return 1
+"""
+
+_CLAIM_BATCH_SQL = text("""
+    INSERT INTO view_flush_batches (batch_id, flushed_at)
+    VALUES (:batch_id, now() AT TIME ZONE 'utc')
+    ON CONFLICT (batch_id) DO NOTHING
+    RETURNING batch_id
+""")
+
+_PRUNE_BATCHES_SQL = text(f"""
+    DELETE FROM view_flush_batches
+    WHERE flushed_at < (now() AT TIME ZONE 'utc') - interval '{_BATCH_RETENTION}'
+""")
+
+_APPLY_COUNTS_SQL = text("""
+    UPDATE contents AS c
+    SET view_count = COALESCE(c.view_count, 0) + d.delta
+    FROM unnest(CAST(:ids AS uuid[]), CAST(:deltas AS integer[])) AS d(id, delta)
+    WHERE c.id = d.id
+""")
+
+# 只为仍然存在的内容写入历史，避免内容已删除时外键报错
+_UPSERT_HISTORY_SQL = text("""
+    INSERT INTO content_views (id, content_id, user_id, created_at, updated_at)
+    SELECT h.id, h.content_id, h.user_id, h.viewed_at, h.viewed_at
+    FROM unnest(
+        CAST(:ids AS uuid[]), CAST(:content_ids AS uuid[]),
+        CAST(:user_ids AS uuid[]), CAST(:viewed_at AS timestamp[])
+    ) AS h(id, content_id, user_id, viewed_at)
+    JOIN contents c ON c.id = h.content_id
+    ON CONFLICT (content_id, user_id)
+    DO UPDATE SET updated_at = GREATEST(content_views.updated_at, EXCLUDED.updated_at)
+""")
+
+
+def _history_field(user_id: str, content_id: str) -> str:
+    return f"{user_id}:{content_id}"
+
+
+class ViewTracker:
+    """浏览记录缓冲"""
+
+    @staticmethod
+    async def record(content_id: str, user_id: Optional[str], viewer_key: Optional[str]) -> int:
+        """
+        记录一次浏览（请求路径上只访问 Redis，使用异步客户端，由路由在查询完成后调用）
+
+        Args:
+            viewer_key: 未登录访客的标识（如客户端 IP），用于去重
+
+        Returns:
+            尚未写入数据库的浏览量，用于在响应中展示最新的浏览数
+        """
+        viewer = user_id or viewer_key or "anonymous"
+        try:
+            redis_client = get_async_redis()
+            counted = await redis_client.set(
+                f"views:seen:{content_id}:{viewer}", 1, nx=True, ex=settings.VIEW_DEDUP_WINDOW_SECONDS
+            )
+
+            pipe = redis_client.pipeline()
+            if counted:
+                pipe.hincrby(PENDING_COUNTS_KEY, content_id, 1)
+            else:
+                pipe.hget(PENDING_COUNTS_KEY, content_id)
+            if user_id:
+                pipe.hset(PENDING_HISTORY_KEY, _history_field(user_id, content_id), datetime.utcnow().timestamp())
+                # 同步互动状态索引（集合未加载时下次加载会与数据库记录合并）
+                pipe.sadd(state_key(user_id, STATE_VIEWED), content_id)
+            return int((await pipe.execute())[0] or 0)
+        except Exception as e:
+            logger.warning(f"⚠️  记录浏览失败 - 内容ID: {content_id}, 错误: {str(e)}")
+            return 0
+
+    @staticmethod
+    def discard_history(content_id: str, user_id: str) -> bool:
+        """删除尚未落库的浏览历史，返回是否存在"""
+        field = _history_field(user_id, content_id)
+        try:
+            redis_client = get_redis()
+            batch_id = redis_client.get(FLUSHING_BATCH_KEY)
+            pipe = redis_client.pipeline()
+            pipe.hdel(PENDING_HISTORY_KEY, field)
+            if batch_id:
+                pipe.hdel(_flushing_history_key(batch_id), field)
+            return any(pipe.execute())
+        except Exception as e:
+            logger.warning(f"⚠️  删除缓冲浏览历史失败 - 错误: {str(e)}")
+            return False
+
+    @staticmethod
+    def flush(db: Session) -> None:
+        """将缓冲区写入数据库（后台任务调用；按批次 ID 幂等，同一批次只会累加一次）"""
+        batch_id, counts, history = ViewTracker._take_pending()
+        if batch_id is None:
+            return
+
+        user_ids = set()
+        try:
+            # 并发处理同一批次时，后到的事务在这里等待先到的提交后得到冲突，直接跳过
+            claimed = db.execute(_CLAIM_BATCH_SQL, {"batch_id": batch_id}).scalar()
+            if claimed and counts:
+                db.execute(_APPLY_COUNTS_SQL, {
+                    "ids": list(counts),
+                    "deltas": [int(delta) for delta in counts.values()],
+                })
+
+            if claimed and history:
+                rows = []
+                for field, timestamp in history.items():
+                    user_id, content_id = field.split(":", 1)
+                    user_ids.add(user_id)
+                    rows.append((user_id, content_id, datetime.utcfromtimestamp(float(timestamp))))
+                db.execute(_UPSERT_HISTORY_SQL, {
+                    "ids": [str(uuid.uuid4()) for _ in rows],
+                    "content_ids": [content_id for _, content_id, _ in rows],
+                    "user_ids": [user_id for user_id, _, _ in rows],
+                    "viewed_at": [viewed_at for _, _, viewed_at in rows],
+                })
+            if claimed:
+                db.execute(_PRUNE_BATCHES_SQL)
+            db.commit()
+        except Exception:
+            # 处理中的数据保留在 Redis，下一轮重试
+            db.rollback()
+            raise
+
+        # 清理失败时下一轮会取到同一批次，数据库中已有记录，只做清理
+        get_redis().eval(_FINISH_BATCH_SCRIPT, 1, FLUSHING_BATCH_KEY, batch_id)
+        if not claimed:
+            logger.info(f"⏭️  浏览缓冲批次已写入过，跳过 - 批次: {batch_id}")
+            return
+        TrendingService.mark_active(*counts)
+        CountService.invalidate(*[f"views:{user_id}" for user_id in user_ids])
+        logger.info(f"👀 浏览缓冲写入完成 - 批次: {batch_id}, 内容: {len(counts)}, 浏览历史: {len(history)}")
+
+    @staticmethod
+    def _take_pending():
+        """
+        取出待写入的批次：(批次 ID, 浏览量, 浏览历史)，没有数据时批次 ID 为 None
+
+        缓冲区原子地改名为带批次 ID 的处理中键，新的浏览写入新的缓冲区；
+        上一轮写库失败或进程退出时处理中的批次仍在，本轮优先重试该批次
+        """
+        redis_client = get_redis()
+        batch_id = redis_client.eval(
+            _TAKE_PENDING_SCRIPT, 5,
+            FLUSHING_BATCH_KEY, PENDING_COUNTS_KEY, PENDING_HISTORY_KEY,
+            _LEGACY_FLUSHING_COUNTS_KEY, _LEGACY_FLUSHING_HISTORY_KEY,
+            uuid.uuid4().hex,
+        )
+        if not batch_id:
+            return None, {}, {}
+        return (
+            batch_id,
+            redis_client.hgetall(_flushing_counts_key(batch_id)),
+            redis_client.hgetall(_flushing_history_key(batch_id)),
+        )
@@ -1,25 +1,50 @@
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from app.core.database import get_async_db
+from app.core.read_replica import SESSION_USER_KEY
 from app.models.user import User
-from app.utils.security import decode_token, is_token_valid
 from app.services.security_service import SecurityService
+from app.services.token_cache import auth_seconds, cached_claims, check_token, token_digest
+from app.services.user_cache import CachedUser, user_cache
 from typing import Optional
+import time
 
 security = HTTPBearer()
 
 
+async def _load_user(db: AsyncSession, user_id: str) -> Optional[CachedUser]:
+    """读取用户快照（优先本进程缓存，未命中时查库并写入缓存）"""
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return cached
+    user = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
+    if user is None:
+        return None
+    cached = CachedUser.from_user(user)
+    user_cache.put(user_id, cached)
+    return cached
+
+
 async def get_current_user(
     request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """获取当前登录用户"""
-    token = credentials.credentials
+    db: AsyncSession = Depends(get_async_db)
+) -> CachedUser:
+    """获取当前登录用户（返回用户快照，详细资料需从数据库读取）"""
+    started = time.perf_counter()
+    try:
+        return await _authenticate(request, credentials.credentials, db)
+    finally:
+        auth_seconds.observe(time.perf_counter() - started)
+
+
+async def _authenticate(request: Request, token: str, db: AsyncSession) -> CachedUser:
+    digest = token_digest(token)
     
-    # 解码 token
-    payload = decode_token(token)
+    # 解码 token（验签结果按 token 摘要缓存）
+    payload = cached_claims(token, digest)
     if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -46,15 +71,15 @@ async def get_current_user(
     ip_address = request.client.host if request.client else ""
     device_id = SecurityService.generate_device_id(user_agent, ip_address)
     
-    # 检查 Token 是否有效（Redis 中是否存在且匹配）
-    if not is_token_valid(user_id, device_id, token):
+    # 检查 Token 是否有效（Redis 中是否存在且匹配，短时间内复用本地结果）
+    if not await check_token(user_id, device_id, digest, token):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token 已失效，请重新登录"
         )
     
     # 查询用户
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await _load_user(db, user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -68,12 +93,14 @@ async def get_current_user(
             detail="账户已被禁用"
         )
     
+    # 标记会话所属用户，提交后该用户短时间内的读请求走主库
+    db.info[SESSION_USER_KEY] = user_id
     return user
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: CachedUser = Depends(get_current_user)
+) -> CachedUser:
     """获取当前激活的用户"""
     if not current_user.is_active:
         raise HTTPException(
@@ -85,9 +112,10 @@ async def get_current_active_user(
 
 async def get_optional_current_user(
     request: Request,
-    db: Session = Depends(get_db)
-) -> Optional[User]:
+    db: AsyncSession = Depends(get_async_db)
+) -> Optional[CachedUser]:
     """获取当前用户（可选，允许未登录）"""
+    started = time.perf_counter()
     try:
         # 尝试从 Authorization header 获取 token
         auth_header = request.headers.get("authorization")
@@ -95,9 +123,10 @@ async def get_optional_current_user(
             return None
         
         token = auth_header.replace("Bearer ", "")
+        digest = token_digest(token)
         
         # 解码 token
-        payload = decode_token(token)
+        payload = cached_claims(token, digest)
         if payload is None:
             return None
         
@@ -116,12 +145,17 @@ async def get_optional_current_user(
         device_id = SecurityService.generate_device_id(user_agent, ip_address)
         
         # 检查 Token 是否有效
-        if not is_token_valid(user_id, device_id, token):
+        if not await check_token(user_id, device_id, digest, token):
             return None
         
         # 查询用户
-        user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
+        user = await _load_user(db, user_id)
+        if user is None or not user.is_active:
+            return None
+        db.info[SESSION_USER_KEY] = user_id
         return user
     except Exception:
         return None
+    finally:
+        auth_seconds.observe(time.perf_counter() - started)
 
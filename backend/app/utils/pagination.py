@@ -0,0 +1,94 @@
+"""
+分页工具
+
+支持两种分页模式：
+- page/page_size：传统偏移分页，兼容已有前端
+- cursor：基于 (排序键, id) 的游标分页（keyset），深分页时性能不随页码下降；
+  排序键通常为 created_at，热门信息流为 hot_score
+"""
+from datetime import datetime
+from typing import Optional, Tuple, Union
+from uuid import UUID
+import base64
+import json
+
+from fastapi import HTTPException, status
+from sqlalchemy import DateTime, desc, literal, tuple_
+
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="无效的分页游标"
+    )
+
+
+def encode_cursor(sort_value: Union[datetime, float], item_id, sort_key: Optional[str] = None) -> str:
+    """将排序键编码为不透明游标（sort_key 为排序列名，用于校验游标与排序方式是否匹配）"""
+    if isinstance(sort_value, datetime):
+        payload = {"t": sort_value.isoformat(), "i": str(item_id)}
+    else:
+        payload = {"s": float(sort_value), "i": str(item_id)}
+    if sort_key:
+        payload["k"] = sort_key
+    raw = json.dumps(payload, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_key: Optional[str] = None) -> Tuple[Union[datetime, float], UUID]:
+    """解析游标，返回 (排序键, id)；传入 sort_key 时游标必须是按该列排序生成的"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        if sort_key and data.get("k", sort_key) != sort_key:
+            raise ValueError("sort key mismatch")
+        if "s" in data:
+            return float(data["s"]), UUID(data["i"])
+        return datetime.fromisoformat(data["t"]), UUID(data["i"])
+    except Exception:
+        raise _invalid_cursor()
+
+
+def apply_keyset(query, sort_col, id_col, cursor: Optional[str], ascending: bool = False):
+    """
+    按 (sort_col DESC, id DESC) 排序（ascending=True 时为升序），并在传入游标时只取游标之后的数据
+
+    行值比较 (created_at, id) < (:t, :i) 可以直接命中 (created_at, id) 复合索引
+    """
+    if cursor:
+        sort_value, item_id = decode_cursor(cursor, sort_col.key)
+        # 未带排序列名的旧游标按值类型校验（例如时间游标用于热度排序）
+        if isinstance(sort_value, datetime) != isinstance(sort_col.type, DateTime):
+            raise _invalid_cursor()
+        position = tuple_(sort_col, id_col)
+        boundary = tuple_(
+            literal(sort_value, sort_col.type),
+            literal(item_id, id_col.type),
+        )
+        query = query.filter(position > boundary if ascending else position < boundary)
+    if ascending:
+        return query.order_by(sort_col, id_col)
+    return query.order_by(desc(sort_col), desc(id_col))
+
+
+def fetch_page(query, page: int, page_size: int, cursor: Optional[str]):
+    """
+    获取一页数据，多取一条用于判断是否还有下一页
+
+    Returns:
+        (rows, has_more)
+    """
+    if not cursor:
+        query = query.offset((page - 1) * page_size)
+    rows = query.limit(page_size + 1).all()
+    return rows[:page_size], len(rows) > page_size
+
+
+def next_cursor_of(
+    rows, has_more: bool, key=lambda row: (row.created_at, row.id), sort_key: str = "created_at"
+) -> Optional[str]:
+    """根据本页最后一条数据生成下一页游标（sort_key 需与 apply_keyset 的排序列一致）"""
+    if not has_more or not rows:
+        return None
+    sort_value, item_id = key(rows[-1])
+    return encode_cursor(sort_value, item_id, sort_key)
@@ -43,13 +43,38 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
 
+def verify_legacy_password(plain_password: str, hashed_password: str) -> bool:
+    """验证旧格式的密码哈希（旧的截断方法：总是先做 SHA256）"""
+    password_bytes = plain_password.encode('utf-8')
+    if len(password_bytes) > 72:
+        # 超长密码新旧处理方式相同，已由 verify_password 校验过
+        return False
+    try:
+        old_password = base64.b64encode(hashlib.sha256(password_bytes).digest())
+        return bcrypt.checkpw(old_password, hashed_password.encode('utf-8'))
+    except Exception as e:
+        import logging
+        logger = logging.getLogger(__name__)
+        logger.warning(f"⚠️  密码兼容性验证失败: {str(e)}")
+        return False
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """哈希成本与当前配置（BCRYPT_ROUNDS）不一致时需要重新哈希"""
+    # bcrypt 哈希格式：$2b$<cost>$<salt+hash>
+    try:
+        return int(hashed_password.split('$')[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+
 def get_password_hash(password: str) -> str:
     """生成密码哈希"""
     try:
         # 先对密码进行截断处理，确保不超过 72 字节
         processed_password = _truncate_password(password)
         # 生成 salt 并哈希密码
-        salt = bcrypt.gensalt(rounds=12)
+        salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
         hashed = bcrypt.hashpw(processed_password, salt)
         # 返回字符串格式
         return hashed.decode('utf-8')
@@ -96,10 +121,18 @@ def decode_token(token: str) -> Optional[dict]:
         return None
 
 
-def store_token(user_id: str, device_id: str, token: str, expire_seconds: int = None):
+# Token 变更广播频道（消息为 user_id:device_id），各进程据此丢弃本地的有效性缓存
+TOKEN_REVOKE_CHANNEL = "auth:token_revoke"
+
+
+def token_slot(user_id: str, device_id: str) -> str:
+    return f"{user_id}:{device_id}"
+
+
+async def store_token(user_id: str, device_id: str, token: str, expire_seconds: int = None):
     """存储 Token 到 Redis"""
-    from app.core.redis import get_redis
-    redis_client = get_redis()
+    from app.core.redis import get_async_redis
+    redis_client = get_async_redis()
     
     # 使用 user_id:device_id 作为 key
     token_key = f"user_token:{user_id}:{device_id}"
@@ -108,30 +141,35 @@ def store_token(user_id: str, device_id: str, token: str, expire_seconds: int =
     if expire_seconds is None:
         expire_seconds = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
     
-    # 存储 token
-    redis_client.setex(token_key, expire_seconds, token)
+    # 存储 token 并广播变更（同一设备重新登录后旧 token 立即失效），一次往返
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.setex(token_key, expire_seconds, token)
+        pipe.publish(TOKEN_REVOKE_CHANNEL, token_slot(user_id, device_id))
+        await pipe.execute()
 
 
-def get_stored_token(user_id: str, device_id: str) -> Optional[str]:
+async def get_stored_token(user_id: str, device_id: str) -> Optional[str]:
     """从 Redis 获取存储的 Token"""
-    from app.core.redis import get_redis
-    redis_client = get_redis()
+    from app.core.redis import get_async_redis
+    redis_client = get_async_redis()
     
     token_key = f"user_token:{user_id}:{device_id}"
-    return redis_client.get(token_key)
+    return await redis_client.get(token_key)
 
 
-def remove_token(user_id: str, device_id: str):
+async def remove_token(user_id: str, device_id: str):
     """从 Redis 删除 Token（强制下线）"""
-    from app.core.redis import get_redis
-    redis_client = get_redis()
+    from app.core.redis import get_async_redis
+    redis_client = get_async_redis()
     
     token_key = f"user_token:{user_id}:{device_id}"
-    redis_client.delete(token_key)
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.delete(token_key)
+        pipe.publish(TOKEN_REVOKE_CHANNEL, token_slot(user_id, device_id))
+        await pipe.execute()
 
 
-def is_token_valid(user_id: str, device_id: str, token: str) -> bool:
+async def is_token_valid(user_id: str, device_id: str, token: str) -> bool:
     """验证 Token 是否有效（检查 Redis 中是否存在且匹配）"""
-    stored_token = get_stored_token(user_id, device_id)
+    stored_token = await get_stored_token(user_id, device_id)
     return stored_token is not None and stored_token == token
-
@@ -0,0 +1,90 @@
+"""
+搜索分词与高亮
+
+不依赖外部分词服务：
+- 中日韩文字按连续片段切分为二元组（bigram），单字片段保留单字
+- 英文/数字按单词切分并转为小写
+"""
+from collections import Counter
+from html import escape
+from typing import Dict, Iterable, List, Optional
+import re
+import unicodedata
+
+MAX_TERM_LENGTH = 32
+
+_CJK_RANGES = "㐀-䶿一-鿿豈-﫿぀-ヿ가-힯"
+_TOKEN_PATTERN = re.compile(f"[{_CJK_RANGES}]+|[a-z0-9]+")
+_CJK_PATTERN = re.compile(f"[{_CJK_RANGES}]")
+
+
+def normalize(text: str) -> str:
+    """全角转半角并转小写"""
+    return unicodedata.normalize("NFKC", text or "").lower()
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """将文本切分为词项列表（保留重复，用于统计词频）"""
+    tokens = []
+    for run in _TOKEN_PATTERN.findall(normalize(text)):
+        if _CJK_PATTERN.match(run):
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run[:MAX_TERM_LENGTH])
+    return tokens
+
+
+def weighted_term_frequencies(fields: Iterable[tuple]) -> Dict[str, float]:
+    """
+    计算多字段加权词频
+
+    Args:
+        fields: [(text, weight), ...]，例如标题权重 3、描述 2、正文 1
+    """
+    frequencies: Counter = Counter()
+    for text, weight in fields:
+        for token, count in Counter(tokenize(text)).items():
+            frequencies[token] += count * weight
+    return dict(frequencies)
+
+
+def highlight(text: Optional[str], terms: Iterable[str], window: int = 60) -> Optional[str]:
+    """
+    生成高亮摘要：截取首个命中词附近的片段，并用 <em> 包裹命中词
+
+    返回的片段已做 HTML 转义，可直接渲染
+    """
+    if not text:
+        return None
+    terms = sorted({t for t in terms if t}, key=len, reverse=True)
+    if not terms:
+        return None
+
+    lowered = normalize(text)
+    # NFKC 可能改变长度，长度不一致时无法按位置对应原文，直接在规范化文本上高亮
+    source = text if len(lowered) == len(text) else lowered
+
+    pattern = re.compile("|".join(re.escape(t) for t in terms))
+    first = pattern.search(lowered)
+    if first is None:
+        return None
+
+    start = max(0, first.start() - window // 3)
+    end = min(len(source), start + window)
+    fragment_lower = lowered[start:end]
+    fragment = source[start:end]
+
+    parts = []
+    last = 0
+    for match in pattern.finditer(fragment_lower):
+        parts.append(escape(fragment[last:match.start()]))
+        parts.append(f"<em>{escape(fragment[match.start():match.end()])}</em>")
+        last = match.end()
+    parts.append(escape(fragment[last:]))
+
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if end < len(source) else ""
+    return f"{prefix}{''.join(parts)}{suffix}"
@@ -1,40 +1,39 @@
 import random
-from app.core.redis import get_redis
+from app.core.redis import get_async_redis
 from app.core.config import settings
 
+# 比对成功时删除验证码，比对与删除在服务端原子完成（验证码只能使用一次）
+_verify_and_delete = get_async_redis().register_script("""
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    return 1
+end
+return 0
+""")
+
 
 def generate_code() -> str:
     """生成6位数字验证码"""
     return str(random.randint(100000, 999999))
 
 
-def save_code(email: str, code: str, code_type: str) -> None:
+async def save_code(email: str, code: str, code_type: str) -> None:
     """保存验证码到 Redis"""
-    redis_client = get_redis()
+    redis_client = get_async_redis()
     key = f"verify_code:{code_type}:{email}"
-    redis_client.setex(key, settings.CODE_EXPIRE_MINUTES * 60, code)
+    await redis_client.setex(key, settings.CODE_EXPIRE_MINUTES * 60, code)
 
 
-def verify_code(email: str, code: str, code_type: str) -> bool:
-    """验证验证码"""
-    redis_client = get_redis()
+async def verify_code(email: str, code: str, code_type: str) -> bool:
+    """验证验证码（一次往返完成比对与删除）"""
     key = f"verify_code:{code_type}:{email}"
-    saved_code = redis_client.get(key)
-    
-    if saved_code and saved_code == code:
-        redis_client.delete(key)
-        return True
-    return False
+    return bool(await _verify_and_delete(keys=[key], args=[code]))
 
 
-def check_code_rate_limit(email: str) -> bool:
+async def check_code_rate_limit(email: str) -> bool:
     """检查验证码发送频率限制"""
-    redis_client = get_redis()
+    redis_client = get_async_redis()
     key = f"code_rate_limit:{email}"
     
-    if redis_client.exists(key):
-        return False
-    
-    redis_client.setex(key, 60, "1")  # 60秒内只能发送一次
-    return True
-
+    # SET NX EX：不存在时写入并返回 True，60秒内只能发送一次
+    return bool(await redis_client.set(key, "1", nx=True, ex=60))
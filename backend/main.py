@@ -3,13 +3,24 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import engine, async_engine, Base
+from app.core.db_metrics import pool_status
+from app.core.read_replica import replicas, start_health_checks, stop_health_checks
+from app.core.invalidation import start_listener, stop_listener
+from app.core.redis import close_async_redis
+from app.core.rate_limit import RateLimitMiddleware
+from app.services.token_cache import auth_status
+from app.services.password_hasher import hasher_status, shutdown_hasher
+from app.core.tasks import register_task, start_tasks, stop_tasks
 from app.core.exceptions import (
     http_exception_handler,
     validation_exception_handler,
     general_exception_handler
 )
 from app.api.v1 import auth, content, upload, chunk_upload, tools
+from app.services.trending_service import TrendingService
+from app.services.view_tracker import ViewTracker
+from app.services.album_stats_service import AlbumStatsService
 import logging
 
 # 配置日志
@@ -146,6 +157,9 @@ app.add_exception_handler(StarletteHTTPException, http_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.add_exception_handler(Exception, general_exception_handler)
 
+# 限流（先注册，位于 CORS 内层，被拒绝的响应同样带 CORS 头）
+app.add_middleware(RateLimitMiddleware)
+
 # CORS 配置
 app.add_middleware(
     CORSMiddleware,
@@ -164,6 +178,34 @@ app.include_router(chunk_upload.router, prefix="/api/v1/upload", tags=["切片
 app.include_router(tools.router, prefix="/api/v1/tools", tags=["生活小工具"])
 
 
+# 后台周期任务
+register_task("trending_refresh", settings.TRENDING_REFRESH_SECONDS, lambda db: TrendingService(db).refresh())
+register_task("view_flush", settings.VIEW_FLUSH_SECONDS, ViewTracker.flush)
+register_task(
+    "album_stats_reconcile", settings.ALBUM_STATS_RECONCILE_SECONDS, lambda db: AlbumStatsService(db).rebuild()
+)
+
+
+@app.on_event("startup")
+def on_startup():
+    start_tasks()
+    start_health_checks()
+    start_listener()
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    stop_tasks()
+    stop_health_checks()
+    stop_listener()
+    shutdown_hasher()
+
+
+@app.on_event("shutdown")
+async def close_connections():
+    await close_async_redis()
+
+
 @app.get(
     "/",
     tags=["系统"],
@@ -223,6 +265,51 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get(
+    "/health/db",
+    tags=["系统"],
+    summary="数据库连接池状态",
+    description="查看本进程各数据库连接池的占用、排队与取连接等待耗时",
+    response_description="返回各连接池的指标快照"
+)
+async def db_pool_status():
+    """
+    ## 数据库连接池指标
+    
+    **返回（每个连接池一项）：**
+    - `checked_out`: 已借出的连接数
+    - `waiting`: 正在等待空闲连接的请求数
+    - `timeouts`: 等待超时次数
+    - `wait_seconds`: 取连接等待耗时直方图（累计分桶）
+    
+    `replicas` 为各只读副本最近一次健康检查的结果。
+    """
+    return {
+        "pools": pool_status(engine, async_engine.sync_engine, *(replica.sync_engine for replica in replicas.engines)),
+        "replicas": [
+            {"name": f"replica-{index}", "healthy": healthy} for index, healthy in enumerate(replicas.healthy)
+        ],
+    }
+
+
+@app.get(
+    "/health/auth",
+    tags=["系统"],
+    summary="认证耗时",
+    description="查看本进程认证依赖的耗时分布、缓存命中情况与密码哈希线程池指标",
+    response_description="返回认证指标快照"
+)
+async def auth_metrics():
+    """
+    ## 认证指标
+    
+    - `auth_seconds`: 每次认证（验签、Token 校验、读取用户）的耗时直方图（累计分桶）
+    - `counters`: 声明缓存与有效性缓存的命中/未命中次数
+    - `password_hashing`: 密码哈希线程池的排队等待与计算耗时直方图、当前任务数、拒绝/升级次数
+    """
+    return {**auth_status(), "password_hashing": hasher_status()}
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
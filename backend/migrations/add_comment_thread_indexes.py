@@ -0,0 +1,49 @@
+"""
+评论树索引
+
+评论列表改为整页批量加载回复预览（窗口函数按 parent_id 分区）、回复数（GROUP BY parent_id），
+回复列表改为 (created_at, id) 游标分页，这些查询都依赖以下索引：
+- idx_comments_content_top_created_at_id：内容的顶级评论（部分索引，只含 parent_id IS NULL）
+- idx_comments_parent_created_at_id：按父评论取回复
+
+运行方式:
+python migrations/add_comment_thread_indexes.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from app.core.config import settings
+
+INDEXES = {
+    "idx_comments_content_top_created_at_id": "comments (content_id, created_at, id) WHERE parent_id IS NULL",
+    "idx_comments_parent_created_at_id": "comments (parent_id, created_at, id)",
+}
+
+
+def upgrade():
+    """创建评论索引"""
+    # CREATE INDEX CONCURRENTLY 不能在事务中执行
+    engine = create_engine(settings.DATABASE_URL, isolation_level="AUTOCOMMIT")
+
+    with engine.connect() as conn:
+        for name, target in INDEXES.items():
+            conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {target}"))
+            print(f"✅ 索引 {name} 创建成功")
+
+
+def downgrade():
+    """删除评论索引"""
+    engine = create_engine(settings.DATABASE_URL, isolation_level="AUTOCOMMIT")
+
+    with engine.connect() as conn:
+        for name in INDEXES:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+            print(f"✅ 索引 {name} 已删除")
+
+
+if __name__ == "__main__":
+    print("🔄 开始迁移...")
+    upgrade()
+    print("✅ 迁移完成（重启服务后生效）")
@@ -0,0 +1,101 @@
+"""
+评论物化路径
+
+1. comments 表新增 root_id / path / depth / descendant_count 列（path 使用 "C" 排序规则）
+2. 用递归 CTE 为历史评论回填路径与层级（已有路径的评论保持不变）
+3. 按路径前缀重算子树评论数
+4. 创建 (root_id, path) 索引，子树查询为一次索引范围扫描
+
+路径片段格式与 app/services/comment_thread.py 中的 path_segment 一致。
+可重复执行；新评论由 create_comment 维护。
+
+运行方式:
+python migrations/add_comment_thread_path.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from app.core.config import settings
+
+# 13 位十六进制微秒时间戳 + 6 位 ID 前缀
+_SEGMENT_SQL = """
+    lpad(to_hex((extract(epoch FROM COALESCE({t}.created_at, 'epoch')) * 1000000)::bigint), 13, '0')
+    || substr(replace({t}.id::text, '-', ''), 1, 6)
+"""
+
+_BACKFILL_SQL = f"""
+    WITH RECURSIVE tree AS (
+        SELECT c.id, c.id AS root_id, 0 AS depth,
+               COALESCE(c.path, {_SEGMENT_SQL.format(t="c")}) COLLATE "C" AS path
+        FROM comments c
+        WHERE c.parent_id IS NULL
+        UNION ALL
+        SELECT c.id, t.root_id, t.depth + 1,
+               COALESCE(c.path, t.path || '/' || {_SEGMENT_SQL.format(t="c")}) COLLATE "C"
+        FROM comments c
+        JOIN tree t ON c.parent_id = t.id
+    )
+    UPDATE comments
+    SET root_id = tree.root_id, depth = tree.depth, path = tree.path
+    FROM tree
+    WHERE comments.id = tree.id AND comments.path IS NULL
+"""
+
+_DESCENDANTS_SQL = """
+    UPDATE comments a
+    SET descendant_count = COALESCE(d.cnt, 0)
+    FROM comments a2
+    LEFT JOIN (
+        SELECT anc.id, count(*) AS cnt
+        FROM comments anc
+        JOIN comments des
+          ON des.root_id = anc.root_id
+         AND des.path > anc.path || '/'
+         AND des.path < anc.path || '0'
+        GROUP BY anc.id
+    ) d ON d.id = a2.id
+    WHERE a.id = a2.id AND a.descendant_count IS DISTINCT FROM COALESCE(d.cnt, 0)
+"""
+
+
+def upgrade():
+    """添加路径列、回填并创建索引"""
+    # CREATE INDEX CONCURRENTLY 不能在事务中执行
+    engine = create_engine(settings.DATABASE_URL, isolation_level="AUTOCOMMIT")
+
+    with engine.connect() as conn:
+        conn.execute(text("ALTER TABLE comments ADD COLUMN IF NOT EXISTS root_id UUID"))
+        conn.execute(text('ALTER TABLE comments ADD COLUMN IF NOT EXISTS path TEXT COLLATE "C"'))
+        conn.execute(text("ALTER TABLE comments ADD COLUMN IF NOT EXISTS depth INTEGER NOT NULL DEFAULT 0"))
+        conn.execute(text("ALTER TABLE comments ADD COLUMN IF NOT EXISTS descendant_count INTEGER NOT NULL DEFAULT 0"))
+        print("✅ root_id / path / depth / descendant_count 列添加成功")
+
+        result = conn.execute(text(_BACKFILL_SQL))
+        print(f"✅ 回填评论路径 {result.rowcount} 条")
+
+        conn.execute(text(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_comments_root_path ON comments (root_id, path)"
+        ))
+        print("✅ 索引 idx_comments_root_path 创建成功")
+
+        result = conn.execute(text(_DESCENDANTS_SQL))
+        print(f"✅ 子树评论数校正 {result.rowcount} 条")
+
+
+def downgrade():
+    """删除路径列与索引"""
+    engine = create_engine(settings.DATABASE_URL, isolation_level="AUTOCOMMIT")
+
+    with engine.connect() as conn:
+        conn.execute(text("DROP INDEX CONCURRENTLY IF EXISTS idx_comments_root_path"))
+        for column in ("descendant_count", "depth", "path", "root_id"):
+            conn.execute(text(f"ALTER TABLE comments DROP COLUMN IF EXISTS {column}"))
+        print("✅ 评论路径列与索引已删除")
+
+
+if __name__ == "__main__":
+    print("🔄 开始迁移...")
+    upgrade()
+    print("✅ 迁移完成（重启服务后生效）")
@@ -0,0 +1,51 @@
+"""
+添加内容游标分页索引
+
+列表/探索/搜索接口按 (created_at DESC, id DESC) 排序并使用游标定位，
+以下复合索引保证深分页时仍为索引范围扫描。
+
+运行方式:
+python migrations/add_content_cursor_indexes.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from app.core.config import settings
+
+INDEXES = {
+    "idx_contents_created_at_id": "contents(created_at, id)",
+    "idx_contents_public_type_created_at_id": "contents(is_public, type, created_at, id)",
+    "idx_contents_public_created_at_id": "contents(is_public, created_at, id)",
+    "idx_contents_user_created_at_id": "contents(user_id, created_at, id)",
+}
+
+
+def upgrade():
+    """创建游标分页索引"""
+    engine = create_engine(settings.DATABASE_URL)
+    
+    with engine.connect() as conn:
+        for name, target in INDEXES.items():
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {target}"))
+            print(f"✅ 索引 {name} 创建成功")
+        
+        conn.commit()
+
+
+def downgrade():
+    """删除游标分页索引"""
+    engine = create_engine(settings.DATABASE_URL)
+    
+    with engine.connect() as conn:
+        for name in INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        conn.commit()
+        print("✅ 游标分页索引删除成功")
+
+
+if __name__ == "__main__":
+    print("🔄 开始迁移...")
+    upgrade()
+    print("✅ 迁移完成")
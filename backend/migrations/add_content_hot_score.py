@@ -0,0 +1,59 @@
+"""
+添加内容热度分
+
+1. contents 表新增 hot_score 列
+2. 创建 (is_public, hot_score, id) 复合索引，热门信息流按索引范围读取
+3. 按当前互动数据回填全部内容的热度分
+
+之后由后台任务 trending_refresh 增量刷新。
+
+运行方式:
+python migrations/add_content_hot_score.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.trending_service import TrendingService
+
+
+def upgrade():
+    """添加热度分列与索引并回填"""
+    # CREATE INDEX CONCURRENTLY 不能在事务中执行
+    engine = create_engine(settings.DATABASE_URL, isolation_level="AUTOCOMMIT")
+
+    with engine.connect() as conn:
+        conn.execute(text("ALTER TABLE contents ADD COLUMN IF NOT EXISTS hot_score DOUBLE PRECISION NOT NULL DEFAULT 0"))
+        print("✅ hot_score 列添加成功")
+
+        conn.execute(text(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contents_public_hot_score_id "
+            "ON contents (is_public, hot_score, id)"
+        ))
+        print("✅ 索引 idx_contents_public_hot_score_id 创建成功")
+
+    db = SessionLocal()
+    try:
+        total = TrendingService(db).backfill()
+        print(f"✅ 热度分回填完成，共 {total} 条内容")
+    finally:
+        db.close()
+
+
+def downgrade():
+    """删除热度分列与索引"""
+    engine = create_engine(settings.DATABASE_URL, isolation_level="AUTOCOMMIT")
+
+    with engine.connect() as conn:
+        conn.execute(text("DROP INDEX CONCURRENTLY IF EXISTS idx_contents_public_hot_score_id"))
+        conn.execute(text("ALTER TABLE contents DROP COLUMN IF EXISTS hot_score"))
+        print("✅ hot_score 列与索引已删除")
+
+
+if __name__ == "__main__":
+    print("🔄 开始迁移...")
+    upgrade()
+    print("✅ 迁移完成（重启服务后生效）")
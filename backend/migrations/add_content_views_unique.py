@@ -0,0 +1,79 @@
+"""
+浏览记录唯一约束
+
+浏览缓冲落库使用 INSERT ... ON CONFLICT (content_id, user_id)，需要该组合上有唯一索引。
+由 create_all 建出的 content_views 表没有唯一约束，这里先清理重复记录（保留最后浏览的一条），
+再创建唯一索引；同时创建 (user_id, updated_at) 索引用于浏览历史列表。
+
+运行方式:
+python migrations/add_content_views_unique.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from app.core.config import settings
+
+_HAS_UNIQUE_SQL = text("""
+    SELECT EXISTS (
+        SELECT 1
+        FROM pg_index i
+        JOIN pg_class t ON t.oid = i.indrelid
+        WHERE t.relname = 'content_views'
+          AND i.indisunique
+          AND (
+              SELECT array_agg(a.attname::text ORDER BY a.attname)
+              FROM pg_attribute a
+              WHERE a.attrelid = t.oid AND a.attnum = ANY(i.indkey)
+          ) = ARRAY['content_id', 'user_id']
+    )
+""")
+
+
+def upgrade():
+    """清理重复记录并创建索引"""
+    # CREATE INDEX CONCURRENTLY 不能在事务中执行
+    engine = create_engine(settings.DATABASE_URL, isolation_level="AUTOCOMMIT")
+
+    with engine.connect() as conn:
+        if conn.execute(_HAS_UNIQUE_SQL).scalar():
+            print("⏭️  content_views 已存在 (content_id, user_id) 唯一约束")
+        else:
+            result = conn.execute(text("""
+                DELETE FROM content_views v
+                USING content_views newer
+                WHERE v.content_id = newer.content_id
+                  AND v.user_id = newer.user_id
+                  AND (COALESCE(v.updated_at, v.created_at, 'epoch'), v.id)
+                    < (COALESCE(newer.updated_at, newer.created_at, 'epoch'), newer.id)
+            """))
+            print(f"✅ 清理重复浏览记录 {result.rowcount} 条")
+
+            conn.execute(text(
+                "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_content_views_content_user "
+                "ON content_views (content_id, user_id)"
+            ))
+            print("✅ 唯一索引 uq_content_views_content_user 创建成功")
+
+        conn.execute(text(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_content_views_user_updated_at "
+            "ON content_views (user_id, updated_at)"
+        ))
+        print("✅ 索引 idx_content_views_user_updated_at 创建成功")
+
+
+def downgrade():
+    """删除索引"""
+    engine = create_engine(settings.DATABASE_URL, isolation_level="AUTOCOMMIT")
+
+    with engine.connect() as conn:
+        conn.execute(text("DROP INDEX CONCURRENTLY IF EXISTS idx_content_views_user_updated_at"))
+        conn.execute(text("DROP INDEX CONCURRENTLY IF EXISTS uq_content_views_content_user"))
+        print("✅ 索引删除成功")
+
+
+if __name__ == "__main__":
+    print("🔄 开始迁移...")
+    upgrade()
+    print("✅ 迁移完成（重启服务后生效）")
@@ -0,0 +1,94 @@
+"""
+点赞/收藏唯一约束与计数校正
+
+点赞、收藏、评论点赞的切换改为 INSERT ... ON CONFLICT / DELETE ... RETURNING，
+需要 (目标ID, user_id) 上的唯一索引。此前的"先查后写"在并发下可能产生重复记录、
+计数也可能丢失更新，因此：
+1. 清理重复记录（保留最早的一条）
+2. 创建唯一索引（CONCURRENTLY，不阻塞线上读写）
+3. 按实际记录数重算 like_count / save_count
+
+运行方式:
+python migrations/add_interaction_unique.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from app.core.config import settings
+
+# 关联表 -> (目标列, 唯一索引名, 目标表, 计数列)
+TABLES = {
+    "content_likes": ("content_id", "uq_content_likes_content_user", "contents", "like_count"),
+    "content_saves": ("content_id", "uq_content_saves_content_user", "contents", "save_count"),
+    "comment_likes": ("comment_id", "uq_comment_likes_comment_user", "comments", "like_count"),
+}
+
+_HAS_UNIQUE_SQL = """
+    SELECT EXISTS (
+        SELECT 1
+        FROM pg_index i
+        JOIN pg_class t ON t.oid = i.indrelid
+        WHERE t.relname = :table
+          AND i.indisunique
+          AND (
+              SELECT array_agg(a.attname::text ORDER BY a.attname)
+              FROM pg_attribute a
+              WHERE a.attrelid = t.oid AND a.attnum = ANY(i.indkey)
+          ) = CAST(:columns AS text[])
+    )
+"""
+
+
+def upgrade():
+    """清理重复记录、创建唯一索引并重算计数"""
+    # CREATE INDEX CONCURRENTLY 不能在事务中执行
+    engine = create_engine(settings.DATABASE_URL, isolation_level="AUTOCOMMIT")
+
+    with engine.connect() as conn:
+        for table, (column, index_name, target_table, count_column) in TABLES.items():
+            columns = sorted([column, "user_id"])
+            if conn.execute(text(_HAS_UNIQUE_SQL), {"table": table, "columns": columns}).scalar():
+                print(f"⏭️  {table} 已存在 ({column}, user_id) 唯一约束")
+            else:
+                result = conn.execute(text(f"""
+                    DELETE FROM {table} t
+                    USING {table} older
+                    WHERE t.{column} = older.{column}
+                      AND t.user_id = older.user_id
+                      AND (COALESCE(t.created_at, 'epoch'), t.id) > (COALESCE(older.created_at, 'epoch'), older.id)
+                """))
+                print(f"✅ {table} 清理重复记录 {result.rowcount} 条")
+
+                conn.execute(text(
+                    f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON {table} ({column}, user_id)"
+                ))
+                print(f"✅ 唯一索引 {index_name} 创建成功")
+
+            result = conn.execute(text(f"""
+                UPDATE {target_table} t
+                SET {count_column} = COALESCE(c.cnt, 0)
+                FROM {target_table} t2
+                LEFT JOIN (
+                    SELECT {column} AS target_id, count(*) AS cnt FROM {table} GROUP BY {column}
+                ) c ON c.target_id = t2.id
+                WHERE t.id = t2.id AND t.{count_column} IS DISTINCT FROM COALESCE(c.cnt, 0)
+            """))
+            print(f"✅ {target_table}.{count_column} 校正 {result.rowcount} 行")
+
+
+def downgrade():
+    """删除唯一索引"""
+    engine = create_engine(settings.DATABASE_URL, isolation_level="AUTOCOMMIT")
+
+    with engine.connect() as conn:
+        for _, index_name, _, _ in TABLES.values():
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"))
+        print("✅ 唯一索引删除成功")
+
+
+if __name__ == "__main__":
+    print("🔄 开始迁移...")
+    upgrade()
+    print("✅ 迁移完成（重启服务后生效）")
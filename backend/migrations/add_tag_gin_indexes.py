@@ -0,0 +1,68 @@
+"""
+标签 GIN 索引
+
+1. 将 todos / expenses / notes 的 tags 从 JSON 转为 JSONB（JSON 类型不支持 GIN 索引）
+2. 为 contents.tags 与上述三张表的 tags 建立 GIN 索引，使任一/全部标签筛选不再顺序扫描
+
+类型转换会短暂锁表；索引使用 CONCURRENTLY 创建，不阻塞线上读写。
+
+运行方式:
+python migrations/add_tag_gin_indexes.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from app.core.config import settings
+
+JSONB_TABLES = ["todos", "expenses", "notes"]
+
+INDEXES = {
+    "idx_contents_tags_gin": "contents USING gin (tags)",
+    "idx_todos_tags_gin": "todos USING gin (tags)",
+    "idx_expenses_tags_gin": "expenses USING gin (tags)",
+    "idx_notes_tags_gin": "notes USING gin (tags)",
+}
+
+
+def upgrade():
+    """转换列类型并创建 GIN 索引"""
+    # CREATE INDEX CONCURRENTLY 不能在事务中执行
+    engine = create_engine(settings.DATABASE_URL, isolation_level="AUTOCOMMIT")
+
+    with engine.connect() as conn:
+        for table in JSONB_TABLES:
+            data_type = conn.execute(text("""
+                SELECT data_type FROM information_schema.columns
+                WHERE table_name = :table AND column_name = 'tags'
+            """), {"table": table}).scalar()
+            if data_type == "json":
+                conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN tags TYPE jsonb USING tags::jsonb"))
+                print(f"✅ {table}.tags 已转换为 JSONB")
+            else:
+                print(f"⏭️  {table}.tags 当前类型为 {data_type}，跳过转换")
+
+        for name, target in INDEXES.items():
+            conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {target}"))
+            print(f"✅ 索引 {name} 创建成功")
+
+
+def downgrade():
+    """删除 GIN 索引并还原为 JSON"""
+    engine = create_engine(settings.DATABASE_URL, isolation_level="AUTOCOMMIT")
+
+    with engine.connect() as conn:
+        for name in INDEXES:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+            print(f"✅ 索引 {name} 已删除")
+
+        for table in JSONB_TABLES:
+            conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN tags TYPE json USING tags::json"))
+            print(f"✅ {table}.tags 已还原为 JSON")
+
+
+if __name__ == "__main__":
+    print("开始创建标签 GIN 索引...")
+    upgrade()
+    print("✅ 迁移完成！")
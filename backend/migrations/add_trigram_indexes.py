@@ -0,0 +1,47 @@
+"""
+添加 pg_trgm 三元组索引
+
+为 contents.title / contents.description / contents.content / users.username / users.email 建立
+gin_trgm_ops 索引，使 ILIKE '%kw%' 子串匹配走索引，并支持 similarity() 相似度排序。
+索引使用 CONCURRENTLY 创建，不阻塞线上读写。
+
+运行方式:
+python migrations/add_trigram_indexes.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from app.core.config import settings
+from app.services.trigram_search import TRIGRAM_INDEXES
+
+
+def upgrade():
+    """创建 pg_trgm 扩展和三元组索引"""
+    # CREATE INDEX CONCURRENTLY 不能在事务中执行
+    engine = create_engine(settings.DATABASE_URL, isolation_level="AUTOCOMMIT")
+    
+    with engine.connect() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        print("✅ pg_trgm 扩展已启用")
+        
+        for name, target in TRIGRAM_INDEXES.items():
+            conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {target}"))
+            print(f"✅ 索引 {name} 创建成功")
+
+
+def downgrade():
+    """删除三元组索引"""
+    engine = create_engine(settings.DATABASE_URL, isolation_level="AUTOCOMMIT")
+    
+    with engine.connect() as conn:
+        for name in TRIGRAM_INDEXES:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+        print("✅ 三元组索引删除成功")
+
+
+if __name__ == "__main__":
+    print("🔄 开始迁移...")
+    upgrade()
+    print("✅ 迁移完成（运行中的服务约 1 分钟内生效）")
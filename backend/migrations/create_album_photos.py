@@ -0,0 +1,59 @@
+"""
+创建相册照片表并回填
+
+1. 创建 album_photos 表（(content_id, position) 唯一，用于照片分页）
+2. 按 contents.images 的顺序为已有相册回填照片行（已有照片行的相册跳过）
+3. 回填 extra_data.photo_count
+
+之后由创建/更新相册时自动维护。可重复执行。
+
+运行方式:
+python migrations/create_album_photos.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.core.database import engine, Base
+from app.models.content import AlbumPhoto
+
+
+def upgrade():
+    """创建照片表并回填"""
+    Base.metadata.create_all(bind=engine, tables=[AlbumPhoto.__table__])
+    print("✅ album_photos 表创建成功")
+
+    with engine.begin() as conn:
+        result = conn.execute(text("""
+            INSERT INTO album_photos (id, content_id, position, object_key, created_at)
+            SELECT gen_random_uuid(), c.id, p.ordinality - 1, p.url, now() AT TIME ZONE 'utc'
+            FROM contents c
+            CROSS JOIN LATERAL unnest(c.images) WITH ORDINALITY AS p(url, ordinality)
+            WHERE lower(c.type::text) = 'album'
+              AND NOT EXISTS (SELECT 1 FROM album_photos ap WHERE ap.content_id = c.id)
+        """))
+        print(f"✅ 回填照片 {result.rowcount} 张")
+
+        result = conn.execute(text("""
+            UPDATE contents
+            SET extra_data = jsonb_set(
+                COALESCE(extra_data::jsonb, '{}'::jsonb),
+                '{photo_count}',
+                to_jsonb(COALESCE(cardinality(images), 0))
+            )::json
+            WHERE lower(type::text) = 'album'
+        """))
+        print(f"✅ 更新 extra_data.photo_count {result.rowcount} 个相册")
+
+
+def downgrade():
+    """删除照片表"""
+    AlbumPhoto.__table__.drop(bind=engine, checkfirst=True)
+    print("✅ album_photos 表已删除")
+
+
+if __name__ == "__main__":
+    print("🔄 开始迁移...")
+    upgrade()
+    print("✅ 迁移完成（重启服务后生效）")
@@ -0,0 +1,42 @@
+"""
+创建相册统计汇总表并回填
+
+album_stats 按 (scope, dimension, bucket) 保存相册数与照片数，统计接口只读该表。
+之后由内容写操作在同一事务内增量维护，后台任务 album_stats_reconcile 定期重建。
+可重复执行（回填会整体重建）。
+
+运行方式:
+python migrations/create_album_stats.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import engine, Base, SessionLocal
+from app.models.album_stats import AlbumStat
+from app.services.album_stats_service import AlbumStatsService
+
+
+def upgrade():
+    """创建汇总表并按现有相册回填"""
+    Base.metadata.create_all(bind=engine, tables=[AlbumStat.__table__])
+    print("✅ album_stats 表创建成功")
+
+    db = SessionLocal()
+    try:
+        total = AlbumStatsService(db).rebuild()
+        print(f"✅ 相册统计回填完成，共 {total} 个分桶")
+    finally:
+        db.close()
+
+
+def downgrade():
+    """删除汇总表"""
+    AlbumStat.__table__.drop(bind=engine, checkfirst=True)
+    print("✅ album_stats 表已删除")
+
+
+if __name__ == "__main__":
+    print("🔄 开始迁移...")
+    upgrade()
+    print("✅ 迁移完成（重启服务后生效）")
@@ -0,0 +1,64 @@
+"""
+创建全文搜索索引表并回填已有公开内容
+
+运行方式:
+python migrations/create_search_index.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import engine, Base, SessionLocal
+from app.models.content import Content
+from app.models.search import SearchDocument, SearchTerm, SearchPosting, SearchStats
+from app.services.search_service import SearchService
+from app.utils.pagination import apply_keyset, next_cursor_of
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+
+def create_search_tables():
+    """创建搜索索引表"""
+    Base.metadata.create_all(bind=engine, tables=[
+        SearchDocument.__table__,
+        SearchTerm.__table__,
+        SearchPosting.__table__,
+        SearchStats.__table__,
+    ])
+    logger.info("✅ 搜索索引表创建成功")
+
+
+def backfill():
+    """按批次为已有公开内容建立索引（可重复执行）"""
+    db = SessionLocal()
+    try:
+        service = SearchService(db)
+        cursor = None
+        indexed = 0
+        while True:
+            query = db.query(Content).filter(Content.is_public == True)
+            batch = apply_keyset(query, Content.created_at, Content.id, cursor).limit(BATCH_SIZE).all()
+            if not batch:
+                break
+            for content in batch:
+                service.index_content(content)
+            db.commit()
+            indexed += len(batch)
+            logger.info(f"📚 已索引 {indexed} 条内容")
+            cursor = next_cursor_of(batch, True)
+        logger.info(f"✅ 回填完成，共索引 {indexed} 条内容")
+    except Exception as e:
+        logger.error(f"❌ 回填失败: {str(e)}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    create_search_tables()
+    backfill()
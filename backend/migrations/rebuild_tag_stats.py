@@ -0,0 +1,32 @@
+"""
+重建热门标签统计
+
+从 contents 表按 SQL 聚合重新生成 Redis 中的标签计数（全部时间、按天/按小时分桶）。
+上线增量计数前、或 Redis 数据丢失后执行一次；运行中的服务在计数缺失时也会自动重建。
+
+运行方式:
+python migrations/rebuild_tag_stats.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+from app.services.tag_stats_service import TagStatsService
+
+
+def upgrade():
+    """重建标签统计"""
+    db = SessionLocal()
+    try:
+        service = TagStatsService(db)
+        service.rebuild()
+        top = service.top_tags(10)
+        print(f"✅ 标签统计重建完成，当前前 10: {', '.join(t['name'] for t in top) or '无'}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    print("开始重建标签统计...")
+    upgrade()
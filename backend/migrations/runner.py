@@ -0,0 +1,326 @@
+"""
+版本化迁移执行器
+
+migrations/versions/ 下按 <版本号>_<名称>.py 命名的迁移按版本号顺序执行，
+已执行的版本记录在 schema_migrations 表中，重复运行只会执行尚未应用的迁移。
+
+迁移模块约定：
+- DESCRIPTION：迁移说明
+- TRANSACTIONAL：是否在事务中执行（CREATE INDEX CONCURRENTLY 必须为 False）
+- upgrade(ctx) / downgrade(ctx)：ctx 为 MigrationContext
+- PLAN_QUERIES（可选）：{名称: SQL}，upgrade --report 时对比迁移前后的执行计划
+
+多个实例同时部署时通过 advisory lock 保证只有一个执行器在运行。
+早期的单文件脚本（migrations/*.py）仍可单独执行，不受执行器管理。
+
+运行方式:
+python migrations/runner.py status
+python migrations/runner.py upgrade [--report] [--analyze]
+python migrations/runner.py downgrade <版本号>
+python migrations/runner.py report <版本号> [--analyze]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataclasses import dataclass
+from datetime import datetime
+from types import ModuleType
+from typing import Dict, List, Optional
+import argparse
+import importlib.util
+import json
+import re
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection
+from app.core.config import settings
+
+VERSIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "versions")
+REPORTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reports")
+
+# advisory lock 的键（任意固定值，避免多个执行器同时运行）
+_LOCK_KEY = 72_0001
+
+_VERSION_FILE = re.compile(r"^(\d{4})_(\w+)\.py$")
+
+_CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version VARCHAR(16) PRIMARY KEY,
+        name VARCHAR(200) NOT NULL,
+        applied_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc'),
+        duration_ms INTEGER
+    )
+"""
+
+_INDEX_STATE_SQL = """
+    SELECT i.indisvalid
+    FROM pg_class c
+    JOIN pg_index i ON i.indexrelid = c.oid
+    WHERE c.relname = :name AND c.relkind = 'i'
+"""
+
+
+@dataclass
+class Migration:
+    version: str
+    name: str
+    module: ModuleType
+
+    @property
+    def description(self) -> str:
+        return getattr(self.module, "DESCRIPTION", self.name)
+
+    @property
+    def transactional(self) -> bool:
+        return getattr(self.module, "TRANSACTIONAL", True)
+
+    @property
+    def plan_queries(self) -> Dict[str, str]:
+        return getattr(self.module, "PLAN_QUERIES", {})
+
+
+class MigrationContext:
+    """迁移执行上下文，提供建/删索引等常用操作"""
+
+    def __init__(self, conn: Connection, transactional: bool):
+        self.conn = conn
+        self.transactional = transactional
+
+    def execute(self, sql: str, params: Optional[dict] = None):
+        return self.conn.execute(text(sql), params or {})
+
+    def index_state(self, name: str) -> Optional[bool]:
+        """索引状态：None 为不存在，False 为 CONCURRENTLY 失败遗留的无效索引"""
+        return self.conn.execute(text(_INDEX_STATE_SQL), {"name": name}).scalar()
+
+    def create_index(self, name: str, target: str, unique: bool = False) -> None:
+        """
+        创建索引（非事务迁移中使用 CONCURRENTLY，不阻塞线上读写）
+
+        已存在的有效索引直接跳过；上次中断遗留的无效索引先删除再重建。
+        """
+        state = self.index_state(name)
+        if state:
+            print(f"⏭️  索引 {name} 已存在")
+            return
+        concurrently = "" if self.transactional else " CONCURRENTLY"
+        if state is False:
+            print(f"🔄 删除无效索引 {name}")
+            self.execute(f"DROP INDEX{concurrently} IF EXISTS {name}")
+
+        started = time.perf_counter()
+        unique_sql = " UNIQUE" if unique else ""
+        try:
+            self.execute(f"CREATE{unique_sql} INDEX{concurrently} {name} ON {target}")
+        except Exception:
+            # CONCURRENTLY 失败会留下无效索引，清理后再抛出，下次可直接重试
+            if not self.transactional and self.index_state(name) is False:
+                self.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+            raise
+        print(f"✅ 索引 {name} 创建成功（{time.perf_counter() - started:.1f}s）")
+
+    def drop_index(self, name: str) -> None:
+        concurrently = "" if self.transactional else " CONCURRENTLY"
+        self.execute(f"DROP INDEX{concurrently} IF EXISTS {name}")
+        print(f"✅ 索引 {name} 已删除")
+
+
+def discover() -> List[Migration]:
+    """按版本号读取全部迁移"""
+    migrations = []
+    for filename in sorted(os.listdir(VERSIONS_DIR)):
+        match = _VERSION_FILE.match(filename)
+        if not match:
+            continue
+        spec = importlib.util.spec_from_file_location(
+            f"migrations.versions.v{match.group(1)}", os.path.join(VERSIONS_DIR, filename)
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        migrations.append(Migration(version=match.group(1), name=match.group(2), module=module))
+    return migrations
+
+
+def _engine():
+    # 执行器自行管理事务：CONCURRENTLY 必须在事务外执行
+    return create_engine(settings.DATABASE_URL, isolation_level="AUTOCOMMIT")
+
+
+def _prepare(conn: Connection) -> None:
+    if not conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": _LOCK_KEY}).scalar():
+        raise RuntimeError("已有迁移执行器在运行")
+    # 建索引耗时可能很长，不受应用的语句超时限制；等锁超时则失败退出，避免阻塞线上写入
+    conn.execute(text("SET statement_timeout = 0"))
+    conn.execute(text("SET lock_timeout = '10s'"))
+    conn.execute(text(_CREATE_TABLE_SQL))
+
+
+def applied_versions(conn: Connection) -> Dict[str, datetime]:
+    rows = conn.execute(text("SELECT version, applied_at FROM schema_migrations")).all()
+    return {row.version: row.applied_at for row in rows}
+
+
+def explain(conn: Connection, queries: Dict[str, str], analyze: bool = False) -> Dict[str, dict]:
+    """获取各查询的执行计划摘要"""
+    options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+    plans = {}
+    for name, sql in queries.items():
+        result = conn.execute(text(f"EXPLAIN ({options}) {sql}")).scalar()
+        document = (json.loads(result) if isinstance(result, str) else result)[0]
+        plan = document["Plan"]
+        plans[name] = {
+            "cost": plan["Total Cost"],
+            "time_ms": document.get("Execution Time"),
+            "scans": _scans(plan),
+        }
+    return plans
+
+
+def _scans(plan: dict) -> List[str]:
+    """计划树中的表扫描方式（Seq Scan on t / Index Scan using idx）"""
+    scans = []
+    node_type = plan["Node Type"]
+    if "Scan" in node_type:
+        target = plan.get("Index Name") or plan.get("Relation Name")
+        joiner = "using" if plan.get("Index Name") else "on"
+        scans.append(f"{node_type} {joiner} {target}" if target else node_type)
+    for child in plan.get("Plans", []):
+        scans.extend(_scans(child))
+    return scans
+
+
+def write_report(migration: Migration, before: Dict[str, dict], after: Dict[str, dict]) -> str:
+    """生成迁移前后执行计划对比报告（Markdown）"""
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    path = os.path.join(REPORTS_DIR, f"{migration.version}_{migration.name}.md")
+    lines = [
+        f"# {migration.version} {migration.description} 执行计划对比",
+        "",
+        f"生成时间：{datetime.utcnow():%Y-%m-%d %H:%M:%S} UTC",
+        "",
+        "| 查询 | 迁移前 cost | 迁移后 cost | 迁移前耗时(ms) | 迁移后耗时(ms) | 迁移前扫描 | 迁移后扫描 |",
+        "|------|------------|------------|---------------|---------------|-----------|-----------|",
+    ]
+    for name in migration.plan_queries:
+        old, new = before.get(name), after.get(name)
+        if old is None or new is None:
+            continue
+        lines.append(
+            f"| {name} | {old['cost']:.1f} | {new['cost']:.1f} "
+            f"| {old['time_ms'] if old['time_ms'] is not None else '-'} "
+            f"| {new['time_ms'] if new['time_ms'] is not None else '-'} "
+            f"| {'<br>'.join(old['scans'])} | {'<br>'.join(new['scans'])} |"
+        )
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return path
+
+
+def _run(conn: Connection, migration: Migration, direction: str) -> None:
+    started = time.perf_counter()
+    if migration.transactional:
+        # 连接默认 AUTOCOMMIT，事务迁移临时切换隔离级别，迁移与版本记录一起提交
+        conn.commit()
+        conn.execution_options(isolation_level="READ COMMITTED")
+        try:
+            with conn.begin():
+                getattr(migration.module, direction)(MigrationContext(conn, transactional=True))
+                _record(conn, migration, direction, started)
+        finally:
+            conn.execution_options(isolation_level="AUTOCOMMIT")
+    else:
+        getattr(migration.module, direction)(MigrationContext(conn, transactional=False))
+        _record(conn, migration, direction, started)
+
+
+def _record(conn: Connection, migration: Migration, direction: str, started: float) -> None:
+    if direction == "upgrade":
+        conn.execute(text("""
+            INSERT INTO schema_migrations (version, name, duration_ms)
+            VALUES (:version, :name, :duration_ms)
+        """), {
+            "version": migration.version,
+            "name": migration.name,
+            "duration_ms": int((time.perf_counter() - started) * 1000),
+        })
+    else:
+        conn.execute(text("DELETE FROM schema_migrations WHERE version = :version"), {"version": migration.version})
+
+
+def upgrade(report: bool = False, analyze: bool = False) -> None:
+    """按顺序执行所有未应用的迁移"""
+    with _engine().connect() as conn:
+        _prepare(conn)
+        applied = applied_versions(conn)
+        pending = [m for m in discover() if m.version not in applied]
+        if not pending:
+            print("✅ 没有待执行的迁移")
+            return
+        for migration in pending:
+            print(f"🔄 执行迁移 {migration.version} - {migration.description}")
+            before = explain(conn, migration.plan_queries, analyze) if report else None
+            _run(conn, migration, "upgrade")
+            if report and migration.plan_queries:
+                conn.execute(text("ANALYZE"))
+                path = write_report(migration, before, explain(conn, migration.plan_queries, analyze))
+                print(f"📊 执行计划对比报告: {path}")
+            print(f"✅ 迁移 {migration.version} 完成")
+
+
+def downgrade(version: str) -> None:
+    """回滚到指定版本之前（倒序回滚所有 >= version 的已应用迁移）"""
+    with _engine().connect() as conn:
+        _prepare(conn)
+        applied = applied_versions(conn)
+        targets = [m for m in reversed(discover()) if m.version in applied and m.version >= version]
+        for migration in targets:
+            print(f"🔄 回滚迁移 {migration.version} - {migration.description}")
+            _run(conn, migration, "downgrade")
+            print(f"✅ 迁移 {migration.version} 已回滚")
+
+
+def report(version: str, analyze: bool = False) -> None:
+    """输出某个迁移涉及查询的当前执行计划（不修改数据库）"""
+    migration = next((m for m in discover() if m.version == version), None)
+    if migration is None:
+        raise SystemExit(f"❌ 迁移 {version} 不存在")
+    with _engine().connect() as conn:
+        for name, plan in explain(conn, migration.plan_queries, analyze).items():
+            time_ms = f", {plan['time_ms']}ms" if plan["time_ms"] is not None else ""
+            print(f"📊 {name}: cost={plan['cost']:.1f}{time_ms} - {'; '.join(plan['scans'])}")
+
+
+def status() -> None:
+    with _engine().connect() as conn:
+        conn.execute(text(_CREATE_TABLE_SQL))
+        applied = applied_versions(conn)
+    for migration in discover():
+        applied_at = applied.get(migration.version)
+        mark = f"✅ {applied_at:%Y-%m-%d %H:%M:%S}" if applied_at else "⏳ 未执行"
+        print(f"{migration.version} {migration.description} - {mark}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="版本化迁移执行器")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="查看迁移状态")
+    upgrade_parser = sub.add_parser("upgrade", help="执行未应用的迁移")
+    upgrade_parser.add_argument("--report", action="store_true", help="生成迁移前后执行计划对比报告")
+    upgrade_parser.add_argument("--analyze", action="store_true", help="使用 EXPLAIN ANALYZE（实际执行查询）")
+    downgrade_parser = sub.add_parser("downgrade", help="回滚迁移")
+    downgrade_parser.add_argument("version")
+    report_parser = sub.add_parser("report", help="查看迁移涉及查询的当前执行计划")
+    report_parser.add_argument("version")
+    report_parser.add_argument("--analyze", action="store_true", help="使用 EXPLAIN ANALYZE（实际执行查询）")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        status()
+    elif args.command == "upgrade":
+        upgrade(report=args.report, analyze=args.analyze)
+    elif args.command == "downgrade":
+        downgrade(args.version)
+    else:
+        report(args.version, analyze=args.analyze)
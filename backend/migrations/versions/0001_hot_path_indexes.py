@@ -0,0 +1,165 @@
+"""
+热点查询索引
+
+列表、互动、评论、登录记录与小工具查询依赖的复合索引和唯一索引。
+以前只能单独运行的索引脚本（游标分页、评论树、浏览记录、点赞唯一约束）
+对应的索引也一并纳入：已存在的有效索引会跳过。
+
+前置条件：本迁移只建索引，不建表和列。表由应用启动时的 create_all 创建；
+应用启动建表早于热度分/浏览记录功能的旧库，需先运行
+migrations/add_content_hot_score.py（contents.hot_score）和
+migrations/add_content_views.py（content_views 表），否则迁移在开始前报错退出。
+满足前置条件后执行一遍即可得到完整的索引集。
+
+全部使用 CREATE INDEX CONCURRENTLY，建索引期间不阻塞线上读写。
+唯一索引遇到历史重复数据会创建失败，此时先运行 migrations/add_interaction_unique.py
+清理重复记录再重新执行。
+
+(content_id, parent_id, created_at) 形式的评论查询分别由顶级评论部分索引
+（parent_id IS NULL）与 (parent_id, created_at, id) 覆盖，不再单独建三列索引。
+
+运行方式:
+python migrations/runner.py upgrade --report
+"""
+
+DESCRIPTION = "热点查询复合索引与唯一索引"
+
+# CREATE INDEX CONCURRENTLY 不能在事务中执行
+TRANSACTIONAL = False
+
+# 索引名 -> (目标, 是否唯一)
+INDEXES = {
+    # 内容列表 / 探索 / 个人主页：游标分页 (created_at DESC, id DESC)
+    "idx_contents_created_at_id": ("contents (created_at, id)", False),
+    "idx_contents_public_type_created_at_id": ("contents (is_public, type, created_at, id)", False),
+    "idx_contents_public_created_at_id": ("contents (is_public, created_at, id)", False),
+    "idx_contents_user_created_at_id": ("contents (user_id, created_at, id)", False),
+    "idx_contents_public_hot_score_id": ("contents (is_public, hot_score, id)", False),
+    # 点赞 / 收藏 / 浏览：切换与状态查询按 (content_id, user_id)，个人列表按 (user_id, 时间)
+    "uq_content_likes_content_user": ("content_likes (content_id, user_id)", True),
+    "idx_content_likes_user_created_at": ("content_likes (user_id, created_at)", False),
+    "uq_content_saves_content_user": ("content_saves (content_id, user_id)", True),
+    "idx_content_saves_user_created_at": ("content_saves (user_id, created_at)", False),
+    "uq_content_views_content_user": ("content_views (content_id, user_id)", True),
+    "idx_content_views_user_updated_at": ("content_views (user_id, updated_at)", False),
+    # 评论：顶级评论、回复、线程子树、我的评论、评论点赞
+    "idx_comments_content_top_created_at_id": (
+        "comments (content_id, created_at, id) WHERE parent_id IS NULL", False
+    ),
+    "idx_comments_parent_created_at_id": ("comments (parent_id, created_at, id)", False),
+    "idx_comments_user_created_at": ("comments (user_id, created_at)", False),
+    "uq_comment_likes_comment_user": ("comment_likes (comment_id, user_id)", True),
+    # 登录日志与设备
+    "idx_login_logs_user_created_at": ("login_logs (user_id, created_at)", False),
+    "idx_login_devices_user_last_active": ("login_devices (user_id, last_active)", False),
+    # 小工具列表
+    "idx_countdowns_user_target_date": ("countdowns (user_id, target_date)", False),
+    "idx_todos_user_created_at": ("todos (user_id, created_at)", False),
+    "idx_expenses_user_date": ("expenses (user_id, date)", False),
+    "idx_habits_user_active_created_at": ("habits (user_id, is_active, created_at)", False),
+    "idx_habit_records_habit_date": ("habit_records (habit_id, date)", False),
+    "idx_notes_user_pinned_updated_at": ("notes (user_id, is_pinned, updated_at)", False),
+}
+
+# 本迁移新增的索引（回滚时只删除这些，此前由单独脚本创建的索引保留）
+_INTRODUCED = {
+    "idx_content_likes_user_created_at",
+    "idx_content_saves_user_created_at",
+    "idx_comments_user_created_at",
+    "idx_login_logs_user_created_at",
+    "idx_login_devices_user_last_active",
+    "idx_countdowns_user_target_date",
+    "idx_todos_user_created_at",
+    "idx_expenses_user_date",
+    "idx_habits_user_active_created_at",
+    "idx_habit_records_habit_date",
+    "idx_notes_user_pinned_updated_at",
+}
+
+# 迁移前后对比执行计划的代表性查询（参数取自现有数据）
+PLAN_QUERIES = {
+    "探索页按类型": """
+        SELECT id FROM contents WHERE is_public AND type = 'ALBUM'
+        ORDER BY created_at DESC, id DESC LIMIT 20
+    """,
+    "个人作品": """
+        SELECT id FROM contents WHERE user_id = (SELECT user_id FROM contents LIMIT 1)
+        ORDER BY created_at DESC, id DESC LIMIT 20
+    """,
+    "点赞状态": """
+        SELECT 1 FROM content_likes
+        WHERE content_id = (SELECT content_id FROM content_likes LIMIT 1)
+          AND user_id = (SELECT user_id FROM content_likes LIMIT 1)
+    """,
+    "我的点赞": """
+        SELECT content_id FROM content_likes WHERE user_id = (SELECT user_id FROM content_likes LIMIT 1)
+        ORDER BY created_at DESC LIMIT 20
+    """,
+    "浏览历史": """
+        SELECT content_id FROM content_views WHERE user_id = (SELECT user_id FROM content_views LIMIT 1)
+        ORDER BY updated_at DESC LIMIT 20
+    """,
+    "顶级评论": """
+        SELECT id FROM comments
+        WHERE content_id = (SELECT content_id FROM comments LIMIT 1) AND parent_id IS NULL
+        ORDER BY created_at DESC, id DESC LIMIT 20
+    """,
+    "评论回复": """
+        SELECT id FROM comments
+        WHERE parent_id = (SELECT parent_id FROM comments WHERE parent_id IS NOT NULL LIMIT 1)
+        ORDER BY created_at, id LIMIT 20
+    """,
+    "我的评论": """
+        SELECT id FROM comments WHERE user_id = (SELECT user_id FROM comments LIMIT 1)
+        ORDER BY created_at DESC LIMIT 20
+    """,
+    "登录日志": """
+        SELECT id FROM login_logs WHERE user_id = (SELECT user_id FROM login_logs LIMIT 1)
+        ORDER BY created_at DESC LIMIT 20
+    """,
+    "待办列表": """
+        SELECT id FROM todos WHERE user_id = (SELECT user_id FROM todos LIMIT 1)
+        ORDER BY created_at DESC LIMIT 20
+    """,
+    "账单列表": """
+        SELECT id FROM expenses WHERE user_id = (SELECT user_id FROM expenses LIMIT 1)
+        ORDER BY date DESC LIMIT 20
+    """,
+    "笔记列表": """
+        SELECT id FROM notes WHERE user_id = (SELECT user_id FROM notes LIMIT 1)
+        ORDER BY is_pinned DESC, updated_at DESC LIMIT 20
+    """,
+}
+
+
+# 索引依赖的、由单独脚本添加的表/列 -> 对应脚本
+_PREREQUISITES = {
+    ("contents", "hot_score"): "migrations/add_content_hot_score.py",
+    ("content_views", "updated_at"): "migrations/add_content_views.py",
+}
+
+
+def _check_prerequisites(ctx):
+    missing = [
+        f"{table}.{column}（请先运行 {script}）"
+        for (table, column), script in _PREREQUISITES.items()
+        if not ctx.execute(
+            "SELECT 1 FROM information_schema.columns WHERE table_name = :table AND column_name = :column",
+            {"table": table, "column": column},
+        ).scalar()
+    ]
+    if missing:
+        raise RuntimeError(f"缺少索引依赖的列: {'; '.join(missing)}")
+
+
+def upgrade(ctx):
+    _check_prerequisites(ctx)
+    for name, (target, unique) in INDEXES.items():
+        ctx.create_index(name, target, unique=unique)
+
+
+def downgrade(ctx):
+    for name in INDEXES:
+        if name in _INTRODUCED:
+            ctx.drop_index(name)
+
@@ -5,7 +5,7 @@ import { motion } from 'framer-motion';
 import { useParams, useRouter } from 'next/navigation';
 import Link from 'next/link';
 import { useAuthStore } from '@/lib/store/authStore';
-import { getAlbumDetail, toggleAlbumLike, toggleAlbumSave } from '@/lib/api/album';
+import { getAlbumDetail, getAlbumPhotos, toggleAlbumLike, toggleAlbumSave } from '@/lib/api/album';
 import styles from './page.module.css';
 
 interface Album {
@@ -14,6 +14,7 @@ interface Album {
   description: string;
   content: string;
   images: string[];
+  photo_count?: number;
   location: string;
   tags: string[];
   like_count: number;
@@ -37,11 +38,33 @@ export default function AlbumDetailPage() {
   const [album, setAlbum] = useState<Album | null>(null);
   const [loading, setLoading] = useState(true);
   const [selectedImage, setSelectedImage] = useState<number | null>(null);
+  const [photos, setPhotos] = useState<string[]>([]);
+  const [photoCursor, setPhotoCursor] = useState<string | null>(null);
+  const [loadingPhotos, setLoadingPhotos] = useState(false);
 
   useEffect(() => {
     loadAlbumDetail();
+    setPhotos([]);
+    setPhotoCursor(null);
+    loadPhotos();
   }, [albumId]);
 
+  // 照片按页加载，大相册不再一次返回全部图片
+  const loadPhotos = async (cursor?: string) => {
+    try {
+      setLoadingPhotos(true);
+      const response = await getAlbumPhotos(albumId, { page_size: 60, cursor });
+      const data = response.data || response;
+      const urls = (data.items || []).map((photo: { url: string }) => photo.url);
+      setPhotos(prev => (cursor ? [...prev, ...urls] : urls));
+      setPhotoCursor(data.next_cursor || null);
+    } catch (error) {
+      console.error('获取相册照片失败:', error);
+    } finally {
+      setLoadingPhotos(false);
+    }
+  };
+
   const loadAlbumDetail = async () => {
     try {
       setLoading(true);
@@ -191,7 +214,7 @@ export default function AlbumDetailPage() {
                     <circle cx="8.5" cy="8.5" r="1.5" />
                     <polyline points="21 15 16 10 5 21" />
                   </svg>
-                  {album.images.length} 张照片
+                  {album.photo_count ?? photos.length} 张照片
                 </span>
                 <span className={styles.infoItem}>
                   <svg viewBox="0 0 24 24" fill="none" stroke="currentColor">
@@ -250,13 +273,13 @@ export default function AlbumDetailPage() {
 
         {/* 照片网格 */}
         <div className={styles.photoGrid}>
-          {album.images.map((imageUrl, index) => (
+          {photos.map((imageUrl, index) => (
             <motion.div
               key={index}
               className={styles.photoItem}
               initial={{ opacity: 0, scale: 0.9 }}
               animate={{ opacity: 1, scale: 1 }}
-              transition={{ duration: 0.5, delay: index * 0.05 }}
+              transition={{ duration: 0.5, delay: (index % 60) * 0.05 }}
               whileHover={{ scale: 1.05 }}
               onClick={() => setSelectedImage(index)}
             >
@@ -271,6 +294,18 @@ export default function AlbumDetailPage() {
           ))}
         </div>
 
+        {photoCursor && (
+          <div className={styles.actions}>
+            <button
+              className={styles.actionBtn}
+              onClick={() => loadPhotos(photoCursor)}
+              disabled={loadingPhotos}
+            >
+              <span>{loadingPhotos ? '加载中...' : '加载更多照片'}</span>
+            </button>
+          </div>
+        )}
+
         {/* 图片查看器 */}
         {selectedImage !== null && (
           <motion.div
@@ -291,7 +326,7 @@ export default function AlbumDetailPage() {
               className={styles.navBtn}
               onClick={(e) => {
                 e.stopPropagation();
-                setSelectedImage(selectedImage > 0 ? selectedImage - 1 : album.images.length - 1);
+                setSelectedImage(selectedImage > 0 ? selectedImage - 1 : photos.length - 1);
               }}
             >
               <svg viewBox="0 0 24 24" fill="none" stroke="currentColor">
@@ -301,13 +336,13 @@ export default function AlbumDetailPage() {
 
             <div className={styles.lightboxContent} onClick={(e) => e.stopPropagation()}>
               <img 
-                src={album.images[selectedImage]} 
+                src={photos[selectedImage]} 
                 alt={`${album.title} - ${selectedImage + 1}`}
                 className={styles.lightboxImage}
               />
               <div className={styles.lightboxInfo}>
                 <h3>{album.title}</h3>
-                <p>{selectedImage + 1} / {album.images.length}</p>
+                <p>{selectedImage + 1} / {album.photo_count ?? photos.length}</p>
               </div>
             </div>
 
@@ -315,7 +350,7 @@ export default function AlbumDetailPage() {
               className={`${styles.navBtn} ${styles.navBtnNext}`}
               onClick={(e) => {
                 e.stopPropagation();
-                setSelectedImage(selectedImage < album.images.length - 1 ? selectedImage + 1 : 0);
+                setSelectedImage(selectedImage < photos.length - 1 ? selectedImage + 1 : 0);
               }}
             >
               <svg viewBox="0 0 24 24" fill="none" stroke="currentColor">
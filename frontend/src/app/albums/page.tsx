@@ -13,6 +13,7 @@ interface Album {
   title: string;
   description: string;
   images: string[];
+  image_count?: number;
   location: string;
   tags: string[];
   like_count: number;
@@ -92,8 +93,8 @@ export default function AlbumsPage() {
     return date.toLocaleDateString('zh-CN', { year: 'numeric', month: '2-digit', day: '2-digit' });
   };
 
-  const getPhotoCount = (images: string[]) => {
-    return images?.length || 0;
+  const getPhotoCount = (album: Album) => {
+    return album.image_count ?? album.images?.length ?? 0;
   };
 
   const getCoverImages = (images: string[]) => {
@@ -194,7 +195,7 @@ export default function AlbumsPage() {
                             <circle cx="8.5" cy="8.5" r="1.5" />
                             <polyline points="21 15 16 10 5 21" />
                           </svg>
-                          {getPhotoCount(album.images)} 张照片
+                          {getPhotoCount(album)} 张照片
                         </span>
                       </div>
                     </div>
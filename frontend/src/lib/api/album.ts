@@ -23,36 +23,83 @@ export async function getAlbumDetail(albumId: string) {
 }
 
 /**
- * 按地点统计相册
+ * 分页获取相册照片
  */
-export async function getAlbumStatsByLocation(userId?: string) {
+export async function getAlbumPhotos(albumId: string, params: {
+  page?: number;
+  page_size?: number;
+  cursor?: string;
+} = {}) {
+  const response = await apiClient.get(`/v1/content/albums/${albumId}/photos`, { params });
+  return response.data;
+}
+
+/**
+ * 按地点统计相册（分页）
+ */
+export async function getAlbumStatsByLocation(userId?: string, params: {
+  page?: number;
+  page_size?: number;
+} = {}) {
   const response = await apiClient.get('/v1/content/albums/stats/location', {
-    params: userId ? { user_id: userId } : {},
+    params: userId ? { ...params, user_id: userId } : params,
   });
   return response.data;
 }
 
 /**
- * 按标签统计相册
+ * 按标签统计相册（分页）
  */
-export async function getAlbumStatsByTag(userId?: string) {
+export async function getAlbumStatsByTag(userId?: string, params: {
+  page?: number;
+  page_size?: number;
+} = {}) {
   const response = await apiClient.get('/v1/content/albums/stats/tag', {
-    params: userId ? { user_id: userId } : {},
+    params: userId ? { ...params, user_id: userId } : params,
   });
   return response.data;
 }
 
 /**
- * 按时间轴统计相册
+ * 按时间轴统计相册（分页）
  */
 export async function getAlbumStatsByTimeline(params: {
   userId?: string;
   groupBy?: 'year' | 'month' | 'day';
+  page?: number;
+  page_size?: number;
 }) {
   const response = await apiClient.get('/v1/content/albums/stats/timeline', {
     params: {
       user_id: params.userId,
       group_by: params.groupBy || 'month',
+      page: params.page,
+      page_size: params.page_size,
+    },
+  });
+  return response.data;
+}
+
+/**
+ * 相册统计下钻：分页获取某个地点/标签/时间段内的相册
+ */
+export async function getAlbumStatsBucketAlbums(
+  dimension: 'location' | 'tag' | 'year' | 'month' | 'day',
+  bucket: string,
+  params: {
+    userId?: string;
+    page?: number;
+    page_size?: number;
+    cursor?: string;
+  } = {}
+) {
+  const response = await apiClient.get(`/v1/content/albums/stats/${dimension}/albums`, {
+    params: {
+      bucket,
+      user_id: params.userId,
+      page: params.page,
+      page_size: params.page_size,
+      cursor: params.cursor,
     },
   });
   return response.data;